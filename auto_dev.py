@@ -31,33 +31,58 @@ Modified to gather the entire existing codebase (all .py and .html files) and pr
 """
 
 import os
-import re
 import sys
 import yaml
-import time
 import logging
 import requests
 import subprocess
 import ast
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+
+from autodev.candidates import GitWorktree, apply_files, run_candidates
+from autodev.context import DEFAULT_TOKEN_BUDGET, ContextBuilder
+from autodev.deepseek_client import DeepSeekClient
+from autodev.deploy import Deployer, GracefulReloader
+from autodev.environment import EnvironmentManager, InstallError
+from autodev.logsetup import LogContext, start_logging
+from autodev.metrics import RunStore, RunTracer
+from autodev.noop import filter_changed_files
+from autodev.parsing import InvalidGeneratedCode, StreamingResponseParser, parse_ai_blocks, parse_ai_response
+from autodev.patching import EditApplier, PatchError
+from autodev.requirements import ImportScanner
+from autodev.scheduler import AdaptiveScheduler
+from autodev.security import SecurityScanner
+from autodev.summary import compact_diff, describe_changes
+from autodev.testing import TestRunner
 
 # -------------------------------------------------------------------------
 #  Logging Setup with Rotation + Console
 # -------------------------------------------------------------------------
-LOG_FILE = "logs/auto_dev.log"
+# JSON lines, with large messages in logs/blobs; see autodev/logsetup.py
+LOG_FILE = "logs/auto_dev.jsonl"
+LOG_BLOB_DIR = "logs/blobs"
 os.makedirs("logs", exist_ok=True)  # Ensure logs directory exists
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)  # Allow debug logs for more detail
 
-file_handler = RotatingFileHandler(LOG_FILE, maxBytes=1_000_000, backupCount=5)
-file_format = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
-file_handler.setFormatter(file_format)
-logger.addHandler(file_handler)
+# The helper modules in autodev/ log under their own package logger
+package_logger = logging.getLogger("autodev")
+package_logger.setLevel(logging.DEBUG)
 
 console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setFormatter(file_format)
+console_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+console_handler.setLevel(logging.CRITICAL + 1)  # silent until enable_console_logging()
+
+# Callers only enqueue records; a background thread writes them
+log_context = LogContext()
+log_listener = start_logging([logger, package_logger], LOG_FILE, LOG_BLOB_DIR, log_context, console=console_handler)
+
+def enable_console_logging():
+    console_handler.setLevel(logging.DEBUG)
 
 # -------------------------------------------------------------------------
 #  Load Config
@@ -75,6 +100,22 @@ BRANCH_NAME = config.get("branch_name", "main")
 RETRY_LIMIT = config.get("retry_limit", 1)
 ENABLE_AUTODEV = config.get("enable_autodev", True)
 DRY_RUN = config.get("dry_run", False)  # For improvement #15
+CANDIDATE_COUNT = max(1, config.get("candidates", 1))
+CANDIDATE_TIMEOUT = config.get("candidate_timeout_seconds", 600)
+VENV_DIR = config.get("venv_dir")  # None installs into the running interpreter
+PACKAGE_MAP = config.get("package_map") or {}  # extra import name -> PyPI name entries
+RICH_CHANGE_SUMMARY = config.get("rich_change_summary", False)
+# run_forever adapts its interval between these bounds (see autodev/scheduler.py)
+MIN_INTERVAL_MINUTES = config.get("min_interval_minutes")
+MAX_INTERVAL_MINUTES = config.get("max_interval_minutes")
+HOURLY_TOKEN_BUDGET = config.get("hourly_token_budget")  # None for no limit
+HOURLY_COST_BUDGET = config.get("hourly_cost_budget")  # None for no limit
+PROMPT_TOKEN_PRICE = config.get("prompt_token_price", 0.27)  # per million tokens
+COMPLETION_TOKEN_PRICE = config.get("completion_token_price", 1.10)  # per million tokens
+# The site is reloaded through the gunicorn master in this pidfile (see autodev/deploy.py)
+GUNICORN_PIDFILE = config.get("gunicorn_pidfile", "/run/gunicorn-theseus/gunicorn.pid")
+HEALTH_URL = config.get("health_url", "http://127.0.0.1:8000/healthz")
+RELOAD_TIMEOUT = config.get("reload_timeout_seconds", 60)
 
 SYSTEM_PROMPT = config.get(
     "system_prompt",
@@ -149,71 +190,76 @@ validate_env_variables()
 # -------------------------------------------------------------------------
 ATTEMPTED_COMMITS = 0
 SUCCESSFUL_COMMITS = 0
+NOOP_CYCLES = 0
+LAST_FAILURE_REASON = ""
+
+def log_run_metrics():
+    logger.info(
+        f"Run metrics: attempted_commits={ATTEMPTED_COMMITS}, "
+        f"successful_commits={SUCCESSFUL_COMMITS}, noop_cycles={NOOP_CYCLES}"
+    )
 
 # -------------------------------------------------------------------------
 #  DeepSeek Integration
 # -------------------------------------------------------------------------
-DEESEEK_API_URL = "https://api.deepseek.com/v1/chat/completions"
+DEESEEK_API_URL = os.environ.get("DEESEEK_API_URL", "https://api.deepseek.com/v1/chat/completions")
 DEESEEK_MODEL = "deepseek-chat"
 MAX_TOKENS = 4000
 DEESEEK_RETRIES = 3
+DEESEEK_STREAM = config.get("deepseek_stream", True)
+# "edits": existing files come back as SEARCH/REPLACE or diff edits; "files": whole files
+RESPONSE_FORMAT = config.get("response_format", "files")
+CONTEXT_TOKEN_BUDGET = config.get("context_token_budget", DEFAULT_TOKEN_BUDGET)
+
+# One pooled keep-alive session for every call this process makes
+deepseek_client = DeepSeekClient(
+    DEESEEK_API_KEY, DEESEEK_API_URL, retries=DEESEEK_RETRIES, pool_size=max(4, CANDIDATE_COUNT)
+)
+
+# Per-phase timings, API usage and the outcome of every run, for
+# `python -m autodev.metrics`
+tracer = RunTracer(RunStore(), log_context, api_stats=deepseek_client.stats)
 
 def call_deepseek_api(payload):
     """
     Call the DeepSeek API with retry logic and exponential backoff.
     Returns the response JSON or None on failure.
     """
-    headers = {
-        "Authorization": f"Bearer {DEESEEK_API_KEY}",
-        "Content-Type": "application/json",
-    }
-    for attempt in range(DEESEEK_RETRIES):
-        try:
-            response = requests.post(
-                DEESEEK_API_URL, json=payload, headers=headers, timeout=60
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"DeepSeek API call failed (attempt {attempt+1}): {e}")
-            if attempt < DEESEEK_RETRIES - 1:
-                backoff_time = 2 ** attempt
-                logger.info(f"Retrying in {backoff_time} seconds...")
-                time.sleep(backoff_time)
-            else:
-                logger.error("All attempts to call DeepSeek API have failed.")
-    return None
-
-def gather_codebase():
-    """
-    Gather all relevant .py (except those in website/tests) and .html files 
-    from the 'website' directory, and combine them into a compact string to
-    provide context to the AI.
-    """
-    code_pieces = []
-    for root, dirs, files in os.walk("website"):
-        if "tests" in root:
-            continue
-        for fname in files:
-            if fname.endswith(".py") or fname.endswith(".html"):
-                full_path = os.path.join(root, fname)
-                try:
-                    with open(full_path, "r", encoding="utf-8") as f:
-                        contents = f.read()
-                    code_pieces.append(f"### File: {full_path}\n{contents}\n")
-                except Exception as e:
-                    logger.warning(f"Error reading file {full_path}: {e}")
-    return "\n".join(code_pieces)
+    return deepseek_client.complete(payload)
 
-def generate_code_change(full_codebase, failure_reason=""):
+# File contents stay cached between cycles; only changed files are re-read
+context_builder = ContextBuilder("website", token_budget=CONTEXT_TOKEN_BUDGET)
+
+def gather_codebase(failure_reason=""):
     """
-    Send the existing codebase to DeepSeek, along with instructions on how to modify it.
-    Provide feedback to the AI if there's a failure_reason.
-    Return the AI's entire raw response (which may contain multiple files).
+    Gather the .py and .html files from the 'website' directory (except
+    website/tests) into one string of context for the AI. The most relevant
+    files go in verbatim and the rest are skeletonized or listed, so the
+    result stays within CONTEXT_TOKEN_BUDGET.
     """
+    return context_builder.build(failure_reason)
+
+FILES_FORMAT_INSTRUCTIONS = (
+    "Return multiple code blocks if multiple files are changed, each labeled with 'File: path/to/file'. "
+)
+
+EDITS_FORMAT_INSTRUCTIONS = (
+    "Label each changed file with 'File: path/to/file'. For a new file, give its complete contents. "
+    "For an existing file, do not repeat the whole file; give one or more edits in this form:\n"
+    "<<<<<<< SEARCH\n"
+    "exact lines copied from the current file\n"
+    "=======\n"
+    "the lines that replace them\n"
+    ">>>>>>> REPLACE\n"
+    "The SEARCH lines must match the file exactly and only once, so include a few unchanged lines "
+    "around the change. Only edit files shown in full above; unified diff hunks (@@ ... @@) are also accepted. "
+)
+
+def build_code_change_payload(full_codebase, failure_reason=""):
     feedback_message = ""
     if failure_reason:
         feedback_message = f"Previous attempt failed due to: {failure_reason}\n"
+    format_instructions = EDITS_FORMAT_INSTRUCTIONS if RESPONSE_FORMAT == "edits" else FILES_FORMAT_INSTRUCTIONS
 
     payload = {
         "model": DEESEEK_MODEL,
@@ -227,8 +273,8 @@ def generate_code_change(full_codebase, failure_reason=""):
                     + "Here is the existing codebase:\n\n"
                     + full_codebase
                     + "\n\n"
-                    "Return multiple code blocks if multiple files are changed, each labeled with 'File: path/to/file'. "
-                    "Do not place HTML inline in .py files. Do not edit any tests in website/tests. "
+                    + format_instructions
+                    + "Do not place HTML inline in .py files. Do not edit any tests in website/tests. "
                     "Return ONLY the updated code blocks."
                 ),
             },
@@ -236,7 +282,15 @@ def generate_code_change(full_codebase, failure_reason=""):
         "temperature": 0.7,
         "max_tokens": MAX_TOKENS,
     }
+    return payload
 
+def generate_code_change(full_codebase, failure_reason=""):
+    """
+    Send the existing codebase to DeepSeek, along with instructions on how to modify it.
+    Provide feedback to the AI if there's a failure_reason.
+    Return the AI's entire raw response (which may contain multiple files).
+    """
+    payload = build_code_change_payload(full_codebase, failure_reason)
     result = call_deepseek_api(payload)
     if not result:
         return "# [DeepSeek ERROR] Could not generate new code.\n"
@@ -248,26 +302,45 @@ def generate_code_change(full_codebase, failure_reason=""):
         logger.error(f"Invalid DeepSeek response structure: {e}")
         return "# [DeepSeek ERROR] Invalid response.\n"
 
-def generate_change_summary(old_code, new_code):
+def read_current_files(paths):
     """
-    Generate a concise and readable summary of changes using DeepSeek.
-    Returns a string summarizing the changes.
+    Return {path: current text} for paths, with None for files that don't
+    exist yet. Taken before writing, for the change summary.
     """
+    current = {}
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                current[path] = f.read()
+        except (FileNotFoundError, UnicodeDecodeError):
+            current[path] = None
+    return current
+
+def generate_change_summary(old_files, new_files):
+    """
+    Summarize a change set from a local AST/diff comparison. Only when
+    rich_change_summary is enabled is DeepSeek asked to improve on it, and
+    then only the compact diff is sent. Returns a string summarizing the
+    changes.
+    """
+    summary = describe_changes(old_files, new_files).summary()
+    if not RICH_CHANGE_SUMMARY:
+        return f"Changes: {summary}"
+
     payload = {
         "model": DEESEEK_MODEL,
         "messages": [
             {
                 "role": "system",
-                "content": "You are a helpful AI assistant. Summarize the changes between the old and new code in a concise and readable way.",
+                "content": "You are a helpful AI assistant. Summarize code changes in a concise and readable way.",
             },
             {
                 "role": "user",
                 "content": (
-                    "Here is the old code:\n\n"
-                    + old_code
-                    + "\n\n"
-                    "Here is the new code:\n\n"
-                    + new_code
+                    "Here is an outline of the change:\n\n"
+                    + summary
+                    + "\n\nHere is the diff:\n\n"
+                    + compact_diff(old_files, new_files)
                     + "\n\n"
                     "Summarize the changes in one or two sentences. Focus on what was added, removed, or modified."
                 ),
@@ -279,13 +352,12 @@ def generate_change_summary(old_code, new_code):
 
     result = call_deepseek_api(payload)
     if not result:
-        return "Changes: Unable to generate summary."
-    try:
-        summary = result["choices"][0]["message"]["content"].strip()
         return f"Changes: {summary}"
+    try:
+        return f"Changes: {result['choices'][0]['message']['content'].strip()}"
     except (KeyError, IndexError) as e:
         logger.error(f"Invalid DeepSeek response structure: {e}")
-        return "Changes: Unable to generate summary."
+        return f"Changes: {summary}"
 
 # -------------------------------------------------------------------------
 #  Multi-File Parsing & Basic Syntax Validation
@@ -299,28 +371,97 @@ def is_valid_python_syntax(code_str):
         return False
 
 def parse_ai_response_into_files(ai_response):
-    cleaned_response = re.sub(r"```[a-zA-Z]*", "", ai_response)
-    cleaned_response = cleaned_response.replace("```", "")
-    pattern = r"(File:\s*([^\n]+))(.*?)(?=File:|$)"
-    matches = re.findall(pattern, cleaned_response, flags=re.DOTALL)
-    temp_files = {}
-
-    for match in matches:
-        file_path = match[1].strip()
-        code_block = match[2].strip()
-        if file_path.endswith("-->"):
-            file_path = file_path.replace("-->", "").strip()
-        if file_path.startswith("website/tests"):
-            logger.warning(f"AI attempted to modify tests file '{file_path}'. Skipping.")
-            continue
-        if not file_path.startswith("website/"):
-            file_path = f"website/{file_path.lstrip('/')}"
+    return parse_ai_response(ai_response)
+
+def validate_completed_files(completed):
+    for file_path, code_str in completed:
         if file_path.endswith(".py"):
-            code_block = re.sub(r"<!--.*?-->", "", code_block, flags=re.DOTALL)
-            code_block = re.sub(r"<[^>]+>", "", code_block)
-        temp_files[file_path] = code_block
+            try:
+                tree = ast.parse(code_str)
+            except SyntaxError as e:
+                raise InvalidGeneratedCode(file_path, e)
+            # Reuse the parse: the requirements check later is a cache hit
+            import_scanner.scan(code_str, tree)
 
-    return temp_files
+def record_edit_failure(error):
+    """
+    Keep a failed edit as the failure reason, so the next attempt sees which
+    hunk didn't apply and the lines it should have matched.
+    """
+    global LAST_FAILURE_REASON
+    LAST_FAILURE_REASON = str(error)
+    logger.error(f"Could not apply AI edits: {error}. Discarding all files.")
+
+def stream_code_change(full_codebase, failure_reason="", stop=None):
+    """
+    Stream the AI response and parse it as it arrives. Each file is applied
+    and syntax checked as soon as the next "File:" header closes it, and the
+    stream is abandoned at the first edit that doesn't apply or invalid .py
+    file, or once stop (a threading.Event) is set.
+    Returns (ai_response, files_dict).
+    """
+    payload = build_code_change_payload(full_codebase, failure_reason)
+    parser = StreamingResponseParser()
+    applier = EditApplier()
+    received = []
+    stream = deepseek_client.stream(payload)
+    try:
+        for chunk in stream:
+            if stop is not None and stop.is_set():
+                logger.info("Abandoning the stream: another candidate already passed.")
+                return "".join(received), {}
+            received.append(chunk)
+            validate_completed_files(applier.resolve_all(parser.feed(chunk)))
+        validate_completed_files(applier.resolve_all(parser.close()))
+    except InvalidGeneratedCode as e:
+        logger.error(f"SyntaxError in generated code: {e}. Discarding all files.")
+        return "".join(received), {}
+    except PatchError as e:
+        record_edit_failure(e)
+        return "".join(received), {}
+    except requests.exceptions.RequestException:
+        return "# [DeepSeek ERROR] Stream interrupted.\n", {}
+    finally:
+        stream.close()
+
+    ai_response = "".join(received).strip()
+    if not ai_response:
+        return "# [DeepSeek ERROR] Could not generate new code.\n", {}
+    logger.debug(f"RAW AI RESPONSE:\n{ai_response}\n")
+    return ai_response, applier.files
+
+def generate_files(full_codebase, failure_reason="", stop=None):
+    """
+    Ask the AI for a change and return (ai_response, files_dict), with any
+    edits already applied to the current files. If an edit doesn't apply or
+    any .py file fails syntax, files_dict is empty (all-or-nothing). A
+    streamed response is abandoned once stop is set.
+    """
+    if DEESEEK_STREAM:
+        return stream_code_change(full_codebase, failure_reason, stop)
+    ai_response = generate_code_change(full_codebase, failure_reason)
+    applier = EditApplier()
+    try:
+        files_dict = dict(applier.resolve_all(parse_ai_blocks(ai_response)))
+    except PatchError as e:
+        record_edit_failure(e)
+        return ai_response, {}
+    if not all(is_valid_python_syntax(code) for fp, code in files_dict.items() if fp.endswith(".py")):
+        logger.error("Discarding all files because of invalid Python syntax.")
+        return ai_response, {}
+    return ai_response, files_dict
+
+# -------------------------------------------------------------------------
+#  No-op Detection
+# -------------------------------------------------------------------------
+def record_noop_cycle():
+    global NOOP_CYCLES
+    NOOP_CYCLES += 1
+    logger.info(
+        "AI output is identical to the current tree; skipping writes, summary, "
+        "tests, git and service restart."
+    )
+    log_run_metrics()
 
 # -------------------------------------------------------------------------
 #  Template Handling Checks
@@ -344,109 +485,119 @@ def template_references_check(files_dict):
 # -------------------------------------------------------------------------
 #  Detect and Add New Requirements
 # -------------------------------------------------------------------------
-COMMON_PYPI_MAP = {
-    "flask_bcrypt": "Flask-Bcrypt",
-    "flask_sqlalchemy": "Flask-SQLAlchemy",
-    "flask_login": "Flask-Login",
-    "pytest": "pytest",
-    "requests": "requests",
-    "bcrypt": "bcrypt"
-}
+import_scanner = ImportScanner(PACKAGE_MAP)
 
 def detect_and_add_new_requirements(files_dict, req_file="website/requirements.txt"):
-    existing_deps = set()
-    if os.path.exists(req_file):
-        with open(req_file, "r", encoding="utf-8") as rf:
-            for line in rf:
-                line_stripped = line.strip().lower()
-                if line_stripped and not line_stripped.startswith("#"):
-                    # Just split on '==' to handle pinned version or anything else
-                    existing_deps.add(line_stripped.split("==")[0].strip())
-
-    new_deps_found = False
-    for fp, content in files_dict.items():
-        if fp.endswith(".py"):
-            for line in content.splitlines():
-                line_stripped = line.strip()
-                if line_stripped.startswith("import "):
-                    # e.g. "import flask_bcrypt"
-                    parts = line_stripped.replace("import ", "").split(",")
-                    for p in parts:
-                        mod = p.strip().split(" as ")[0]
-                        if "." in mod:
-                            mod = mod.split(".")[0]
-                        pkg = COMMON_PYPI_MAP.get(mod.lower(), mod)
-                        if pkg.lower() not in existing_deps:
-                            new_deps_found = True
-                            existing_deps.add(pkg.lower())
-                elif line_stripped.startswith("from "):
-                    # e.g. "from flask_bcrypt import Bcrypt"
-                    segs = line_stripped.split()
-                    if len(segs) > 1:
-                        mod = segs[1].strip().split(".")[0]
-                        pkg = COMMON_PYPI_MAP.get(mod.lower(), mod)
-                        if pkg.lower() not in existing_deps:
-                            new_deps_found = True
-                            existing_deps.add(pkg.lower())
-
-    if new_deps_found:
-        with open(req_file, "w", encoding="utf-8") as wf:
-            for dep in sorted(existing_deps):
-                wf.write(f"{dep}\n")
-        logger.info("New requirements added. Installing them now...")
-        subprocess.run(["pip", "install", "-r", req_file], check=False)
+    """
+    Append any third-party distributions the generated .py files import to
+    req_file and install them in one batch.
+    """
+    missing = import_scanner.missing_distributions(files_dict, req_file)
+    if not missing:
+        return
+
+    with open(req_file, "a+", encoding="utf-8") as f:
+        f.seek(0)
+        existing = f.read()
+        if existing and not existing.endswith("\n"):
+            f.write("\n")
+        for dep in missing:
+            f.write(f"{dep}\n")
+    logger.info(f"New requirements added: {', '.join(missing)}. Installing them now...")
+    try:
+        logger.info(environment.install(missing))
+    except InstallError as e:
+        logger.error(f"Dependency installation failed: {e}")
 
 # -------------------------------------------------------------------------
 #  Testing
 # -------------------------------------------------------------------------
+# Installs are skipped while website/requirements.txt is unchanged, and only
+# new lines are installed when it changes
+environment = EnvironmentManager("website/requirements.txt", venv_dir=VENV_DIR)
+
+# Results are cached by tree hash and only the affected tests are run
+test_runner = TestRunner(python=environment.python, maxfail=1)
+
+# bandit findings are cached per file content; only changed files are scanned
+security_scanner = SecurityScanner()
+
+def install_requirements():
+    try:
+        output = environment.ensure()
+    except InstallError as e:
+        logger.error(f"Dependency installation failed: {e}")
+        return False
+    if output:
+        logger.info(output)
+    tracer.count("install_seconds_saved", round(environment.last_saved_seconds, 3))
+    return True
+
 def check_tests_exist(test_path="website/tests/"):
     if not os.path.exists(test_path):
         logger.warning("Test directory does not exist. Tests may be incomplete.")
     elif not os.listdir(test_path):
         logger.warning("Test directory is empty. Tests may be incomplete.")
 
-def run_test_commands():
-    req_file = "website/requirements.txt"
-    if os.path.exists(req_file):
-        try:
-            proc_install = subprocess.run(
-                ["pip", "install", "-r", req_file],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            logger.info(proc_install.stdout)
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Dependency installation failed: {e.stderr}")
-            return False
+def run_test_commands(files_dict=None, validated=False):
+    """
+    Install dependencies, run the security scan and the tests affected by
+    files_dict (all of them if it's None). The failure reason of a failing
+    run is kept in LAST_FAILURE_REASON for the next generation.
 
-    check_tests_exist()
+    validated=True means the tests already passed in a candidate worktree;
+    only the install and the scan run, on the files being promoted.
+    """
+    with tracer.span("test.pip"):
+        installed = not os.path.exists(environment.requirements_file) or install_requirements()
+    if not installed:
+        return False
 
-    bandit_installed = False
-    try:
-        subprocess.run(["bandit", "--version"], check=True, capture_output=True, text=True)
-        bandit_installed = True
-    except FileNotFoundError:
-        logger.info("bandit not found, skipping security scan.")
-    except subprocess.CalledProcessError:
-        logger.info("bandit found but returned an error; skipping.")
+    if not validated:
+        check_tests_exist()
 
-    if bandit_installed:
-        try:
+    # The scan runs alongside the tests, so a cycle waits for max(tests, scan)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="bandit") as pool:
+        scan = None
+        if security_scanner.available():
             logger.info("Running security scan with bandit...")
-            bandit_proc = subprocess.run(["bandit", "-r", "website"], capture_output=True, text=True)
-            logger.info(bandit_proc.stdout)
-            if bandit_proc.returncode != 0:
-                logger.warning("bandit detected potential issues. Review recommended.")
-        except Exception as e:
-            logger.error(f"Error running bandit: {e}")
-
-    try:
-        subprocess.check_call(["pytest", "website/tests/", "--maxfail=1"])
+            scan = pool.submit(traced_scan, list(files_dict) if files_dict else python_files("website"))
+        report = None
+        if not validated:
+            with tracer.span("test.pytest"):
+                report = test_runner.run(".", changed=list(files_dict) if files_dict else None)
+        if scan is not None:
+            try:
+                scan_report = scan.result()
+                logger.info(scan_report.summary())
+                if scan_report.findings:
+                    logger.warning("bandit detected potential issues. Review recommended.")
+            except Exception as e:
+                logger.error(f"Error running bandit: {e}")
+    return report is None or record_test_report(report)
+
+def traced_scan(paths):
+    with tracer.span("test.bandit"):
+        return security_scanner.scan(paths)
+
+def python_files(root):
+    return [
+        os.path.join(dirpath, fname)
+        for dirpath, _, filenames in os.walk(root)
+        for fname in filenames
+        if fname.endswith(".py")
+    ]
+
+def record_test_report(report):
+    global LAST_FAILURE_REASON
+    source = "cached" if report.cached else f"{report.duration:.1f}s"
+    if report.passed:
+        logger.info(f"Tests passed ({report.total} tests, {source}).")
+        LAST_FAILURE_REASON = ""
         return True
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Test failed: {e}")
-        return False
+    LAST_FAILURE_REASON = report.failure_reason()
+    logger.error(f"Test failed ({source}):\n{LAST_FAILURE_REASON}")
+    return False
 
 # -------------------------------------------------------------------------
 #  Git Helpers
@@ -484,11 +635,72 @@ def revert_to_latest_remote_commit():
     else:
         logger.info("Successfully cleaned untracked files/directories.")
 # -------------------------------------------------------------------------
-#  Restart Gunicorn Service
+#  Parallel Candidates
+# -------------------------------------------------------------------------
+def generate_validated_candidate(full_codebase):
+    """
+    Generate CANDIDATE_COUNT candidates concurrently and test each in its
+    own git worktree. Returns (files_dict, failure): the files of the first
+    candidate that passed and None, or {} and the cycle outcome when none
+    did: "api_error" if every candidate got an API error, "noop" if every
+    candidate was identical to the current tree, "no_files" if none
+    produced usable files, and "tests_failed" otherwise.
+    """
+    global LAST_FAILURE_REASON
+    noop = []
+    api_errors = []
+
+    def generate(index, stop):
+        ai_response, files_dict = generate_files(full_codebase, LAST_FAILURE_REASON, stop)
+        if not files_dict:
+            if ai_response.startswith("# [DeepSeek ERROR]"):
+                api_errors.append(index)
+            return {}
+        changed = filter_changed_files(files_dict)
+        if not changed:
+            noop.append(index)
+        return changed
+
+    def validate(files_dict, stop):
+        # The worktree's tests run with environment.python, so imports the
+        # candidate adds must be installed first or it can never pass
+        missing = import_scanner.missing_distributions(files_dict, environment.requirements_file)
+        if missing:
+            logger.info(f"Installing requirements for a candidate: {', '.join(missing)}")
+            try:
+                environment.install(missing)
+            except InstallError as e:
+                return False, f"Dependency installation failed: {e}"
+        with GitWorktree() as path:
+            apply_files(path, files_dict)
+            report = test_runner.run(path, changed=list(files_dict), stop=stop, timeout=CANDIDATE_TIMEOUT)
+        return report.passed, report.failure_reason()
+
+    logger.info(f"Generating {CANDIDATE_COUNT} candidates in parallel...")
+    winner, results = run_candidates(generate, validate, CANDIDATE_COUNT)
+    if winner:
+        LAST_FAILURE_REASON = ""
+        return winner.files, None
+    for result in results:
+        if result.reason:
+            logger.error(f"Candidate {result.index} failed: {result.reason}")
+            if result.files:
+                LAST_FAILURE_REASON = result.reason
+    if len(api_errors) == len(results):
+        return {}, "api_error"
+    if len(noop) == len(results):
+        return {}, "noop"
+    if not any(result.files for result in results):
+        return {}, "no_files"
+    return {}, "tests_failed"
+
+# -------------------------------------------------------------------------
+#  Deploy
 # -------------------------------------------------------------------------
 def restart_gunicorn_service():
     """
-    Restarts the gunicorn-theseus service.
+    Restarts the gunicorn-theseus service. Only used when there is no running
+    master to reload gracefully. Returns True on success.
     """
     logger.info("Restarting gunicorn-theseus service...")
     try:
@@ -499,46 +711,133 @@ def restart_gunicorn_service():
             text=True
         )
         logger.info(f"Gunicorn service restarted successfully: {result.stdout}")
+        return True
     except subprocess.CalledProcessError as e:
         logger.error(f"Failed to restart gunicorn-theseus service: {e.stderr}")
     except FileNotFoundError:
         logger.error("Systemctl not found. Ensure you are running this on a system with systemctl support.")
+    return False
+
+deployer = Deployer(
+    ["website"],
+    GracefulReloader(GUNICORN_PIDFILE, HEALTH_URL, timeout=RELOAD_TIMEOUT),
+    fallback=restart_gunicorn_service,
+)
+
+def deploy_site():
+    """
+    Reload the site if the deployed tree changed since the last deploy.
+    """
+    outcome = deployer.deploy()
+    tracer.count(f"deploy_{outcome}")
+    return outcome
 
 # -------------------------------------------------------------------------
 #  Main Automated Loop
 # -------------------------------------------------------------------------
+# Set by SIGTERM; cycles stop at the next checkpoint, run_forever stops sleeping
+shutdown_requested = threading.Event()
+
+class CycleInterrupted(Exception):
+    pass
+
+def request_shutdown(signum, frame):
+    logger.info(f"Received signal {signum}; stopping after the current phase.")
+    shutdown_requested.set()
+
+def checkpoint():
+    """
+    Abandon the cycle here if a shutdown was requested. Only called where
+    nothing in the tree has been changed yet; once files are written the
+    cycle runs on to its commit or revert.
+    """
+    if shutdown_requested.is_set():
+        raise CycleInterrupted()
+
+def traced_run(kind, cycle):
+    """
+    Run cycle() as one traced run, stored in the run store with the outcome
+    it returns. Returns the outcome.
+    """
+    tracer.start_run(kind)
+    outcome = "error"
+    try:
+        outcome = cycle()
+    except CycleInterrupted:
+        logger.info("Cycle stopped at a checkpoint before any files were written.")
+        outcome = "interrupted"
+    finally:
+        tracer.finish(outcome)
+    return outcome
+
 def main_loop():
+    """
+    One auto-dev cycle. Returns its outcome (see auto_dev_cycle).
+    """
     if not ENABLE_AUTODEV:
         logger.info("AUTO-DEV is disabled in config.yaml. Exiting.")
-        return
+        return "disabled"
 
-    logger.addHandler(console_handler)
+    enable_console_logging()
+    return traced_run("loop", auto_dev_cycle)
+
+def auto_dev_cycle():
+    """
+    Pull, generate, test and push one change. Returns the outcome: "pushed",
+    "push_failed", "tests_failed", "noop", "no_files", "api_error",
+    "no_context" or "dry_run".
+    """
+    global ATTEMPTED_COMMITS, SUCCESSFUL_COMMITS
+    tracer.phase("pull")
     git_command("pull", "origin", BRANCH_NAME)
 
-    full_codebase = gather_codebase()
+    checkpoint()
+    tracer.phase("context")
+    full_codebase = gather_codebase(LAST_FAILURE_REASON)
     if not full_codebase.strip():
         logger.error("No code files found to provide context to AI. Aborting.")
-        return
-
-    app_path = "website/app.py"
-    old_app_code = ""
-    if os.path.exists(app_path):
-        with open(app_path, "r", encoding="utf-8") as f:
-            old_app_code = f.read()
+        return "no_context"
+
+    # With parallel candidates, files_dict has already passed the tests in
+    # a worktree and the live tree is only written once it is known good.
+    validated = CANDIDATE_COUNT > 1
+    checkpoint()
+    tracer.phase("generate")
+    if validated:
+        files_dict, failure = generate_validated_candidate(full_codebase)
+        if failure == "noop":
+            record_noop_cycle()
+            return "noop"
+        if failure == "tests_failed":
+            logger.error("No candidate passed validation. Live tree left untouched.")
+        elif failure:
+            logger.error(f"No candidate produced usable files ({failure}). Live tree left untouched.")
+        if failure:
+            log_run_metrics()
+            return failure
+    else:
+        ai_response, files_dict = generate_files(full_codebase, LAST_FAILURE_REASON)
 
-    ai_response = generate_code_change(full_codebase)
-    files_dict = parse_ai_response_into_files(ai_response)
+        if not files_dict:
+            logger.error("No valid (or fully valid) file changes returned by AI. Aborting.")
+            revert_to_latest_remote_commit()
+            return "api_error" if ai_response.startswith("# [DeepSeek ERROR]") else "no_files"
 
-    if not files_dict:
-        logger.error("No valid (or fully valid) file changes returned by AI. Aborting.")
-        revert_to_latest_remote_commit()
-        return
+        files_dict = filter_changed_files(files_dict)
+        if not files_dict:
+            record_noop_cycle()
+            return "noop"
 
     template_references_check(files_dict)
 
     if DRY_RUN:
         logger.info("[DRY RUN] Would update files, but skipping actual writes/tests.")
-        return
+        return "dry_run"
+
+    checkpoint()
+    tracer.phase("write")
+    tracer.count("files_changed", len(files_dict))
+    old_files = read_current_files(files_dict)
 
     for filepath, code_str in files_dict.items():
         dir_path = os.path.dirname(filepath)
@@ -548,25 +847,31 @@ def main_loop():
             fw.write(code_str)
         logger.info(f"Updated file: {filepath}")
 
+    tracer.phase("requirements")
     detect_and_add_new_requirements(files_dict)
 
-    if "website/app.py" in files_dict and old_app_code:
-        new_app_code = files_dict["website/app.py"]
-        change_summary = generate_change_summary(old_app_code, new_app_code)
-    else:
-        change_summary = "Changes made to non-app.py files."
+    tracer.phase("summary")
+    change_summary = generate_change_summary(old_files, files_dict)
 
-    if run_test_commands():
+    tracer.phase("test")
+    tests_passed = run_test_commands(files_dict, validated=validated)
+    tracer.phase("git")
+    if tests_passed:
+        ATTEMPTED_COMMITS += 1
         git_command("add", ".")
         commit_msg = f"Auto-update from AI on {datetime.now().isoformat()}\n\n{change_summary}"
         git_command("commit", "-m", commit_msg)
         push_res = git_command("push", "origin", BRANCH_NAME)
         if push_res.returncode == 0:
+            SUCCESSFUL_COMMITS += 1
             logger.info("Successfully pushed changes.")
+            outcome = "pushed"
         else:
             logger.error("Push failed. Attempting revert to latest remote commit.")
             revert_to_latest_remote_commit()
+            outcome = "push_failed"
     else:
+        outcome = "tests_failed"
         logger.error("Tests failed for generated code. Reverting to latest remote commit.")
         revert_to_latest_remote_commit()
         force_push_res = git_command("push", "origin", BRANCH_NAME, "--force")
@@ -575,23 +880,31 @@ def main_loop():
         else:
             logger.error("Failed to push revert. Local is reverted, remote may be out of sync.")
 
-    # Restart Gunicorn Service
-    restart_gunicorn_service()
+    tracer.phase("deploy")
+    deploy_site()
 
     logger.info("Done with single-attempt auto-dev run.")
+    log_run_metrics()
+    return outcome
 
 # -------------------------------------------------------------------------
 #  Manual Run
 # -------------------------------------------------------------------------
 def manual_run():
-    logger.addHandler(console_handler)
+    enable_console_logging()
+    return traced_run("manual", manual_cycle)
+
+def manual_cycle():
     logger.info("Starting MANUAL RUN of AI code update process.")
 
+    tracer.phase("pull")
     git_command("pull", "origin", BRANCH_NAME)
-    full_codebase = gather_codebase()
+    checkpoint()
+    tracer.phase("context")
+    full_codebase = gather_codebase(LAST_FAILURE_REASON)
     if not full_codebase.strip():
         logger.error("No code files found to provide context. Aborting manual run.")
-        return
+        return "no_context"
 
     app_path = "website/app.py"
     old_app_code = ""
@@ -599,17 +912,28 @@ def manual_run():
         with open(app_path, "r", encoding="utf-8") as f:
             old_app_code = f.read()
 
-    ai_response = generate_code_change(full_codebase)
-    files_dict = parse_ai_response_into_files(ai_response)
+    checkpoint()
+    tracer.phase("generate")
+    ai_response, files_dict = generate_files(full_codebase, LAST_FAILURE_REASON)
     if not files_dict:
         logger.warning("AI did not return any valid file changes during manual run.")
-        return
+        return "api_error" if ai_response.startswith("# [DeepSeek ERROR]") else "no_files"
+
+    files_dict = filter_changed_files(files_dict)
+    if not files_dict:
+        record_noop_cycle()
+        return "noop"
 
     template_references_check(files_dict)
 
     if DRY_RUN:
         logger.info("[DRY RUN] Would update files, but skipping actual writes.")
-        return
+        return "dry_run"
+
+    checkpoint()
+    tracer.phase("write")
+    tracer.count("files_changed", len(files_dict))
+    old_files = read_current_files(files_dict)
 
     for filepath, code_str in files_dict.items():
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
@@ -617,15 +941,16 @@ def manual_run():
             fw.write(code_str)
         logger.info(f"[MANUAL RUN] Updated file: {filepath}")
 
+    tracer.phase("requirements")
     detect_and_add_new_requirements(files_dict)
 
-    if "website/app.py" in files_dict and old_app_code:
-        new_app_code = files_dict["website/app.py"]
-        change_summary = generate_change_summary(old_app_code, new_app_code)
-    else:
-        change_summary = "Changes made to non-app.py files."
+    tracer.phase("summary")
+    change_summary = generate_change_summary(old_files, files_dict)
 
-    if run_test_commands():
+    tracer.phase("test")
+    tests_passed = run_test_commands(files_dict)
+    tracer.phase("git")
+    if tests_passed:
         logger.info("Tests passed.")
         git_command("add", ".")
         commit_msg = f"Manual-run update from AI on {datetime.now().isoformat()}\n\n{change_summary}"
@@ -633,9 +958,10 @@ def manual_run():
         push_res = git_command("push", "origin", BRANCH_NAME)
         if push_res.returncode == 0:
             logger.info("Manual-run: Pushed successfully.")
-        else:
-            logger.error("Manual-run: Push failed. Reverting to latest remote commit.")
-            revert_to_latest_remote_commit()
+            return "pushed"
+        logger.error("Manual-run: Push failed. Reverting to latest remote commit.")
+        revert_to_latest_remote_commit()
+        return "push_failed"
     else:
         logger.error("Manual-run: Tests failed. Reverting local changes.")
         if old_app_code:
@@ -648,20 +974,45 @@ def manual_run():
             logger.info("Successfully forced a revert.")
         else:
             logger.error("Failed to push revert. Local is reverted, remote may differ.")
+        return "tests_failed"
 
 # -------------------------------------------------------------------------
 #  Run Forever
 # -------------------------------------------------------------------------
 def run_forever(interval_minutes=10):
+    """
+    Run cycles until interrupted, waiting between them as long as the
+    scheduler says: shorter after pushes, longer after wasted cycles, and
+    never faster than the hourly API budget allows. SIGTERM stops the loop
+    at the next safe point instead of killing a cycle mid-write.
+    """
+    signal.signal(signal.SIGTERM, request_shutdown)
+    scheduler = AdaptiveScheduler(
+        interval_minutes * 60,
+        min_seconds=MIN_INTERVAL_MINUTES * 60 if MIN_INTERVAL_MINUTES else None,
+        max_seconds=MAX_INTERVAL_MINUTES * 60 if MAX_INTERVAL_MINUTES else None,
+        hourly_tokens=HOURLY_TOKEN_BUDGET,
+        hourly_cost=HOURLY_COST_BUDGET,
+        prompt_price=PROMPT_TOKEN_PRICE,
+        completion_price=COMPLETION_TOKEN_PRICE,
+    )
     try:
-        while True:
-            main_loop()
-            logger.info(f"Sleeping for {interval_minutes} minutes before next run...")
-            time.sleep(interval_minutes * 60)
+        while not shutdown_requested.is_set():
+            outcome = main_loop()
+            if outcome == "disabled":
+                return
+            api = (tracer.last_record or {}).get("api", {})
+            scheduler.record(outcome, api.get("prompt_tokens", 0), api.get("completion_tokens", 0))
+            delay, reason = scheduler.next_delay()
+            log_context.set_phase("sleep")
+            logger.info(f"Sleeping for {delay / 60:.1f} minutes before next run ({reason})...")
+            shutdown_requested.wait(delay)
     except KeyboardInterrupt:
         logger.info("Received KeyboardInterrupt; exiting run_forever loop.")
-    # Restart Gunicorn Service
-    restart_gunicorn_service()
+    if shutdown_requested.is_set():
+        logger.info("Shutdown requested; exiting run_forever loop.")
+    # Picks up a deploy that failed in the last cycle
+    deploy_site()
     logger.info("Done with manual auto-dev run.")
 
 
@@ -681,12 +1032,6 @@ if __name__ == "__main__":
                     logger.error("Interval must be a positive integer. Using default (10 minutes).")
                     interval_minutes = 10
             except ValueError:
-            
-            
-
-                    logger.error("Interval must be a positive integer. Using default (10 minutes).")
-                    interval_minutes = 10
-            except ValueError:
                 logger.error("Invalid interval provided. Using default (10 minutes).")
 
     run_forever(interval_minutes=interval_minutes)
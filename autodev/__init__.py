@@ -0,0 +1,8 @@
+"""
+Support modules for auto_dev.py.
+
+Unlike auto_dev.py these have no import-time side effects (no config
+loading, no environment checks), so they can be imported by tests,
+benchmarks and offline tools. Everything logs under the "autodev" logger,
+which auto_dev.py wires to its own handlers.
+"""
@@ -0,0 +1,101 @@
+"""
+bench_context.py
+
+Compares the old gather_codebase (walk and read every file, concatenate all
+of it) with ContextBuilder on synthetic sites of growing size. Each site is
+archive/archive_12/app.py plus N generated route modules and templates.
+
+Reports time per cycle (the builder both cold and warm, i.e. with nothing
+changed since the last cycle except one edited file) and the prompt size in
+estimated tokens.
+
+Usage:
+    python autodev/benchmarks/bench_context.py [--sizes 20 100 500] [--budget 24000]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, REPO_ROOT)
+
+from autodev.context import ContextBuilder, estimate_tokens
+
+MODULE = '''from flask import render_template
+from .app import app
+
+
+@app.route('/feature{n}')
+def feature{n}():
+    """Feature page {n}."""
+    items = [{{'id': i, 'name': f'item {{i}}'}} for i in range(20)]
+    return render_template('feature{n}.html', items=items)
+'''
+
+TEMPLATE = '''{{% extends "base.html" %}}
+{{% block content %}}
+<h1>Feature {n}</h1>
+<ul>
+{{% for item in items %}}
+    <li>{{{{ item.name }}}}</li>
+{{% endfor %}}
+</ul>
+{{% endblock %}}
+'''
+
+
+def gather_all(root):
+    code_pieces = []
+    for dirpath, dirs, files in os.walk(root):
+        if "tests" in dirpath:
+            continue
+        for fname in files:
+            if fname.endswith(".py") or fname.endswith(".html"):
+                full_path = os.path.join(dirpath, fname)
+                with open(full_path, "r", encoding="utf-8") as f:
+                    code_pieces.append(f"### File: {full_path}\n{f.read()}\n")
+    return "\n".join(code_pieces)
+
+
+def build_site(root, n):
+    os.makedirs(os.path.join(root, "templates"))
+    shutil.copy(os.path.join(REPO_ROOT, "archive", "archive_12", "app.py"), os.path.join(root, "app.py"))
+    for i in range(n):
+        with open(os.path.join(root, f"feature{i}.py"), "w") as f:
+            f.write(MODULE.format(n=i))
+        with open(os.path.join(root, "templates", f"feature{i}.html"), "w") as f:
+            f.write(TEMPLATE.format(n=i))
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1e3
+
+
+def run(sizes, budget):
+    print(f"{'files':>6} {'gather (ms)':>12} {'tokens':>8} {'cold (ms)':>10} {'warm (ms)':>10} {'tokens':>8}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = os.path.join(tmpdir, "website")
+            build_site(root, n)
+            full, gather_ms = timed(lambda: gather_all(root))
+            builder = ContextBuilder(root, token_budget=budget)
+            _, cold_ms = timed(builder.build)
+            with open(os.path.join(root, "feature0.py"), "a") as f:
+                f.write("# edited\n")
+            context, warm_ms = timed(lambda: builder.build("FAILED tests/test_feature0.py"))
+            print(f"{2 * n + 1:>6} {gather_ms:>12.1f} {estimate_tokens(full):>8} "
+                  f"{cold_ms:>10.1f} {warm_ms:>10.1f} {estimate_tokens(context):>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 500])
+    parser.add_argument("--budget", type=int, default=24_000)
+    args = parser.parse_args()
+    run(args.sizes, args.budget)
@@ -0,0 +1,122 @@
+"""
+bench_deepseek_client.py
+
+Compares three ways of calling the chat-completions endpoint against the
+local mock server:
+
+    bare      - a new requests.post per call (the old call_deepseek_api)
+    pooled    - DeepSeekClient.complete(), keep-alive session
+    streamed  - DeepSeekClient.stream() fed into StreamingResponseParser
+
+For each it reports the median time until the first generated file is
+complete (parsed and syntax checked) and the median total wall time per
+call. The mock charges --connect-delay for every new connection (standing
+in for TCP+TLS setup) and --chunk-delay between streamed chunks (standing in
+for token generation).
+
+Usage:
+    python autodev/benchmarks/bench_deepseek_client.py [--calls 5] [--files 4]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from autodev.deepseek_client import DeepSeekClient
+from autodev.mock_deepseek import MockDeepSeekServer
+from autodev.parsing import StreamingResponseParser, parse_ai_response, python_syntax_error
+
+PAYLOAD = {"model": "deepseek-chat", "messages": [{"role": "user", "content": "change something"}]}
+
+
+def build_response(files, lines):
+    blocks = []
+    for n in range(files):
+        body = "\n".join(f"def handler_{n}_{i}():\n    return {i}\n" for i in range(lines))
+        blocks.append(f"File: website/module_{n}.py\n```python\n{body}\n```\n")
+    return "".join(blocks)
+
+
+def check(files):
+    for _, code in files:
+        python_syntax_error(code)
+
+
+def bare(url, calls):
+    for _ in range(calls):
+        start = time.perf_counter()
+        response = requests.post(url, json=PAYLOAD, headers={"Authorization": "Bearer test"}, timeout=60)
+        files = parse_ai_response(response.json()["choices"][0]["message"]["content"])
+        check(files.items())
+        elapsed = time.perf_counter() - start
+        yield elapsed, elapsed
+
+
+def pooled(url, calls):
+    client = DeepSeekClient("test", url)
+    try:
+        for _ in range(calls):
+            start = time.perf_counter()
+            files = parse_ai_response(client.complete(PAYLOAD)["choices"][0]["message"]["content"])
+            check(files.items())
+            elapsed = time.perf_counter() - start
+            yield elapsed, elapsed
+    finally:
+        client.close()
+
+
+def streamed(url, calls):
+    client = DeepSeekClient("test", url)
+    try:
+        for _ in range(calls):
+            start = time.perf_counter()
+            first = None
+            parser = StreamingResponseParser()
+            for chunk in client.stream(PAYLOAD):
+                completed = parser.feed(chunk)
+                check(completed)
+                if completed and first is None:
+                    first = time.perf_counter() - start
+            check(parser.close())
+            elapsed = time.perf_counter() - start
+            yield first or elapsed, elapsed
+    finally:
+        client.close()
+
+
+def run(args):
+    text = build_response(args.files, args.lines)
+    print(f"{len(text)} characters, {args.files} files, {args.chunk_size}-character chunks")
+    print(f"{'client':<9} {'first file (ms)':>16} {'total (ms)':>12} {'connections':>12}")
+    for name, func in (("bare", bare), ("pooled", pooled), ("streamed", streamed)):
+        server = MockDeepSeekServer(
+            response_text=text,
+            chunk_size=args.chunk_size,
+            chunk_delay=args.chunk_delay,
+            first_delay=args.first_delay,
+            connect_delay=args.connect_delay,
+        )
+        with server:
+            samples = list(func(server.url, args.calls))
+            connections = server.connections
+        first = statistics.median(s[0] for s in samples)
+        total = statistics.median(s[1] for s in samples)
+        print(f"{name:<9} {first * 1e3:>16.1f} {total * 1e3:>12.1f} {connections:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5)
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--lines", type=int, default=40, help="functions per generated file")
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--chunk-delay", type=float, default=0.002)
+    parser.add_argument("--first-delay", type=float, default=0.2)
+    parser.add_argument("--connect-delay", type=float, default=0.1)
+    run(parser.parse_args())
@@ -0,0 +1,79 @@
+"""
+bench_edit_format.py
+
+Compares the output a one-line change costs in the two response formats on
+synthetic app.py files of growing size (N routes): the whole file back in
+a "File:" block, against a SEARCH/REPLACE edit with a few lines of context.
+
+Reports the response size in estimated tokens, the useful changes per 1000
+output tokens, whether the whole file would even fit in MAX_TOKENS, and the
+time to parse and apply the edit.
+
+Usage:
+    python autodev/benchmarks/bench_edit_format.py [--routes 10 40 160] [--max-tokens 4000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, REPO_ROOT)
+
+from autodev.context import estimate_tokens
+from autodev.parsing import parse_ai_blocks
+from autodev.patching import EditApplier
+
+ROUTE = '''
+
+@app.route('/feature{n}')
+def feature{n}():
+    """Feature page {n}."""
+    items = [{{'id': i, 'name': f'item {{i}}'}} for i in range(20)]
+    if not items:
+        flash('Nothing to show yet.')
+    return render_template('feature{n}.html', items=items)
+'''
+
+
+def make_app(routes):
+    head = "from flask import Flask, flash, render_template\n\napp = Flask(__name__)\n"
+    return head + "".join(ROUTE.format(n=n) for n in range(routes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routes", type=int, nargs="+", default=[10, 40, 160])
+    parser.add_argument("--max-tokens", type=int, default=4000)
+    args = parser.parse_args()
+
+    print(f"{'routes':>7} {'full tok':>9} {'edit tok':>9} {'fits':>5} {'chg/1k full':>12} {'chg/1k edit':>12} {'apply ms':>9}")
+    for routes in args.routes:
+        app = make_app(routes)
+        target = routes // 2
+        old = f"    \"\"\"Feature page {target}.\"\"\"\n    items = [{{'id': i, 'name': f'item {{i}}'}} for i in range(20)]"
+        new = old.replace("range(20)", "range(50)")
+        full_response = "File: website/app.py\n```python\n" + app.replace(old, new) + "```\n"
+        edit_response = (
+            "File: website/app.py\n<<<<<<< SEARCH\n" + old + "\n=======\n" + new + "\n>>>>>>> REPLACE\n"
+        )
+
+        applier = EditApplier()
+        applier._read = lambda path: app
+        start = time.perf_counter()
+        applier.resolve_all(parse_ai_blocks(edit_response))
+        apply_ms = (time.perf_counter() - start) * 1000
+        assert applier.files["website/app.py"] == app.replace(old, new)
+
+        full_tokens = estimate_tokens(full_response)
+        edit_tokens = estimate_tokens(edit_response)
+        fits = "yes" if full_tokens <= args.max_tokens else "no"
+        print(
+            f"{routes:>7} {full_tokens:>9} {edit_tokens:>9} {fits:>5} "
+            f"{1000 / full_tokens:>12.2f} {1000 / edit_tokens:>12.2f} {apply_ms:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
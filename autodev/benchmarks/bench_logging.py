@@ -0,0 +1,141 @@
+"""
+bench_logging.py
+
+Replays the history in logs/auto_dev.log.* through the old synchronous
+RotatingFileHandler (1 MB x 5) and through the queued JSON-lines pipeline
+of autodev/logsetup.py with its default caps, and reports:
+
+    - time spent in the logging call itself (what the loop waits for),
+      total and worst case;
+    - bytes on disk afterwards, with each setup's rotation and pruning;
+    - retention: how much of the original log text is still readable
+      (a pruned blob only keeps its preview).
+
+Replay a few times (--repeat) to fill both setups past their caps.
+
+Usage:
+    python autodev/benchmarks/bench_logging.py [--logs logs] [--repeat 1]
+"""
+
+import argparse
+import glob
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, REPO_ROOT)
+
+from autodev.logsetup import BlobStore, LogContext, _stop_listener, iter_records, start_logging
+
+ENTRY_START = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3} \[(\w+)\] ")
+
+
+def read_entries(log_dir):
+    """
+    (level, message) for every entry of the old text logs, oldest first.
+    """
+    paths = sorted(glob.glob(os.path.join(log_dir, "auto_dev.log.*")), key=lambda p: -int(p.rsplit(".", 1)[1]))
+    if os.path.exists(os.path.join(log_dir, "auto_dev.log")):
+        paths.append(os.path.join(log_dir, "auto_dev.log"))
+    entries = []
+    for path in paths:
+        level, lines = None, []
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                match = ENTRY_START.match(line)
+                if match:
+                    if level:
+                        entries.append((level, "".join(lines).rstrip("\n")))
+                    level, lines = match.group(1), [line[match.end():]]
+                elif level:
+                    lines.append(line)
+        if level:
+            entries.append((level, "".join(lines).rstrip("\n")))
+    return entries
+
+
+def disk_usage(root):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+
+
+def retained_history(log_file, blob_dir):
+    """
+    Characters of log text that can still be read back from the new logs.
+    """
+    blobs = BlobStore(blob_dir)
+    total = 0
+    for record in iter_records(log_file):
+        if "blob" in record and os.path.exists(blobs.path(record["blob"])):
+            total += record["size"]
+        else:
+            total += len(record["msg"])
+    return total
+
+
+def replay(logger, entries):
+    worst = 0.0
+    start = time.perf_counter()
+    for level, message in entries:
+        t = time.perf_counter()
+        logger.log(logging.getLevelName(level), message)
+        worst = max(worst, time.perf_counter() - t)
+    return time.perf_counter() - start, worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logs", default=os.path.join(REPO_ROOT, "logs"))
+    parser.add_argument("--repeat", type=int, default=1, help="replay the history this many times")
+    args = parser.parse_args()
+
+    # Tag each replay, so repeated responses aren't deduplicated into one blob
+    entries = [
+        (level, f"{message}\n(replay {i})" if i else message)
+        for i in range(args.repeat) for level, message in read_entries(args.logs)
+    ]
+    if not entries:
+        sys.exit(f"No log entries found in {args.logs}/auto_dev.log*; nothing to replay.")
+    history = sum(len(message) for _, message in entries)
+    print(f"{len(entries)} entries, {history / 1e6:.1f} MB of log text\n")
+    print(f"{'handler':<12} {'call total s':>13} {'worst call ms':>14} {'disk MB':>8} {'history kept MB':>16}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_dir = os.path.join(tmp, "old")
+        os.makedirs(old_dir)
+        old = logging.getLogger("bench.old")
+        old.propagate = False
+        old.setLevel(logging.DEBUG)
+        handler = RotatingFileHandler(os.path.join(old_dir, "auto_dev.log"), maxBytes=1_000_000, backupCount=5)
+        handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+        old.addHandler(handler)
+        total, worst = replay(old, entries)
+        handler.close()
+        usage = disk_usage(old_dir)
+        kept = sum(len(message) for _, message in read_entries(old_dir))
+        print(f"{'rotating':<12} {total:>13.2f} {worst * 1000:>14.2f} {usage / 1e6:>8.2f} {kept / 1e6:>16.2f}")
+
+        new_dir = os.path.join(tmp, "new")
+        new = logging.getLogger("bench.new")
+        new.propagate = False
+        new.setLevel(logging.DEBUG)
+        context = LogContext()
+        context.new_run()
+        log_file, blob_dir = os.path.join(new_dir, "auto_dev.jsonl"), os.path.join(new_dir, "blobs")
+        listener = start_logging([new], log_file, blob_dir, context)
+        total, worst = replay(new, entries)
+        drain_start = time.perf_counter()
+        _stop_listener(listener)
+        drain = time.perf_counter() - drain_start
+        usage = disk_usage(new_dir)
+        kept = retained_history(log_file, blob_dir)
+        print(f"{'queued json':<12} {total:>13.2f} {worst * 1000:>14.2f} {usage / 1e6:>8.2f} {kept / 1e6:>16.2f}")
+        print(f"\n(background writer needed another {drain:.2f} s to drain the queue)")
+
+
+if __name__ == "__main__":
+    main()
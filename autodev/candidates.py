@@ -0,0 +1,163 @@
+"""
+candidates.py
+
+Generates several AI candidates at once and validates each one in its own
+temporary git worktree, so the live tree is only touched by a candidate that
+has already passed.
+
+run_candidates() runs generate -> validate for each candidate on a thread
+pool and stops at the first one that passes. The other candidates are told
+to stop: generation is abandoned (so no more tokens are spent on them),
+candidates that got that far skip validation, and running test processes
+are terminated. run_candidates() waits for them to wind down before
+returning, so their API usage and worktrees are settled within the run.
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+FAILURE_TAIL_LINES = 30
+
+
+class CandidateResult:
+    def __init__(self, index, files, passed=False, reason="", duration=0.0):
+        self.index = index
+        self.files = files
+        self.passed = passed
+        self.reason = reason
+        self.duration = duration
+
+
+class GitWorktree:
+    """
+    A detached worktree of HEAD in a temporary directory, removed on exit.
+    """
+
+    def __init__(self, repo_root=".", prefix="autodev-candidate-"):
+        self.repo_root = repo_root
+        self.prefix = prefix
+        self.path = None
+
+    def __enter__(self):
+        self.path = tempfile.mkdtemp(prefix=self.prefix)
+        subprocess.run(
+            ["git", "worktree", "add", "--detach", self.path, "HEAD"],
+            cwd=self.repo_root, check=True, capture_output=True, text=True,
+        )
+        return self.path
+
+    def __exit__(self, *exc_info):
+        result = subprocess.run(
+            ["git", "worktree", "remove", "--force", self.path],
+            cwd=self.repo_root, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            logger.warning(f"Could not remove worktree {self.path}: {result.stderr.strip()}")
+            shutil.rmtree(self.path, ignore_errors=True)
+            subprocess.run(["git", "worktree", "prune"], cwd=self.repo_root, capture_output=True)
+
+
+def apply_files(root, files_dict):
+    for filepath, code_str in files_dict.items():
+        target = os.path.join(root, filepath)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "w", encoding="utf-8") as fw:
+            fw.write(code_str)
+
+
+def run_command(command, cwd, stop=None, timeout=None):
+    """
+    Run command in cwd, terminating it early if stop is set or timeout
+    passes. Returns (returncode, output); returncode is None if it was
+    stopped. Output goes through a temporary file so a chatty test run can't
+    fill a pipe and stall.
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+    with tempfile.TemporaryFile(mode="w+", encoding="utf-8") as out:
+        proc = subprocess.Popen(command, cwd=cwd, stdout=out, stderr=subprocess.STDOUT, text=True)
+        try:
+            while proc.poll() is None:
+                if (stop is not None and stop.is_set()) or (deadline and time.monotonic() > deadline):
+                    proc.terminate()
+                    try:
+                        proc.wait(timeout=5)
+                    except subprocess.TimeoutExpired:
+                        proc.kill()
+                        proc.wait()
+                    break
+                time.sleep(0.05)
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+        out.seek(0)
+        output = out.read()
+    stopped = stop is not None and stop.is_set() and proc.returncode < 0
+    return (None if stopped else proc.returncode), output
+
+
+def validate_in_worktree(files_dict, test_command, repo_root=".", stop=None, timeout=None):
+    """
+    Apply files_dict to a fresh worktree of HEAD and run test_command there.
+    Returns (passed, reason).
+    """
+    with GitWorktree(repo_root) as path:
+        apply_files(path, files_dict)
+        returncode, output = run_command(test_command, path, stop=stop, timeout=timeout)
+    if returncode == 0:
+        return True, ""
+    if returncode is None:
+        return False, "Stopped before tests finished."
+    tail = "\n".join(output.strip().splitlines()[-FAILURE_TAIL_LINES:])
+    return False, f"Tests failed (exit code {returncode}):\n{tail}"
+
+
+def run_candidates(generate, validate, count):
+    """
+    Run count candidates in parallel. generate(index, stop) returns a files
+    dict (empty if the candidate is unusable or was stopped); validate(files, stop) returns
+    (passed, reason). Returns (winner, results): the first passing
+    CandidateResult or None, and every result finished by then.
+    """
+    stop = threading.Event()
+
+    def attempt(index):
+        start = time.perf_counter()
+        files = generate(index, stop)
+        if not files:
+            return CandidateResult(index, files, reason="No usable files.", duration=time.perf_counter() - start)
+        if stop.is_set():
+            return CandidateResult(index, files, reason="Another candidate already passed.")
+        passed, reason = validate(files, stop)
+        return CandidateResult(index, files, passed, reason, time.perf_counter() - start)
+
+    pool = ThreadPoolExecutor(max_workers=count, thread_name_prefix="candidate")
+    futures = [pool.submit(attempt, i) for i in range(count)]
+    winner = None
+    results = []
+    try:
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Candidate raised an error: {e}")
+                continue
+            results.append(result)
+            if result.passed:
+                logger.info(f"Candidate {result.index} passed after {result.duration:.1f}s.")
+                winner = result
+                break
+            logger.info(f"Candidate {result.index} rejected: {result.reason.splitlines()[0] if result.reason else ''}")
+    finally:
+        stop.set()
+        # Stragglers abandon their streams and tests once stop is set
+        pool.shutdown(wait=True, cancel_futures=True)
+    return winner, results
@@ -0,0 +1,274 @@
+"""
+context.py
+
+Builds the codebase context sent to the AI each cycle.
+
+ContextBuilder keeps the contents of every source file under the site
+directory cached by (mtime, size), so a cycle only re-reads files that
+changed since the last one. Files are ranked by relevance and packed into a
+token budget:
+
+    1. files named in the failure reason (or the modules under a failing test)
+    2. entry points and modules that define routes
+    3. templates and modules those route modules reference
+    4. everything else, most recently modified first
+
+Every file first gets a skeleton (imports, signatures and first docstring
+lines for Python; Jinja tags for templates), and files are then upgraded to
+their full text in order of relevance while the budget lasts. Files whose
+skeleton no longer fits are only listed by path, so the prompt stays
+bounded however large the site grows.
+"""
+
+import ast
+import hashlib
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = 24_000
+CHARS_PER_TOKEN = 4
+SOURCE_EXTENSIONS = (".py", ".html")
+ENTRY_POINTS = ("app.py", "__init__.py")
+
+ROUTE_PATTERN = re.compile(r"@\w+\.route\(")
+TEMPLATE_PATTERN = re.compile(r"""render_template\(\s*['"]([^'"]+)['"]""")
+LOCAL_IMPORT_PATTERN = re.compile(r"^\s*from\s+(?:\.|website\.)(\w+)\s+import", re.MULTILINE)
+JINJA_TAG_PATTERN = re.compile(r"{%.*?%}")
+FILE_REFERENCE_PATTERN = re.compile(r"[\w/.-]+\.(?:py|html)\b")
+
+FULL_HEADER = "### File: {path}\n"
+SKELETON_HEADER = "### File: {path} (skeleton, bodies omitted)\n"
+
+# Relevance tiers, highest first
+FAILING, ROUTES, REFERENCED, OTHER = 3, 2, 1, 0
+
+
+def estimate_tokens(text):
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def python_skeleton(source):
+    """
+    Reduce a module to its imports, top-level names and the signatures and
+    first docstring lines of its functions and classes.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return "\n".join(source.splitlines()[:20])
+    lines = source.splitlines()
+    out = []
+
+    def visit(nodes, indent):
+        for node in nodes:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                out.extend(lines[node.lineno - 1:node.end_lineno])
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                start = min([d.lineno for d in node.decorator_list] + [node.lineno])
+                out.extend(lines[start - 1:node.body[0].lineno - 1])
+                docstring = ast.get_docstring(node)
+                if docstring:
+                    out.append(f'{indent}    """{docstring.strip().splitlines()[0]}"""')
+                if isinstance(node, ast.ClassDef):
+                    visit(node.body, indent + "    ")
+                else:
+                    out.append(f"{indent}    ...")
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)) and not indent:
+                if node.lineno == node.end_lineno:
+                    out.append(lines[node.lineno - 1])
+                else:
+                    out.append(lines[node.lineno - 1].split("=")[0].rstrip() + " = ...")
+
+    visit(tree.body, "")
+    return "\n".join(out)
+
+
+def template_skeleton(source):
+    return "\n".join(JINJA_TAG_PATTERN.findall(source))
+
+
+class _CachedFile:
+    __slots__ = ("path", "stamp", "text", "digest", "tokens", "references", "_skeleton", "_skeleton_tokens")
+
+    def __init__(self, path, stamp, text):
+        self.path = path
+        self.stamp = stamp
+        self.text = text
+        self.digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        self.tokens = estimate_tokens(text)
+        self.references = self._scan_references() if path.endswith(".py") else None
+        self._skeleton = None
+        self._skeleton_tokens = None
+
+    def _scan_references(self):
+        """
+        For entry points and route modules, the template and local module
+        basenames they reference. None for every other file.
+        """
+        if os.path.basename(self.path) not in ENTRY_POINTS and not ROUTE_PATTERN.search(self.text):
+            return None
+        references = {os.path.basename(t) for t in TEMPLATE_PATTERN.findall(self.text)}
+        references.update(f"{m}.py" for m in LOCAL_IMPORT_PATTERN.findall(self.text))
+        return references
+
+    @property
+    def skeleton(self):
+        if self._skeleton is None:
+            if self.path.endswith(".py"):
+                self._skeleton = python_skeleton(self.text)
+            else:
+                self._skeleton = template_skeleton(self.text)
+        return self._skeleton
+
+    @property
+    def skeleton_tokens(self):
+        if self._skeleton_tokens is None:
+            self._skeleton_tokens = estimate_tokens(self.skeleton)
+        return self._skeleton_tokens
+
+
+class ContextBuilder:
+    def __init__(self, root="website", token_budget=DEFAULT_TOKEN_BUDGET, exclude_dirs=("tests", "benchmarks")):
+        self.root = root
+        self.token_budget = token_budget
+        self.exclude_dirs = set(exclude_dirs)
+        self._cache = {}
+        self.last_stats = {}
+
+    def refresh(self):
+        """
+        Bring the cache in line with the tree, reading only files whose
+        mtime or size changed. Returns the number of files read.
+        """
+        seen = set()
+        reads = 0
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = sorted(d for d in dirnames if d not in self.exclude_dirs and d != "__pycache__")
+            for fname in sorted(filenames):
+                if not fname.endswith(SOURCE_EXTENSIONS):
+                    continue
+                path = os.path.join(dirpath, fname)
+                seen.add(path)
+                try:
+                    st = os.stat(path)
+                    stamp = (st.st_mtime_ns, st.st_size)
+                    cached = self._cache.get(path)
+                    if cached is not None and cached.stamp == stamp:
+                        continue
+                    with open(path, "r", encoding="utf-8") as f:
+                        fresh = _CachedFile(path, stamp, f.read())
+                    reads += 1
+                    if cached is not None and cached.digest == fresh.digest:
+                        # Touched but not changed (e.g. by a git checkout)
+                        cached.stamp = stamp
+                    else:
+                        self._cache[path] = fresh
+                except (OSError, UnicodeDecodeError) as e:
+                    logger.warning(f"Error reading file {path}: {e}")
+                    self._cache.pop(path, None)
+        for path in set(self._cache) - seen:
+            del self._cache[path]
+        return reads
+
+    def rank(self, failure_reason=""):
+        """
+        Return cached paths ordered from most to least relevant.
+        """
+        failing = self._failure_targets(failure_reason)
+        route_files = set()
+        referenced = set()
+        for path, cached in self._cache.items():
+            if cached.references is not None:
+                route_files.add(path)
+                referenced.update(cached.references)
+
+        def score(path):
+            name = os.path.basename(path)
+            if name in failing:
+                tier = FAILING
+            elif path in route_files:
+                tier = ROUTES
+            elif name in referenced:
+                tier = REFERENCED
+            else:
+                tier = OTHER
+            return (-tier, -self._cache[path].stamp[0], path)
+
+        return sorted(self._cache, key=score)
+
+    def build(self, failure_reason=""):
+        """
+        Return the context string for this cycle, within the token budget.
+        """
+        reads = self.refresh()
+        ranked = self.rank(failure_reason)
+
+        # Every file that fits gets at least its skeleton, then files are
+        # upgraded to full text in order of relevance.
+        remaining = self.token_budget
+        shown = []
+        omitted = []
+        for path in ranked:
+            cost = estimate_tokens(SKELETON_HEADER.format(path=path)) + self._cache[path].skeleton_tokens
+            if cost <= remaining:
+                shown.append(path)
+                remaining -= cost
+            else:
+                omitted.append(path)
+        full_paths = set()
+        for path in shown:
+            cached = self._cache[path]
+            extra = (estimate_tokens(FULL_HEADER.format(path=path)) + cached.tokens
+                     - estimate_tokens(SKELETON_HEADER.format(path=path)) - cached.skeleton_tokens)
+            if extra <= remaining:
+                full_paths.add(path)
+                remaining -= extra
+
+        pieces = [FULL_HEADER.format(path=p) + self._cache[p].text + "\n" for p in shown if p in full_paths]
+        skeletons = [SKELETON_HEADER.format(path=p) + self._cache[p].skeleton + "\n" for p in shown if p not in full_paths]
+        pieces.extend(skeletons)
+        if omitted:
+            pieces.append(self._omitted_note(omitted, remaining))
+        context = "\n".join(pieces)
+        self.last_stats = {
+            "files": len(self._cache),
+            "read": reads,
+            "full": len(self._cache) - len(skeletons) - len(omitted),
+            "skeleton": len(skeletons),
+            "omitted": len(omitted),
+            "tokens": estimate_tokens(context),
+        }
+        logger.info(
+            "Context: {files} files ({read} re-read), {full} full, {skeleton} skeleton, "
+            "{omitted} omitted, ~{tokens} tokens".format(**self.last_stats)
+        )
+        return context
+
+    @staticmethod
+    def _omitted_note(omitted, remaining):
+        listed = []
+        for path in omitted:
+            remaining -= estimate_tokens(path) + 1
+            if remaining < 0:
+                break
+            listed.append(path)
+        note = "### Other files (not shown): " + ", ".join(listed)
+        if len(listed) < len(omitted):
+            note += f" and {len(omitted) - len(listed)} more"
+        return note + "\n"
+
+    def _failure_targets(self, failure_reason):
+        """
+        Basenames of the files a failure points at: any file it names, and
+        for a failing tests/test_x.py, the module x.py it exercises.
+        """
+        targets = set()
+        for reference in FILE_REFERENCE_PATTERN.findall(failure_reason):
+            name = os.path.basename(reference)
+            targets.add(name)
+            if name.startswith("test_"):
+                targets.add(name[len("test_"):])
+        return targets
@@ -0,0 +1,168 @@
+"""
+deepseek_client.py
+
+A pooled, keep-alive client for the DeepSeek chat-completions API.
+
+One requests.Session is kept for the life of the process, so only the first
+call pays for TCP and TLS setup; later calls reuse a connection from the
+pool. complete() returns the whole JSON response like the old bare
+requests.post did. stream() sends "stream": true and yields content deltas
+from the server-sent events as they arrive, so callers can start parsing
+before the completion is finished.
+
+The client also keeps running totals of requests, failed attempts, time
+spent waiting on the API and token usage (as reported by the API; streamed
+calls ask for it with stream_options.include_usage). A stream the caller
+closes early never receives the usage event, so it is counted with an
+estimate from the prompt and the text received. stats() returns a
+snapshot, so callers can diff two snapshots to cost a single cycle.
+"""
+
+import json
+import logging
+import threading
+import time
+from time import perf_counter
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from autodev.context import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 60
+POOL_SIZE = 4
+
+
+class DeepSeekClient:
+    def __init__(self, api_key, url, retries=3, timeout=DEFAULT_TIMEOUT, pool_size=POOL_SIZE):
+        self.url = url
+        self.retries = retries
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        })
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "failures": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _record(self, started, failed=False, usage=None):
+        with self._stats_lock:
+            self._stats["requests"] += 1
+            self._stats["failures"] += failed
+            self._stats["seconds"] += perf_counter() - started
+            if usage:
+                self._stats["prompt_tokens"] += usage.get("prompt_tokens") or 0
+                self._stats["completion_tokens"] += usage.get("completion_tokens") or 0
+
+    def complete(self, payload):
+        """
+        POST payload and return the response JSON, retrying with exponential
+        backoff. Returns None once every attempt has failed.
+        """
+        for attempt in range(self.retries):
+            started = perf_counter()
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout)
+                response.raise_for_status()
+                result = response.json()
+                self._record(started, usage=result.get("usage"))
+                return result
+            except requests.exceptions.RequestException as e:
+                self._record(started, failed=True)
+                if not self._backoff(attempt, e):
+                    return None
+        return None
+
+    def stream(self, payload):
+        """
+        POST payload with "stream": true and yield each content delta as it
+        arrives. Failures before the first delta are retried like
+        complete(); once output has been yielded a failure is raised to the
+        caller, since replaying the request would duplicate text. Yields
+        nothing if every attempt fails.
+        """
+        payload = dict(payload, stream=True, stream_options={"include_usage": True})
+        for attempt in range(self.retries):
+            received = []
+            recorded = False
+            request_started = perf_counter()
+            usage = {}
+            try:
+                with self.session.post(self.url, json=payload, timeout=self.timeout, stream=True) as response:
+                    response.raise_for_status()
+                    for delta in self._iter_deltas(response, usage):
+                        received.append(delta)
+                        yield delta
+                self._record(request_started, usage=usage)
+                recorded = True
+                return
+            except requests.exceptions.RequestException as e:
+                self._record(request_started, failed=True, usage=usage)
+                recorded = True
+                if received:
+                    logger.error(f"DeepSeek stream interrupted: {e}")
+                    raise
+                if not self._backoff(attempt, e):
+                    return
+            finally:
+                # Closed by the caller (GeneratorExit) or any other error: the
+                # request still happened and was billed
+                if not recorded:
+                    self._record(request_started, usage=usage or self._estimate_usage(payload, received))
+
+    @staticmethod
+    def _estimate_usage(payload, received):
+        prompt = "".join(str(message.get("content", "")) for message in payload.get("messages", []))
+        return {"prompt_tokens": estimate_tokens(prompt), "completion_tokens": estimate_tokens("".join(received))}
+
+    def close(self):
+        self.session.close()
+
+    def _backoff(self, attempt, error):
+        logger.error(f"DeepSeek API call failed (attempt {attempt+1}): {error}")
+        if attempt < self.retries - 1:
+            backoff_time = 2 ** attempt
+            logger.info(f"Retrying in {backoff_time} seconds...")
+            time.sleep(backoff_time)
+            return True
+        logger.error("All attempts to call DeepSeek API have failed.")
+        return False
+
+    @staticmethod
+    def _iter_deltas(response, usage):
+        # SSE is always UTF-8, whatever charset requests guesses for it.
+        # Read through to the end of the body even after [DONE], otherwise
+        # urllib3 drops the connection instead of returning it to the pool.
+        done = False
+        for raw_line in response.iter_lines():
+            line = raw_line.decode("utf-8")
+            if done or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                done = True
+                continue
+            try:
+                event = json.loads(data)
+                # The usage event comes last, with an empty choices list
+                if event.get("usage"):
+                    usage.update(event["usage"])
+                if not event["choices"] and event.get("usage"):
+                    continue
+                choice = event["choices"][0]
+            except (ValueError, KeyError, IndexError) as e:
+                logger.warning(f"Skipping malformed stream event: {e}")
+                continue
+            content = choice.get("delta", {}).get("content")
+            if content:
+                yield content
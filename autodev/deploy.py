@@ -0,0 +1,238 @@
+"""
+deploy.py
+
+Puts a new release of the site in front of users without dropping requests,
+and only when there is a new release.
+
+Deployer fingerprints the deployed tree (website/, minus tests, benchmarks,
+caches and database files) and compares it with the fingerprint of the last
+successful deploy, kept in a small JSON state file. Cycles whose tests
+failed, whose push was reverted, or that only touched tests leave the
+fingerprint unchanged and nothing is reloaded.
+
+When the tree did change, GracefulReloader does a rolling reload through
+gunicorn's binary upgrade rather than HUP: the site runs with --preload, so
+HUP would fork new workers from a master that still holds the old code.
+The sequence is:
+
+    1. USR2 to the running master. It execs a new master that inherits the
+       listening socket and writes <pidfile>.2, so the port never closes.
+    2. Poll the health URL until a worker of the new master answers 200.
+       Old and new workers accept from the same socket meanwhile.
+    3. TERM to the old master. Its workers finish their requests and exit,
+       and the new master takes over <pidfile>.
+
+If the new master exits or never becomes healthy, it is sent TERM and the
+old master keeps serving as if nothing happened.
+
+If no master is running under the pidfile (first boot, or gunicorn started
+without --pid), Deployer falls back to the given restart function.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import signal
+import time
+import urllib.request
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_FILE = ".autodev/deploy-state.json"
+SKIP_DIRS = {"__pycache__", "tests", "benchmarks"}
+SKIP_SUFFIXES = (".pyc", ".db", ".db-shm", ".db-wal", ".log")
+
+
+def deployed_files(paths):
+    """
+    The files of paths that make up a release, in a stable order.
+    """
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        for root, dirs, names in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and not d.startswith("."))
+            for name in sorted(names):
+                if not name.startswith(".") and not name.endswith(SKIP_SUFFIXES):
+                    yield os.path.join(root, name)
+
+
+def tree_fingerprint(paths):
+    digest = hashlib.sha256()
+    for path in deployed_files(paths):
+        digest.update(path.replace(os.sep, "/").encode("utf-8") + b"\0")
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def read_pid(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    # A zombie has already exited and is only waiting to be reaped
+    try:
+        with open(f"/proc/{pid}/stat", "r", encoding="utf-8") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except (OSError, IndexError):
+        return True
+
+
+class ReloadError(Exception):
+    pass
+
+
+class GracefulReloader:
+    def __init__(self, pidfile, health_url, timeout=60.0, poll_interval=0.1):
+        self.pidfile = pidfile
+        self.health_url = health_url
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+    def running(self):
+        """
+        The pid of the live master, or None.
+        """
+        pid = read_pid(self.pidfile)
+        if pid is not None and pid_alive(pid):
+            return pid
+        return None
+
+    def reload(self):
+        """
+        Replace the running master and its workers with new ones. Returns the
+        new master's pid. Raises ReloadError, with the old master still
+        serving, if the new one doesn't come up healthy.
+        """
+        old = self.running()
+        if old is None:
+            raise ReloadError(f"no master running under {self.pidfile}")
+        upgrade_pidfile = self.pidfile + ".2"
+        pending = read_pid(upgrade_pidfile)
+        if pending is not None and pid_alive(pending):
+            raise ReloadError(f"an upgrade is already in progress (master {pending})")
+
+        deadline = time.monotonic() + self.timeout
+        logger.info(f"Starting a new master next to master {old}...")
+        os.kill(old, signal.SIGUSR2)
+        new = self._wait(lambda: self._new_master(upgrade_pidfile, old), deadline, "the new master to start")
+        try:
+            self._wait(lambda: self._healthy(new), deadline, "the new workers to pass the health check", watch=new)
+        except ReloadError:
+            if pid_alive(new):
+                os.kill(new, signal.SIGTERM)
+            raise
+
+        logger.info(f"Master {new} is healthy; retiring master {old}.")
+        os.kill(old, signal.SIGTERM)
+        try:
+            self._wait(lambda: read_pid(self.pidfile) == new, deadline, f"master {new} to take over {self.pidfile}")
+        except ReloadError as e:
+            # The new release is serving either way; only the pidfile lags
+            logger.warning(str(e))
+        return new
+
+    def _new_master(self, upgrade_pidfile, old):
+        pid = read_pid(upgrade_pidfile)
+        if pid is not None and pid != old and pid_alive(pid):
+            return pid
+        return None
+
+    def _healthy(self, master):
+        """
+        True once a worker forked by master answers the health check.
+        Workers of the old master answer too, until it is retired.
+        """
+        try:
+            with urllib.request.urlopen(self.health_url, timeout=2) as response:
+                data = json.loads(response.read())
+                return response.status == 200 and data.get("master") == master
+        except (OSError, ValueError, AttributeError):
+            return False
+
+    def _wait(self, check, deadline, what, watch=None):
+        while True:
+            result = check()
+            if result:
+                return result
+            if watch is not None and not pid_alive(watch):
+                raise ReloadError(f"master {watch} exited while waiting for {what}")
+            if time.monotonic() > deadline:
+                raise ReloadError(f"timed out waiting for {what}")
+            time.sleep(self.poll_interval)
+
+
+class Deployer:
+    def __init__(self, paths, reloader, state_file=DEFAULT_STATE_FILE, fallback=None):
+        """
+        fallback is called (and should return True on success) when no
+        master is running to reload.
+        """
+        self.paths = paths
+        self.reloader = reloader
+        self.state_file = state_file
+        self.fallback = fallback
+        self.state = self._load_state()
+
+    def deploy(self):
+        """
+        Reload the site if the deployed tree changed since the last
+        successful deploy. Returns "unchanged", "reloaded", "restarted" or
+        "failed"; a failed deploy is retried by the next call.
+        """
+        current = tree_fingerprint(self.paths)
+        if current == self.state.get("fingerprint"):
+            logger.info("Deployed tree unchanged since the last deploy; not reloading.")
+            return "unchanged"
+
+        if self.reloader.running() is None:
+            if self.fallback is None:
+                logger.error(f"No gunicorn master running under {self.reloader.pidfile}; nothing to reload.")
+                return "failed"
+            logger.warning(f"No gunicorn master running under {self.reloader.pidfile}; restarting instead.")
+            if not self.fallback():
+                return "failed"
+            outcome = "restarted"
+        else:
+            start = time.perf_counter()
+            try:
+                new = self.reloader.reload()
+            except ReloadError as e:
+                logger.error(f"Graceful reload failed; the previous release is still serving: {e}")
+                return "failed"
+            logger.info(f"Reloaded gracefully in {time.perf_counter() - start:.1f}s; master is now {new}.")
+            outcome = "reloaded"
+
+        self.state = {"fingerprint": current, "deployed": datetime.now().isoformat(timespec="seconds")}
+        self._save_state()
+        return outcome
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = self.state_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.state_file)
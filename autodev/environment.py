@@ -0,0 +1,180 @@
+"""
+environment.py
+
+Keeps the test environment's dependencies installed without running a full
+`pip install -r` every cycle.
+
+EnvironmentManager fingerprints the requirements file (normalized lines
+plus the interpreter version) and remembers the fingerprint and the set of
+requirement lines of the last successful install in a small JSON state
+file. ensure() then:
+
+    - does nothing if the fingerprint matches,
+    - installs only the lines that weren't installed before (the delta),
+    - falls back to a full install the first time or if the delta fails.
+
+If venv_dir is set, packages go into a cached virtualenv created once with
+--system-site-packages, and `python` points at its interpreter so tests can
+run there. Otherwise they go into the current interpreter.
+
+Each call records how long a full install would have taken minus what was
+actually spent, so the saving can be reported per cycle.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_FILE = ".autodev/install-state.json"
+
+
+def requirement_lines(path):
+    """
+    The normalized requirement lines of path: stripped, lowercased, without
+    comments or blanks, sorted and de-duplicated.
+    """
+    if not os.path.exists(path):
+        return []
+    lines = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip().lower()
+            if line:
+                lines.add(line)
+    return sorted(lines)
+
+
+def fingerprint(lines):
+    digest = hashlib.sha256(sys.version.encode("utf-8"))
+    for line in lines:
+        digest.update(b"\0" + line.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class InstallError(Exception):
+    pass
+
+
+class EnvironmentManager:
+    def __init__(self, requirements_file, state_file=DEFAULT_STATE_FILE, venv_dir=None):
+        self.requirements_file = requirements_file
+        self.state_file = state_file
+        self.venv_dir = venv_dir
+        self.last_saved_seconds = 0.0
+        self.state = self._load_state()
+        # Candidates install their new requirements from parallel threads
+        self._install_lock = threading.Lock()
+
+    @property
+    def python(self):
+        if self.venv_dir:
+            return os.path.join(self.venv_dir, "bin", "python")
+        return sys.executable
+
+    def ensure(self):
+        """
+        Make sure everything in the requirements file is installed. Returns
+        the pip output of whatever was run ("" if nothing was). Raises
+        InstallError if installation failed.
+        """
+        self._ensure_venv()
+        lines = requirement_lines(self.requirements_file)
+        current = fingerprint(lines)
+        full_cost = self.state.get("full_install_seconds", 0.0)
+        if current == self.state.get("fingerprint"):
+            logger.info("Requirements unchanged since last install; skipping pip.")
+            self.last_saved_seconds = full_cost
+            return ""
+
+        installed = set(self.state.get("installed", []))
+        delta = [line for line in lines if line not in installed]
+        start = time.perf_counter()
+        output = None
+        # Option lines (-r, --index-url, ...) only make sense in a full install
+        if installed and delta and not any(line.startswith("-") for line in delta):
+            logger.info(f"Installing new requirements only: {', '.join(delta)}")
+            try:
+                output = self._pip(delta)
+            except InstallError as e:
+                logger.warning(f"Delta install failed, falling back to a full install: {e}")
+        elif installed:
+            logger.info("Requirements file changed but nothing new to install.")
+            output = ""
+        if output is None:
+            output = self._pip(["-r", self.requirements_file])
+            self.state["full_install_seconds"] = time.perf_counter() - start
+            full_cost = self.state["full_install_seconds"]
+        elapsed = time.perf_counter() - start
+
+        self.state["fingerprint"] = current
+        self.state["installed"] = sorted(installed.union(lines))
+        self._save_state()
+        self.last_saved_seconds = max(0.0, full_cost - elapsed)
+        return output
+
+    def install(self, packages):
+        """
+        Install a batch of packages (e.g. newly detected imports) in one pip
+        run, skipping any that are already installed.
+        """
+        with self._install_lock:
+            installed = set(self.state.get("installed", []))
+            missing = sorted({p.strip().lower() for p in packages} - installed)
+            if not missing:
+                return ""
+            self._ensure_venv()
+            output = self._pip(missing)
+            self.state["installed"] = sorted(installed.union(missing))
+            self._save_state()
+            return output
+
+    def _pip(self, args):
+        proc = subprocess.run(
+            [self.python, "-m", "pip", "install", *args],
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            raise InstallError(proc.stderr.strip() or proc.stdout.strip())
+        return proc.stdout
+
+    def _ensure_venv(self):
+        if not self.venv_dir or os.path.exists(self.python):
+            return
+        logger.info(f"Creating cached virtualenv in {self.venv_dir}")
+        try:
+            subprocess.run(
+                [sys.executable, "-m", "venv", "--system-site-packages", self.venv_dir],
+                check=True,
+                capture_output=True,
+            )
+        except subprocess.CalledProcessError as e:
+            detail = (e.stderr or b"").decode("utf-8", "replace").strip()
+            raise InstallError(f"Could not create virtualenv in {self.venv_dir}: {detail}") from e
+        except OSError as e:
+            raise InstallError(f"Could not create virtualenv in {self.venv_dir}: {e}") from e
+        # A new venv has nothing of its own installed yet
+        self.state = {}
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = self.state_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.state_file)
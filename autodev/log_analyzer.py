@@ -0,0 +1,403 @@
+"""
+log_analyzer.py
+
+Turns the plain-text history in logs/auto_dev.log* into a performance
+report, one pass and one entry at a time.
+
+Entries are "YYYY-MM-DD HH:MM:SS,mmm [LEVEL] message" lines, where a
+message may continue over many lines (commit messages, pip output, RAW AI
+RESPONSE blocks). iter_entries() yields each entry with its first line and
+at most CONTINUATION_LINES further lines, so memory is bounded by that, not
+by the size of a response or a file. Segments are read oldest first
+(.5, .4, ... .1, then the live file; .gz segments too).
+
+iter_cycles() rebuilds each cycle of the loop from the entries. A cycle
+starts at "git pull" and moves through phases at these markers:
+
+    pull      Running git command: git pull
+    generate  the result of the pull
+    parse     RAW AI RESPONSE
+    summary   the first "Updated file:" (writes plus the change summary call)
+    install   the first pip line: pip output, or the message that starts it
+    test      bandit or test runner messages
+    git       git add (or, on failure, the revert)
+    restart   Restarting gunicorn-theseus
+    sleep     Sleeping for N minutes
+
+For each cycle it counts failed API attempts, backoffs and their seconds,
+and calls that gave up. It also records whether the change was a no-op.
+A no-op is an identical-code summary, a `git commit` with nothing to
+commit, or the newer "identical to the current tree" message. The push
+result is recorded too.
+
+Usage:
+    python -m autodev.log_analyzer [logs/auto_dev.log ...] [--csv cycles.csv]
+"""
+
+import argparse
+import csv
+import gzip
+import re
+import sys
+from datetime import datetime
+
+from autodev.logsetup import log_segments
+from autodev.metrics import percentile
+
+DEFAULT_LOG = "logs/auto_dev.log"
+CONTINUATION_LINES = 20
+ENTRY_START = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) \[(\w+)\] ?(.*)$")
+BACKOFF = re.compile(r"^Retrying in (\d+(?:\.\d+)?) seconds")
+PHASES = ("pull", "generate", "parse", "summary", "install", "test", "git", "revert", "restart")
+# Older logs only have pip's output, logged once pip is done, so there the
+# install phase is short and pip's own run time falls into "summary"
+INSTALL_MARKERS = (
+    "Requirement already satisfied", "Collecting ", "Successfully installed", "Dependency installation failed",
+    "New requirements added", "Installing new requirements", "Requirements unchanged",
+    "Requirements file changed", "Creating cached virtualenv",
+)
+TEST_MARKERS = (
+    "bandit", "Running security scan", "Tests passed", "Test failed", "No tests are affected", "Tree ",
+)
+TEST_RUN = re.compile(r"^Running \d+ of \d+ test files")
+NOOP_SUMMARY = ("identical to the old code", "no changes were made")
+OUTCOMES = ("pushed", "noop", "push_failed", "tests_failed", "api_failed", "no_files", "incomplete")
+CSV_FIELDS = (
+    ["start", "end", "duration", "outcome", "files_updated", "api_failures", "backoffs",
+     "backoff_seconds", "api_gave_up", "responses", "commit_created", "push_ok"]
+    + [f"{phase}_seconds" for phase in PHASES]
+)
+
+
+class Entry:
+    __slots__ = ("timestamp", "level", "message", "continuation", "lines")
+
+    def __init__(self, timestamp, level, message):
+        self.timestamp = timestamp
+        self.level = level
+        self.message = message
+        self.continuation = []
+        self.lines = 1
+
+    def text(self):
+        return "\n".join([self.message] + self.continuation)
+
+
+def _open(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def input_paths(paths):
+    """
+    Expand each log file into its segments, oldest first. Explicit segment
+    files are kept as given.
+    """
+    expanded = []
+    for path in paths:
+        segments = log_segments(path)
+        expanded.extend(segments if segments else [path])
+    return expanded
+
+
+def iter_entries(paths):
+    """
+    Yield an Entry per log entry across paths, in order. Lines before the
+    first entry of the first file are skipped; an entry cut by rotation
+    continues into the next file.
+    """
+    entry = None
+    for path in paths:
+        with _open(path) as f:
+            for line in f:
+                line = line.rstrip("\n")
+                match = ENTRY_START.match(line)
+                if match:
+                    if entry is not None:
+                        yield entry
+                    timestamp = datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S,%f")
+                    entry = Entry(timestamp, match.group(2), match.group(3))
+                elif entry is not None:
+                    entry.lines += 1
+                    if len(entry.continuation) < CONTINUATION_LINES:
+                        entry.continuation.append(line)
+    if entry is not None:
+        yield entry
+
+
+class Cycle:
+    def __init__(self, start):
+        self.start = start
+        self.end = start
+        self.phase = "pull"
+        self.phase_start = start
+        self.durations = dict.fromkeys(PHASES, 0.0)
+        self.files_updated = 0
+        self.api_failures = 0
+        self.backoffs = 0
+        self.backoff_seconds = 0.0
+        self.api_gave_up = 0
+        self.responses = 0
+        self.noop = False
+        self.commit_created = False
+        self.push_ok = None
+        self.tests_failed = False
+        self.no_files = False
+        self._last_git = ""
+        self.pulled = False
+
+    def enter(self, phase, timestamp):
+        if phase == self.phase:
+            return
+        if self.phase in self.durations:
+            self.durations[self.phase] += (timestamp - self.phase_start).total_seconds()
+        self.phase = phase
+        self.phase_start = timestamp
+
+    def close(self, timestamp):
+        self.enter("sleep", timestamp)
+        self.end = timestamp
+
+    @property
+    def duration(self):
+        return (self.end - self.start).total_seconds()
+
+    @property
+    def outcome(self):
+        # A commit that went through changed the tree, whatever the summary said
+        if self.noop and not self.commit_created:
+            return "noop"
+        if self.tests_failed:
+            return "tests_failed"
+        if self.push_ok is False:
+            return "push_failed"
+        if self.push_ok and self.commit_created:
+            return "pushed"
+        if self.api_gave_up and not self.responses:
+            return "api_failed"
+        if self.no_files:
+            return "no_files"
+        return "incomplete"
+
+    def row(self):
+        row = {
+            "start": self.start.isoformat(sep=" ", timespec="seconds"),
+            "end": self.end.isoformat(sep=" ", timespec="seconds"),
+            "duration": round(self.duration, 3),
+            "outcome": self.outcome,
+            "files_updated": self.files_updated,
+            "api_failures": self.api_failures,
+            "backoffs": self.backoffs,
+            "backoff_seconds": self.backoff_seconds,
+            "api_gave_up": self.api_gave_up,
+            "responses": self.responses,
+            "commit_created": int(self.commit_created),
+            "push_ok": "" if self.push_ok is None else int(self.push_ok),
+        }
+        row.update({f"{phase}_seconds": round(self.durations[phase], 3) for phase in PHASES})
+        return row
+
+    def observe(self, entry):
+        message = entry.message
+        timestamp = entry.timestamp
+        if self._last_git == "pull" and message.startswith(("Git command success", "Git command error")):
+            self.enter("generate", timestamp)
+        elif message.startswith("DeepSeek API call failed"):
+            self.api_failures += 1
+        elif message.startswith("Retrying in"):
+            self.backoffs += 1
+            self.backoff_seconds += float(BACKOFF.match(message).group(1))
+        elif message.startswith("All attempts to call DeepSeek API have failed"):
+            self.api_gave_up += 1
+        elif message.startswith("RAW AI RESPONSE"):
+            self.responses += 1
+            if self.phase in ("pull", "generate"):
+                self.enter("parse", timestamp)
+        elif message.startswith(("Updated file:", "[MANUAL RUN] Updated file:")):
+            self.files_updated += 1
+            if self.phase in ("generate", "parse"):
+                self.enter("summary", timestamp)
+        elif message.startswith("No valid (or fully valid) file changes"):
+            self.no_files = True
+        elif message.startswith("AI output is identical"):
+            self.noop = True
+        elif message.startswith(("Tests failed", "Test failed", "Manual-run: Tests failed")):
+            self.tests_failed = True
+        elif message.startswith("Fetching latest changes from remote"):
+            self.enter("revert", timestamp)
+        elif message.startswith("Restarting gunicorn"):
+            self.enter("restart", timestamp)
+        elif message.startswith("Running git command: git "):
+            self._observe_git(entry)
+            return
+        elif self._last_git == "commit" and message.startswith("Git command"):
+            self.commit_created = message.startswith("Git command success")
+            # "nothing to commit" goes to stdout, so stderr is empty
+            if message.rstrip() == "Git command error:" and not entry.continuation:
+                self.noop = True
+        elif self._last_git == "push" and message.startswith("Git command"):
+            self.push_ok = message.startswith("Git command success")
+        elif self.phase in ("parse", "summary") and message.startswith(INSTALL_MARKERS):
+            self.enter("install", timestamp)
+        elif self.phase in ("summary", "install") and (message.startswith(TEST_MARKERS) or TEST_RUN.match(message)):
+            self.enter("test", timestamp)
+        if message.startswith("Git command"):
+            self._last_git = ""
+
+    def _observe_git(self, entry):
+        command = entry.message[len("Running git command: git "):]
+        self._last_git = command.split(" ", 1)[0]
+        if self._last_git == "pull":
+            self.pulled = True
+            self.enter("pull", entry.timestamp)
+        elif self._last_git == "add" and self.phase != "revert":
+            self.enter("git", entry.timestamp)
+        elif self._last_git == "commit":
+            if any(marker in entry.text() for marker in NOOP_SUMMARY):
+                self.noop = True
+        elif self._last_git == "push" and "--force" in command:
+            self._last_git = "force-push"
+
+
+def iter_cycles(entries):
+    """
+    Yield each Cycle as soon as the next one starts (or the log ends).
+    """
+    cycle = None
+    for entry in entries:
+        manual = entry.message.startswith("Starting MANUAL RUN")
+        pull = entry.message.startswith("Running git command: git pull")
+        # A manual run logs its start before its own pull
+        if manual or (pull and (cycle is None or cycle.pulled)):
+            if cycle is not None:
+                cycle.close(cycle.end)
+                yield cycle
+            cycle = Cycle(entry.timestamp)
+        if cycle is None:
+            continue
+        if entry.message.startswith("Sleeping for"):
+            cycle.close(entry.timestamp)
+        elif cycle.phase != "sleep":
+            cycle.end = entry.timestamp
+        cycle.observe(entry)
+    if cycle is not None:
+        cycle.close(cycle.end)
+        yield cycle
+
+
+class Report:
+    """
+    Running totals over cycles; keeps one float per phase per cycle for the
+    percentiles, nothing else.
+    """
+
+    def __init__(self):
+        self.cycles = 0
+        self.first = None
+        self.last = None
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+        self.phase_seconds = {phase: [] for phase in PHASES}
+        self.cycle_seconds = []
+        self.api_failures = 0
+        self.backoffs = 0
+        self.backoff_seconds = 0.0
+        self.api_gave_up = 0
+        self.responses = 0
+        self.pushes = 0
+        self.pushes_ok = 0
+        self.commits = 0
+        self.with_output = 0
+
+    def add(self, cycle):
+        self.cycles += 1
+        self.first = self.first or cycle.start
+        self.last = cycle.end
+        self.outcomes[cycle.outcome] += 1
+        self.cycle_seconds.append(cycle.duration)
+        for phase, seconds in cycle.durations.items():
+            if seconds:
+                self.phase_seconds[phase].append(seconds)
+        self.api_failures += cycle.api_failures
+        self.backoffs += cycle.backoffs
+        self.backoff_seconds += cycle.backoff_seconds
+        self.api_gave_up += cycle.api_gave_up
+        self.responses += cycle.responses
+        if cycle.push_ok is not None:
+            self.pushes += 1
+            self.pushes_ok += cycle.push_ok
+        self.commits += cycle.commit_created
+        self.with_output += cycle.responses > 0
+
+    def format(self):
+        if not self.cycles:
+            return "No cycles found."
+        attempts = self.api_failures + self.responses
+        lines = [
+            f"{self.cycles} cycles from {self.first:%Y-%m-%d %H:%M} to {self.last:%Y-%m-%d %H:%M} "
+            f"(active time p50 {percentile(self.cycle_seconds, 0.5):.1f}s, "
+            f"p95 {percentile(self.cycle_seconds, 0.95):.1f}s)",
+            "",
+            f"{'phase':<10} {'cycles':>7} {'mean s':>8} {'p50 s':>8} {'p95 s':>8} {'max s':>8} {'share':>6}",
+        ]
+        active = sum(self.cycle_seconds) or 1.0
+        for phase in PHASES:
+            values = self.phase_seconds[phase]
+            if values:
+                lines.append(
+                    f"{phase:<10} {len(values):>7} {sum(values) / len(values):>8.2f} {percentile(values, 0.5):>8.2f} "
+                    f"{percentile(values, 0.95):>8.2f} {max(values):>8.2f} {sum(values) / active:>6.0%}"
+                )
+        lines += [
+            "",
+            f"API: {self.api_failures} of {attempts} attempts failed ({self.api_failures / max(attempts, 1):.0%}), "
+            f"{self.backoffs} backoffs ({self.backoff_seconds:.0f}s waiting), "
+            f"{self.api_gave_up} calls gave up after every retry",
+            f"No-op changes: {self.outcomes['noop']} of {self.with_output} cycles with AI output "
+            f"({self.outcomes['noop'] / max(self.with_output, 1):.0%})",
+            f"Pushes: {self.pushes_ok} of {self.pushes} succeeded; {self.commits} carried a new commit",
+            "Outcomes: " + ", ".join(f"{name} {count}" for name, count in self.outcomes.items() if count),
+        ]
+        return "\n".join(lines)
+
+
+def analyze(paths, csv_file=None):
+    """
+    Stream paths into a Report, writing one CSV row per cycle to csv_file
+    (an open text file) if given.
+    """
+    report = Report()
+    writer = None
+    if csv_file is not None:
+        writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+    for cycle in iter_cycles(iter_entries(paths)):
+        report.add(cycle)
+        if writer is not None:
+            writer.writerow(cycle.row())
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("logs", nargs="*", default=[DEFAULT_LOG],
+                        help="log files; a base name includes its rotated segments")
+    parser.add_argument("--csv", help="write one row per cycle to this file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    paths = input_paths(args.logs)
+    if not paths:
+        parser.error("no log files found")
+    if args.csv == "-":
+        report = analyze(paths, sys.stdout)
+        return
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            report = analyze(paths, f)
+    else:
+        report = analyze(paths)
+    print(report.format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+logsetup.py
+
+Structured logging that never makes the caller wait on the disk.
+
+Loggers only put records on an in-memory queue (QueueHandler). A
+QueueListener thread does all formatting, compression and file I/O:
+
+    - each record becomes one JSON line carrying the run id, the current
+      phase and timing fields (seconds since the run and the phase began),
+      stamped on the calling thread when the record was made;
+    - messages longer than BLOB_THRESHOLD characters (raw AI responses,
+      pip and git output) are stored once in a gzip-compressed,
+      content-addressed blob store, and the line keeps a short preview and
+      the blob's hash;
+    - rotated segments are gzip-compressed, and the blob store drops its
+      least recently used blobs beyond a byte budget.
+
+iter_records() reads segments back, compressed or not, oldest first.
+"""
+
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import os
+import queue
+import shutil
+import time
+import uuid
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+BLOB_THRESHOLD = 2000
+PREVIEW_CHARS = 200
+# The old text log took up to 6 MB (1 MB x 5 backups plus the live file).
+# The same 6 MB now holds the 1 MB live file, 12 gzipped segments (JSON lines
+# compress at least 4:1, so at most 3 MB) and 2 MB of blobs.
+DEFAULT_MAX_BYTES = 1_000_000
+DEFAULT_BACKUP_COUNT = 12
+DEFAULT_BLOB_BUDGET = 2_000_000
+
+
+class LogContext:
+    """
+    The run id and phase stamped on every record. One cycle of the loop is
+    one run; phases are set as the cycle moves on.
+    """
+
+    def __init__(self):
+        self.run_id = ""
+        self.phase = ""
+        self.run_started = time.monotonic()
+        self.phase_started = self.run_started
+
+    def new_run(self):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.run_started = self.phase_started = time.monotonic()
+        self.phase = "start"
+        return self.run_id
+
+    def set_phase(self, phase):
+        self.phase = phase
+        self.phase_started = time.monotonic()
+
+
+class ContextFilter(logging.Filter):
+    def __init__(self, context):
+        super().__init__()
+        self.context = context
+
+    def filter(self, record):
+        now = time.monotonic()
+        record.run_id = self.context.run_id
+        record.phase = self.context.phase
+        record.t_run = round(now - self.context.run_started, 3)
+        record.t_phase = round(now - self.context.phase_started, 3)
+        return True
+
+
+class BlobStore:
+    """
+    gzip-compressed blobs named by the sha256 of their text, under
+    root/<first two hex digits>/. Storing the same text twice only
+    refreshes its mtime.
+    """
+
+    def __init__(self, root, max_bytes=DEFAULT_BLOB_BUDGET):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._size = None
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], f"{digest}.gz")
+
+    def put(self, text):
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if os.path.exists(path):
+            os.utime(path)
+            return digest
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with gzip.open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        if self._size is None:
+            self._size = self._disk_usage()
+        else:
+            self._size += os.path.getsize(path)
+        if self._size > self.max_bytes:
+            self._prune()
+        return digest
+
+    def get(self, digest):
+        with gzip.open(self.path(digest), "rb") as f:
+            return f.read().decode("utf-8")
+
+    def _blobs(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for fname in filenames:
+                if fname.endswith(".gz"):
+                    path = os.path.join(dirpath, fname)
+                    stat = os.stat(path)
+                    yield stat.st_mtime, stat.st_size, path
+
+    def _disk_usage(self):
+        return sum(size for _, size, _ in self._blobs())
+
+    def _prune(self):
+        blobs = sorted(self._blobs())
+        self._size = sum(size for _, size, _ in blobs)
+        # Down to 90% of the budget, so pruning doesn't run on every put
+        for _, size, path in blobs:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            os.remove(path)
+            self._size -= size
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def __init__(self, blobs=None, threshold=BLOB_THRESHOLD):
+        super().__init__()
+        self.blobs = blobs
+        self.threshold = threshold
+
+    def format(self, record):
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            message = f"{message}\n{record.exc_text}"
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "run": getattr(record, "run_id", ""),
+            "phase": getattr(record, "phase", ""),
+            "t_run": getattr(record, "t_run", None),
+            "t_phase": getattr(record, "t_phase", None),
+            "msg": message,
+        }
+        if self.blobs is not None and len(message) > self.threshold:
+            entry["msg"] = message[:PREVIEW_CHARS]
+            entry["blob"] = self.blobs.put(message)
+            entry["size"] = len(message)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _gzip_rotator(source, dest):
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+class CompressingRotatingFileHandler(RotatingFileHandler):
+    """
+    A RotatingFileHandler whose rotated segments are gzip-compressed
+    (auto_dev.jsonl.1.gz, .2.gz, ...).
+    """
+
+    def __init__(self, filename, maxBytes=DEFAULT_MAX_BYTES, backupCount=DEFAULT_BACKUP_COUNT, **kwargs):
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding="utf-8", **kwargs)
+        self.namer = lambda name: f"{name}.gz"
+        self.rotator = _gzip_rotator
+
+
+def start_logging(loggers, log_file, blob_dir, context, console=None,
+                  max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT,
+                  blob_budget=DEFAULT_BLOB_BUDGET):
+    """
+    Route loggers through a queue to a background writer. Returns the
+    started QueueListener, which is also stopped (and drained) at exit.
+    """
+    directory = os.path.dirname(log_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    file_handler = CompressingRotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
+    file_handler.setFormatter(JsonLinesFormatter(BlobStore(blob_dir, blob_budget)))
+    handlers = [file_handler] + ([console] if console is not None else [])
+
+    # SimpleQueue is unbounded, so put() never blocks the caller
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter(context))
+    for target in loggers:
+        target.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(_stop_listener, listener)
+    return listener
+
+
+def _stop_listener(listener):
+    if listener._thread is not None:
+        listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+def log_segments(log_file):
+    """
+    The existing segments of log_file, oldest first.
+    """
+    segments = []
+    directory = os.path.dirname(log_file) or "."
+    base = os.path.basename(log_file)
+    for fname in os.listdir(directory) if os.path.isdir(directory) else []:
+        suffix = fname[len(base) + 1:].removesuffix(".gz")
+        if fname.startswith(f"{base}.") and suffix.isdigit():
+            segments.append((-int(suffix), os.path.join(directory, fname)))
+    paths = [path for _, path in sorted(segments)]
+    if os.path.exists(log_file):
+        paths.append(log_file)
+    return paths
+
+
+def iter_records(log_file):
+    """
+    Yield every record of log_file and its rotated segments as a dict,
+    oldest first, one line at a time.
+    """
+    for path in log_segments(log_file):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
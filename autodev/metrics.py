@@ -0,0 +1,255 @@
+"""
+metrics.py
+
+Where a cycle spends its time, and what it costs.
+
+RunTracer times one run (one cycle of main_loop or manual_run):
+
+    - phase(name) ends the current phase and starts the next, like a lap
+      timer, so the loop's early returns need no extra bookkeeping;
+    - span(name) is a context manager for work inside a phase, including
+      work on other threads (bandit runs next to pytest);
+    - finish(outcome) closes the last phase and appends one JSON line to
+      the RunStore: phase and span durations, API requests, failures,
+      latency and tokens for the run, and the outcome.
+
+Phases also become the "phase" field of the structured log (see
+logsetup.py), so log lines and run records line up by run id.
+
+The report covers the stored runs: p50/p95/max per phase, tokens and API
+time per run, how often runs ended in each outcome, and totals of the
+per-run counts (files changed, install seconds saved, deploys).
+
+Usage:
+    python -m autodev.metrics [--store .autodev/runs.jsonl] [--last 100] [--kind loop]
+"""
+
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+DEFAULT_STORE = ".autodev/runs.jsonl"
+SUCCESS_OUTCOMES = {"pushed"}
+
+
+class RunStore:
+    """
+    Run records as JSON lines, appended one per run.
+    """
+
+    def __init__(self, path=DEFAULT_STORE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, record):
+        line = json.dumps(record, sort_keys=True) + "\n"
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def __iter__(self):
+        try:
+            f = open(self.path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+class RunTracer:
+    def __init__(self, store, log_context=None, api_stats=None):
+        """
+        log_context is a logsetup.LogContext to keep in step; api_stats is
+        a callable returning the API client's running totals.
+        """
+        self.store = store
+        self.log_context = log_context
+        self.api_stats = api_stats
+        self._lock = threading.Lock()
+        self.run_id = None
+        self.last_record = None
+
+    def start_run(self, kind):
+        if self.log_context is not None:
+            self.run_id = self.log_context.new_run()
+        else:
+            self.run_id = f"{time.time_ns():x}"
+        self.kind = kind
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.started = time.perf_counter()
+        self.durations = {}
+        self.counts = {}
+        self.api_before = self.api_stats() if self.api_stats else {}
+        self._phase = None
+        self._phase_started = self.started
+        return self.run_id
+
+    def phase(self, name):
+        if self.run_id is None:
+            return
+        now = time.perf_counter()
+        self._close_phase(now)
+        self._phase = name
+        self._phase_started = now
+        if self.log_context is not None:
+            self.log_context.set_phase(name)
+
+    @contextmanager
+    def span(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.run_id is not None:
+                self._add(name, time.perf_counter() - started)
+
+    def count(self, name, value=1):
+        if self.run_id is None:
+            return
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    def finish(self, outcome):
+        """
+        Store the run's record and return it.
+        """
+        if self.run_id is None:
+            return None
+        now = time.perf_counter()
+        self._close_phase(now)
+        api = {}
+        if self.api_stats:
+            after = self.api_stats()
+            api = {key: round(after[key] - self.api_before.get(key, 0), 3) for key in after}
+        record = {
+            "run": self.run_id,
+            "kind": self.kind,
+            "started": self.started_at,
+            "duration": round(now - self.started, 3),
+            "outcome": outcome,
+            "phases": {name: round(seconds, 3) for name, seconds in self.durations.items()},
+            "counts": self.counts,
+            "api": api,
+        }
+        self.store.append(record)
+        self.run_id = None
+        self.last_record = record
+        return record
+
+    def _close_phase(self, now):
+        if self._phase is not None:
+            self._add(self._phase, now - self._phase_started)
+            self._phase = None
+
+    def _add(self, name, seconds):
+        with self._lock:
+            self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of a non-empty list.
+    """
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(records):
+    runs = list(records)
+    phases = {}
+    outcomes = {}
+    for run in runs:
+        outcomes[run["outcome"]] = outcomes.get(run["outcome"], 0) + 1
+        for name, seconds in run.get("phases", {}).items():
+            phases.setdefault(name, []).append(seconds)
+    api = {}
+    for key in ("requests", "failures", "seconds", "prompt_tokens", "completion_tokens"):
+        api[key] = sum(run.get("api", {}).get(key, 0) for run in runs)
+    counts = {}
+    for run in runs:
+        for name, value in run.get("counts", {}).items():
+            counts[name] = counts.get(name, 0) + value
+    return {
+        "runs": len(runs),
+        "outcomes": outcomes,
+        "success_rate": (sum(outcomes.get(o, 0) for o in SUCCESS_OUTCOMES) / len(runs)) if runs else 0.0,
+        "phases": {
+            name: {
+                "runs": len(values),
+                "p50": percentile(values, 0.5),
+                "p95": percentile(values, 0.95),
+                "max": max(values),
+                "total": sum(values),
+            }
+            for name, values in phases.items()
+        },
+        "api": api,
+        "counts": counts,
+        "durations": [run["duration"] for run in runs],
+    }
+
+
+def format_report(summary):
+    if not summary["runs"]:
+        return "No runs recorded."
+    lines = [
+        f"{summary['runs']} runs, {summary['success_rate']:.0%} pushed  "
+        f"(cycle p50 {percentile(summary['durations'], 0.5):.1f}s, p95 {percentile(summary['durations'], 0.95):.1f}s)",
+        "",
+        f"{'phase':<20} {'runs':>5} {'p50 s':>8} {'p95 s':>8} {'max s':>8} {'share':>6}",
+    ]
+    # Share of all cycle time; spans nested in a phase count towards both
+    grand_total = sum(summary["durations"]) or 1.0
+    for name, stats in sorted(summary["phases"].items(), key=lambda item: -item[1]["total"]):
+        lines.append(
+            f"{name:<20} {stats['runs']:>5} {stats['p50']:>8.2f} {stats['p95']:>8.2f} {stats['max']:>8.2f} "
+            f"{stats['total'] / grand_total:>6.0%}"
+        )
+    api = summary["api"]
+    runs = summary["runs"]
+    lines += [
+        "",
+        f"API: {api['requests']:.0f} requests ({api['failures']:.0f} failed), {api['seconds']:.1f}s waiting, "
+        f"{api['prompt_tokens']:.0f} prompt + {api['completion_tokens']:.0f} completion tokens "
+        f"({(api['prompt_tokens'] + api['completion_tokens']) / runs:.0f} per run)",
+        "Outcomes: " + ", ".join(f"{name} {count}" for name, count in sorted(summary["outcomes"].items())),
+    ]
+    if summary["counts"]:
+        lines.append("Totals: " + ", ".join(f"{name} {value:g}" for name, value in sorted(summary["counts"].items())))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", default=DEFAULT_STORE)
+    parser.add_argument("--last", type=int, default=None, help="only the most recent N runs")
+    parser.add_argument("--kind", choices=("loop", "manual"), default=None)
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    records = [r for r in RunStore(args.store) if args.kind is None or r.get("kind") == args.kind]
+    if args.last:
+        records = records[-args.last:]
+    summary = summarize(records)
+    if args.json:
+        summary.pop("durations")
+        print(json.dumps(summary, indent=2, sort_keys=True))
+    else:
+        print(format_report(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+mock_deepseek.py
+
+A local stand-in for the DeepSeek chat-completions endpoint, used by the
+tests and benchmarks. It speaks HTTP/1.1 with keep-alive, answers both plain
+and "stream": true requests (chunked server-sent events), and can simulate
+the costs that matter for the client:
+
+    connect_delay   - paid once per new connection, like a TCP+TLS handshake
+    first_delay     - time before the first token, like model queueing
+    chunk_delay     - time between streamed chunks, like token generation
+    fail_first      - answer the first N requests with 503
+
+Usage:
+    python -m autodev.mock_deepseek [--port 8765] [--chunk-delay 0.01]
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_RESPONSE = (
+    "File: website/example.py\n"
+    "```python\n"
+    "def example():\n"
+    "    return 'example'\n"
+    "```\n"
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        time.sleep(server.connect_delay)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        with server.lock:
+            server.requests.append(payload)
+            failing = len(server.requests) <= server.fail_first
+
+        if self.path != "/v1/chat/completions":
+            self._send_json(404, {"error": "not found"})
+            return
+        if failing:
+            self._send_json(503, {"error": "unavailable"})
+            return
+
+        time.sleep(server.first_delay)
+        if payload.get("stream"):
+            self._send_stream(payload)
+        else:
+            # A non-streaming answer still has to wait for every token
+            time.sleep(server.chunk_delay * (self._chunk_count() - 1))
+            self._send_json(200, {
+                "choices": [{"message": {"role": "assistant", "content": server.response_text}}],
+                "usage": self._usage(payload),
+            })
+
+    def _usage(self, payload):
+        # Roughly 4 characters per token, like the context budget estimate
+        prompt = sum(len(str(m.get("content", ""))) for m in payload.get("messages", []))
+        return {"prompt_tokens": prompt // 4, "completion_tokens": len(self.server.response_text) // 4}
+
+    def _chunk_count(self):
+        return max(1, -(-len(self.server.response_text) // self.server.chunk_size))
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, payload):
+        server = self.server
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        text = server.response_text
+        for i in range(0, len(text), server.chunk_size):
+            if i:
+                time.sleep(server.chunk_delay)
+            event = {"choices": [{"delta": {"content": text[i:i + server.chunk_size]}}]}
+            self._write_chunk(f"data: {json.dumps(event)}\n\n")
+        if (payload.get("stream_options") or {}).get("include_usage"):
+            event = {"choices": [], "usage": self._usage(payload)}
+            self._write_chunk(f"data: {json.dumps(event)}\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+class MockDeepSeekServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, response_text=DEFAULT_RESPONSE, chunk_size=16,
+                 chunk_delay=0.0, first_delay=0.0, connect_delay=0.0, fail_first=0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = []
+        self.response_text = response_text
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.first_delay = first_delay
+        self.connect_delay = connect_delay
+        self.fail_first = fail_first
+        self._thread = None
+
+    def handle_error(self, request, client_address):
+        # Clients abandoning a stream mid-way is expected, not an error
+        pass
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1/chat/completions"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--chunk-delay", type=float, default=0.01)
+    parser.add_argument("--first-delay", type=float, default=0.0)
+    parser.add_argument("--connect-delay", type=float, default=0.0)
+    args = parser.parse_args()
+    server = MockDeepSeekServer(args.port, chunk_size=args.chunk_size, chunk_delay=args.chunk_delay,
+                                first_delay=args.first_delay, connect_delay=args.connect_delay)
+    print(f"Serving mock chat completions on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
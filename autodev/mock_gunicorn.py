@@ -0,0 +1,225 @@
+"""
+mock_gunicorn.py
+
+A gunicorn-like stand-in used by the deploy tests, so rolling reloads can be
+exercised without gunicorn or systemd. It follows gunicorn's process model
+where a reload depends on it:
+
+    - the master binds the socket, writes the pidfile and forks workers
+      that serve a WSGI app from the shared socket; with --preload the app
+      is imported once in the master, so workers never see newer code;
+    - USR2 forks and execs a new master that inherits the listening socket
+      (GUNICORN_FD) and writes <pidfile>.2, renamed to <pidfile> once the
+      old master has exited;
+    - TERM or INT stops the workers after their current request, then the
+      master exits and removes its pidfile.
+
+Workers exit on their own if their master goes away.
+
+Usage:
+    python -m autodev.mock_gunicorn --bind 127.0.0.1:8000 --pid site.pid [--workers 2] [--preload] [--chdir DIR] module:app
+"""
+
+import argparse
+import importlib
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+# Taken before --chdir, so USR2 can re-exec the same command line
+START_CWD = os.getcwd()
+START_ARGV = [sys.executable, os.path.abspath(sys.argv[0])] + sys.argv[1:]
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def load_app(spec):
+    """
+    Import "module:name" or call "module:factory()", as gunicorn does.
+    """
+    module_name, _, name = spec.partition(":")
+    module = importlib.import_module(module_name)
+    if name.endswith("()"):
+        return getattr(module, name[:-2])()
+    return getattr(module, name or "application")
+
+
+def open_listener(bind):
+    fd = os.environ.pop("GUNICORN_FD", None)
+    if fd is not None:
+        sock = socket.socket(fileno=int(fd))
+    else:
+        host, port = bind.rsplit(":", 1)
+        sock = socket.socket()
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, int(port)))
+        sock.listen(128)
+    # Every worker wakes up for a new connection; the ones that lose the
+    # race to accept() must not block in it
+    sock.setblocking(False)
+    return sock
+
+
+class Worker:
+    def __init__(self, sock, app, master):
+        self.sock = sock
+        self.app = app
+        self.master = master
+        self.stopping = False
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGUSR2, signal.SIG_IGN)
+        server = WSGIServer(self.sock.getsockname(), _QuietHandler, bind_and_activate=False)
+        server.socket.close()
+        server.socket = self.sock
+        server.server_name, server.server_port = self.sock.getsockname()[:2]
+        server.setup_environ()
+        server.set_app(self.app)
+        server.timeout = 0.1
+        while not self.stopping and os.getppid() == self.master:
+            server.handle_request()
+
+    def stop(self, signum, frame):
+        self.stopping = True
+
+
+class Master:
+    def __init__(self, args):
+        self.args = args
+        self.sock = open_listener(args.bind)
+        self.pid = os.getpid()
+        # Set when this master was started by another one's USR2
+        self.parent = int(os.environ.pop("GUNICORN_PID", 0))
+        self.pidfile = args.pid + ".2" if args.pid and self.parent else args.pid
+        self.app = load_app(args.app) if args.preload else None
+        self.workers = set()
+        self.reexec_pid = 0
+        self.signals = []
+        self.stopping = False
+
+    def run(self):
+        for signum in (signal.SIGUSR2, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda signum, frame: self.signals.append(signum))
+        self._write_pidfile()
+        try:
+            while True:
+                self._reap()
+                while self.signals:
+                    self._handle(self.signals.pop(0))
+                if self.stopping:
+                    if not self.workers:
+                        break
+                else:
+                    while len(self.workers) < self.args.workers:
+                        self._spawn_worker()
+                self._maybe_promote()
+                time.sleep(0.05)
+        finally:
+            if self.pidfile and os.path.exists(self.pidfile) and _read_pid(self.pidfile) == self.pid:
+                os.unlink(self.pidfile)
+
+    def _handle(self, signum):
+        if signum == signal.SIGUSR2:
+            if not self.reexec_pid:
+                self._reexec()
+        elif not self.stopping:
+            self.stopping = True
+            for pid in self.workers:
+                _kill(pid, signal.SIGTERM)
+
+    def _spawn_worker(self):
+        pid = os.fork()
+        if pid:
+            self.workers.add(pid)
+            return
+        code = 0
+        try:
+            Worker(self.sock, self.app or load_app(self.args.app), self.pid).run()
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _reexec(self):
+        self.reexec_pid = os.fork()
+        if self.reexec_pid:
+            return
+        os.set_inheritable(self.sock.fileno(), True)
+        environ = dict(os.environ, GUNICORN_FD=str(self.sock.fileno()), GUNICORN_PID=str(self.pid))
+        os.chdir(START_CWD)
+        os.execve(START_ARGV[0], START_ARGV, environ)
+
+    def _reap(self):
+        while True:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            self.workers.discard(pid)
+            if pid == self.reexec_pid:
+                self.reexec_pid = 0
+
+    def _maybe_promote(self):
+        # The old master is gone once this one has been reparented
+        if self.parent and os.getppid() != self.parent:
+            self.parent = 0
+            if self.pidfile:
+                self.pidfile = self.args.pid
+                self._write_pidfile()
+                os.unlink(self.args.pid + ".2")
+
+    def _write_pidfile(self):
+        if self.pidfile:
+            tmp = f"{self.pidfile}.{self.pid}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(f"{self.pid}\n")
+            os.replace(tmp, self.pidfile)
+
+
+def _read_pid(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def _kill(pid, signum):
+    try:
+        os.kill(pid, signum)
+    except ProcessLookupError:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bind", default="127.0.0.1:8000")
+    parser.add_argument("--pid", default=None, help="pidfile")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--preload", action="store_true")
+    parser.add_argument("--chdir", default=None)
+    parser.add_argument("app", help="WSGI app as module:name or module:factory()")
+    args = parser.parse_args(argv)
+
+    if args.pid:
+        args.pid = os.path.abspath(args.pid)
+    if args.chdir:
+        os.chdir(args.chdir)
+    sys.path.insert(0, os.getcwd())
+    Master(args).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+noop.py
+
+Detects AI output that would leave the tree as it is.
+
+Models often answer with files that are identical to what is on disk, apart
+from trailing whitespace lost when a code block was stripped. Writing those
+back would still cost a pip run, the tests, a commit attempt and a deploy.
+filter_changed_files() drops every file whose normalized content hash
+matches the file on disk, so a cycle whose output is entirely unchanged can
+stop right after parsing.
+"""
+
+import hashlib
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(text):
+    """
+    Hash file contents ignoring trailing whitespace, so a file written back
+    from a stripped AI code block hashes the same as the original on disk.
+    """
+    normalized = "\n".join(line.rstrip() for line in text.strip().splitlines())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def filter_changed_files(files_dict, root="."):
+    """
+    Return only the entries of files_dict whose content differs from the
+    file currently under root (or that don't exist yet).
+    """
+    changed = {}
+    for filepath, code_str in files_dict.items():
+        try:
+            with open(os.path.join(root, filepath), "r", encoding="utf-8") as f:
+                on_disk = f.read()
+        except (FileNotFoundError, UnicodeDecodeError):
+            changed[filepath] = code_str
+            continue
+        if content_hash(on_disk) != content_hash(code_str):
+            changed[filepath] = code_str
+        else:
+            logger.info(f"Unchanged file from AI: {filepath}")
+    return changed
@@ -0,0 +1,142 @@
+"""
+parsing.py
+
+Turns AI responses made of "File: path" blocks into a {path: code} dict.
+
+StreamingResponseParser accepts the response a chunk at a time and hands
+back each file as soon as it is complete (that is, when the next "File:"
+header arrives), so syntax validation can run while the rest of the
+response is still streaming in. parse_ai_response() feeds a whole response
+through the same parser, so both paths apply identical rules.
+"""
+
+import ast
+import logging
+import re
+
+from autodev.patching import is_edit_block
+
+logger = logging.getLogger(__name__)
+
+FENCE_PATTERN = re.compile(r"```[a-zA-Z]*")
+BLOCK_PATTERN = re.compile(r"File:\s*([^\n]+)(.*)", flags=re.DOTALL)
+FILE_MARKER = "File:"
+
+
+class InvalidGeneratedCode(Exception):
+    """
+    Raised to stop a response early once a generated .py file fails to parse.
+    """
+
+    def __init__(self, file_path, error):
+        super().__init__(f"{file_path}: {error}")
+        self.file_path = file_path
+        self.error = error
+
+
+def strip_fences(text):
+    return FENCE_PATTERN.sub("", text).replace("```", "")
+
+
+def normalize_file_block(file_path, code_block):
+    """
+    Clean up one "File:" block. Returns (path, code), or None if the block
+    must be skipped.
+    """
+    file_path = file_path.strip()
+    code_block = code_block.strip()
+    if file_path.endswith("-->"):
+        file_path = file_path.replace("-->", "").strip()
+    if not file_path.startswith("website/"):
+        file_path = f"website/{file_path.lstrip('/')}"
+    if file_path.startswith("website/tests"):
+        logger.warning(f"AI attempted to modify tests file '{file_path}'. Skipping.")
+        return None
+    # Edit blocks are applied against the real file, so leave them verbatim
+    if file_path.endswith(".py") and not is_edit_block(code_block):
+        code_block = re.sub(r"<!--.*?-->", "", code_block, flags=re.DOTALL)
+        code_block = re.sub(r"<[^>]+>", "", code_block)
+    return file_path, code_block
+
+
+def python_syntax_error(code_str):
+    """
+    Return the SyntaxError for code_str, or None if it parses.
+    """
+    try:
+        ast.parse(code_str)
+    except SyntaxError as e:
+        return e
+    return None
+
+
+class StreamingResponseParser:
+    def __init__(self):
+        self.files = {}
+        self._partial_line = ""
+        self._text = ""
+        self._block_start = None
+        self._scan_from = 0
+
+    def feed(self, chunk):
+        """
+        Add a chunk of the response. Returns the (path, code) pairs of the
+        files completed by this chunk.
+        """
+        self._partial_line += chunk
+        if "\n" not in self._partial_line:
+            return []
+        complete, self._partial_line = self._partial_line.rsplit("\n", 1)
+        # Fences never span lines, so complete lines can be cleaned on arrival.
+        self._text += strip_fences(complete + "\n")
+        return self._scan()
+
+    def close(self):
+        """
+        Flush the final block. Returns the (path, code) pairs completed by the
+        end of the response.
+        """
+        self._text += strip_fences(self._partial_line)
+        self._partial_line = ""
+        completed = self._scan()
+        if self._block_start is not None:
+            completed.extend(self._emit(self._text[self._block_start:]))
+            self._block_start = None
+        return completed
+
+    def _scan(self):
+        completed = []
+        while True:
+            index = self._text.find(FILE_MARKER, self._scan_from)
+            if index == -1:
+                break
+            if self._block_start is not None:
+                completed.extend(self._emit(self._text[self._block_start:index]))
+            self._block_start = index
+            self._scan_from = index + len(FILE_MARKER)
+        # _text only ever grows by whole lines, and a marker never contains a
+        # newline, so nothing before this point can become a marker later.
+        self._scan_from = max(self._scan_from, len(self._text))
+        return completed
+
+    def _emit(self, block):
+        match = BLOCK_PATTERN.match(block)
+        if not match:
+            return []
+        normalized = normalize_file_block(match.group(1), match.group(2))
+        if normalized is None:
+            return []
+        self.files[normalized[0]] = normalized[1]
+        return [normalized]
+
+
+def parse_ai_blocks(ai_response):
+    """
+    Return every (path, code) block of a whole response, in order.
+    """
+    parser = StreamingResponseParser()
+    return parser.feed(ai_response) + parser.close()
+
+
+def parse_ai_response(ai_response):
+    return dict(parse_ai_blocks(ai_response))
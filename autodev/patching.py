@@ -0,0 +1,228 @@
+"""
+patching.py
+
+Applies edit blocks from AI responses to the current tree, so a one-line
+change to a large file costs a few lines of output instead of the whole
+file.
+
+Two edit formats are accepted inside a "File:" block:
+
+    <<<<<<< SEARCH                  @@ -10,3 +10,4 @@
+    lines to replace                 context line
+    =======                         -old line
+    replacement lines               +new line
+    >>>>>>> REPLACE                  context line
+
+A block may hold several edits; a block with neither format is a whole
+file, as before. The search text (or the context and "-" lines of a hunk)
+must match exactly one place in the file; if there is no exact match,
+trailing whitespace is ignored. Line numbers in "@@" headers are only used
+to choose between several matches.
+
+Edits are all-or-nothing: PatchError names the file and hunk that failed,
+why, and the closest lines of the real file, in a form that can be handed
+back to the AI as the failure reason.
+"""
+
+import difflib
+import os
+import re
+
+SEARCH_MARKER = re.compile(r"^<{5,9} ?SEARCH\s*$")
+DIVIDER_MARKER = re.compile(r"^={5,9}\s*$")
+REPLACE_MARKER = re.compile(r"^>{5,9} ?REPLACE\s*$")
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@")
+EDIT_BLOCK = re.compile(r"^(?:<{5,9} ?SEARCH|@@ -\d)", flags=re.MULTILINE)
+MAX_EXCERPT_LINES = 12
+
+
+class PatchError(Exception):
+    def __init__(self, file_path, hunk, reason):
+        super().__init__(f"{file_path}: edit {hunk} failed: {reason}")
+        self.file_path = file_path
+        self.hunk = hunk
+        self.reason = reason
+
+
+class Hunk:
+    __slots__ = ("number", "old", "new", "hint")
+
+    def __init__(self, number, old, new, hint=None):
+        self.number = number
+        self.old = old
+        self.new = new
+        self.hint = hint  # 0-based line the hunk claims to start at
+
+
+def is_edit_block(text):
+    return EDIT_BLOCK.search(text) is not None
+
+
+def parse_search_replace(file_path, text):
+    hunks = []
+    state = None
+    old, new = [], []
+    for line in text.splitlines():
+        if state is None:
+            if SEARCH_MARKER.match(line):
+                state, old, new = "search", [], []
+        elif state == "search":
+            if DIVIDER_MARKER.match(line):
+                state = "replace"
+            else:
+                old.append(line)
+        elif REPLACE_MARKER.match(line):
+            hunks.append(Hunk(len(hunks) + 1, old, new))
+            state = None
+        else:
+            new.append(line)
+    if state is not None:
+        raise PatchError(file_path, len(hunks) + 1, "unterminated SEARCH/REPLACE block")
+    return hunks
+
+
+def parse_unified_diff(file_path, text):
+    hunks = []
+    current = None
+    for line in text.splitlines():
+        header = HUNK_HEADER.match(line)
+        if header:
+            current = Hunk(len(hunks) + 1, [], [], max(0, int(header.group(1)) - 1))
+            hunks.append(current)
+        elif current is None or line.startswith("\\"):
+            # "---"/"+++"/"diff --git" headers come before the first hunk;
+            # inside a hunk "--- x" is a removed line that starts with "-- "
+            continue
+        elif line.startswith("-"):
+            current.old.append(line[1:])
+        elif line.startswith("+"):
+            current.new.append(line[1:])
+        else:
+            # Models often drop the leading space of blank context lines
+            context = line[1:] if line.startswith(" ") else line
+            current.old.append(context)
+            current.new.append(context)
+    for hunk in hunks:
+        if hunk.old == hunk.new:
+            raise PatchError(file_path, hunk.number, "hunk has no '-' or '+' lines")
+    return hunks
+
+
+def parse_edits(file_path, text):
+    if any(SEARCH_MARKER.match(line) for line in text.splitlines()):
+        return parse_search_replace(file_path, text)
+    return parse_unified_diff(file_path, text)
+
+
+def _matches(lines, old, normalize):
+    if normalize:
+        lines = [line.rstrip() for line in lines]
+        old = [line.rstrip() for line in old]
+    size = len(old)
+    first = old[0]
+    return [
+        i for i in range(len(lines) - size + 1)
+        if lines[i] == first and lines[i:i + size] == old
+    ]
+
+
+def _closest(lines, old):
+    """
+    Return (line_index, ratio) of the window of lines most like old.
+    """
+    target = "\n".join(old)
+    best = (0, 0.0)
+    size = len(old)
+    for i in range(max(1, len(lines) - size + 1)):
+        matcher = difflib.SequenceMatcher(None, "\n".join(lines[i:i + size]), target, autojunk=False)
+        if matcher.real_quick_ratio() <= best[1] or matcher.quick_ratio() <= best[1]:
+            continue
+        ratio = matcher.ratio()
+        if ratio > best[1]:
+            best = (i, ratio)
+    return best
+
+
+def _excerpt(lines, start, count):
+    end = min(len(lines), start + min(max(count, 1), MAX_EXCERPT_LINES))
+    return "\n".join(f"{n + 1:>5}| {lines[n]}" for n in range(start, end))
+
+
+def locate(file_path, lines, hunk):
+    """
+    Return the index where hunk.old starts in lines, or raise PatchError.
+    """
+    for normalize in (False, True):
+        found = _matches(lines, hunk.old, normalize)
+        if len(found) == 1:
+            return found[0]
+        if len(found) > 1:
+            if hunk.hint is not None:
+                return min(found, key=lambda i: abs(i - hunk.hint))
+            where = ", ".join(str(i + 1) for i in found[:5])
+            raise PatchError(
+                file_path, hunk.number,
+                f"the search text matches {len(found)} places (lines {where}); include more surrounding lines",
+            )
+    if not lines:
+        raise PatchError(file_path, hunk.number, "the file is empty or does not exist")
+    start, ratio = _closest(lines, hunk.old)
+    raise PatchError(
+        file_path, hunk.number,
+        f"the search text was not found. Closest match ({ratio:.0%} similar) "
+        f"at line {start + 1}:\n{_excerpt(lines, start, len(hunk.old))}",
+    )
+
+
+def apply_hunks(file_path, original, hunks):
+    """
+    Apply hunks in order to original (None for a file that doesn't exist)
+    and return the new text.
+    """
+    if original is None:
+        if len(hunks) == 1 and not any(line.strip() for line in hunks[0].old):
+            return "\n".join(hunks[0].new) + "\n"
+        original = ""
+    lines = original.splitlines()
+    for hunk in hunks:
+        if not any(line.strip() for line in hunk.old):
+            raise PatchError(file_path, hunk.number, "empty search text; copy the lines to replace from the file")
+        start = locate(file_path, lines, hunk)
+        lines[start:start + len(hunk.old)] = hunk.new
+    text = "\n".join(lines)
+    if original.endswith("\n") or not original:
+        text += "\n"
+    return text
+
+
+class EditApplier:
+    """
+    Turns the (path, block) pairs of a parsed response into (path, text)
+    pairs against the tree at root. Later blocks for the same file apply on
+    top of earlier ones. files holds the resolved text of every file seen.
+    """
+
+    def __init__(self, root="."):
+        self.root = root
+        self.files = {}
+
+    def resolve(self, file_path, block):
+        if not is_edit_block(block):
+            self.files[file_path] = block
+            return block
+        original = self.files.get(file_path)
+        if original is None:
+            original = self._read(file_path)
+        text = apply_hunks(file_path, original, parse_edits(file_path, block))
+        self.files[file_path] = text
+        return text
+
+    def resolve_all(self, completed):
+        return [(file_path, self.resolve(file_path, block)) for file_path, block in completed]
+
+    def _read(self, file_path):
+        try:
+            with open(os.path.join(self.root, file_path), "r", encoding="utf-8") as f:
+                return f.read()
+        except (FileNotFoundError, UnicodeDecodeError):
+            return None
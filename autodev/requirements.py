@@ -0,0 +1,142 @@
+"""
+requirements.py
+
+Works out which PyPI distributions generated code needs that the
+requirements file doesn't list yet.
+
+Imports are read with one ast pass per file, so imports inside functions,
+classes and try blocks are found too, and relative imports are ignored.
+Top-level module names are then dropped if they are in the standard library
+(sys.stdlib_module_names), are __future__, or belong to the site itself,
+and the rest are mapped to distribution names through PACKAGE_MAP (module
+name and distribution name usually match, so only the exceptions are
+listed). Callers can extend the map, e.g. from config.yaml.
+
+ImportScanner caches the imports of each file by content hash, so the
+streaming parser can scan files as they arrive and the final check only
+looks the results up.
+"""
+
+import ast
+import hashlib
+import os
+import re
+import sys
+
+# Import name -> distribution name, for the ones that differ
+PACKAGE_MAP = {
+    "bs4": "beautifulsoup4",
+    "cv2": "opencv-python",
+    "dateutil": "python-dateutil",
+    "dotenv": "python-dotenv",
+    "flask_bcrypt": "Flask-Bcrypt",
+    "flask_cors": "Flask-Cors",
+    "flask_limiter": "Flask-Limiter",
+    "flask_login": "Flask-Login",
+    "flask_migrate": "Flask-Migrate",
+    "flask_sqlalchemy": "Flask-SQLAlchemy",
+    "flask_wtf": "Flask-WTF",
+    "git": "GitPython",
+    "jwt": "PyJWT",
+    "PIL": "Pillow",
+    "sklearn": "scikit-learn",
+    "yaml": "PyYAML",
+}
+
+REQUIREMENT_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+STDLIB = set(sys.stdlib_module_names) | {"__future__"}
+
+
+def normalize_distribution(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def imported_modules(tree):
+    """
+    Top-level names of every absolute import in an ast tree.
+    """
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            modules.add(node.module.split(".")[0])
+    return modules
+
+
+def listed_distributions(req_file):
+    """
+    Normalized names of the distributions listed in a requirements file.
+    """
+    names = set()
+    if not os.path.exists(req_file):
+        return names
+    with open(req_file, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            match = REQUIREMENT_NAME.match(line)
+            if match:
+                names.add(normalize_distribution(match.group(1)))
+    return names
+
+
+def local_modules(package_dir, paths=()):
+    """
+    Module names that belong to the site: the package itself, everything
+    directly inside it (tests import `app` with the package dir on
+    sys.path), and the top level of any new paths.
+    """
+    names = {os.path.basename(os.path.normpath(package_dir))}
+    if os.path.isdir(package_dir):
+        for entry in os.listdir(package_dir):
+            name, ext = os.path.splitext(entry)
+            if ext == ".py" or (not ext and os.path.isdir(os.path.join(package_dir, entry))):
+                names.add(name)
+    for path in paths:
+        parts = os.path.relpath(path, package_dir).split(os.sep)
+        if len(parts) > 1:
+            names.add(parts[0])
+        elif parts[0].endswith(".py"):
+            names.add(parts[0][:-3])
+    return names
+
+
+class ImportScanner:
+    def __init__(self, package_map=None):
+        self.package_map = dict(PACKAGE_MAP)
+        if package_map:
+            self.package_map.update(package_map)
+        self._cache = {}
+
+    def scan(self, source, tree=None):
+        """
+        Return the top-level modules source imports. Pass tree if the source
+        has already been parsed. Unparseable source imports nothing.
+        """
+        key = hashlib.sha256(source.encode("utf-8")).digest()
+        modules = self._cache.get(key)
+        if modules is None:
+            if tree is None:
+                try:
+                    tree = ast.parse(source)
+                except SyntaxError:
+                    return set()
+            modules = self._cache[key] = frozenset(imported_modules(tree))
+        return modules
+
+    def missing_distributions(self, files_dict, req_file, package_dir="website"):
+        """
+        Distributions imported by the .py files in files_dict that req_file
+        doesn't list, sorted.
+        """
+        ignored = STDLIB | local_modules(package_dir, files_dict)
+        listed = listed_distributions(req_file)
+        missing = set()
+        for path, source in files_dict.items():
+            if not path.endswith(".py"):
+                continue
+            for module in self.scan(source) - ignored:
+                distribution = self.package_map.get(module, module)
+                if normalize_distribution(distribution) not in listed:
+                    missing.add(distribution)
+        return sorted(missing)
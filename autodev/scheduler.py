@@ -0,0 +1,133 @@
+"""
+scheduler.py
+
+Picks the wait before the next cycle of run_forever from how the last
+cycles went, instead of a fixed interval:
+
+    - after a push the interval shrinks (base * speedup ** streak, down to
+      min_seconds), so a feature that is coming together keeps moving;
+    - after cycles that produced nothing (no-op output, no usable files, API
+      errors, failed pushes) it grows (base * backoff ** streak, up to
+      max_seconds), so a stuck or unavailable model isn't paid to repeat
+      itself;
+    - anything else (failing tests, which feed back into the next prompt,
+      dry runs) waits the base interval;
+    - on top of that, if a token or cost budget per hour is set, the next
+      cycle waits until the last hour's spend plus an average cycle fits.
+
+AdaptiveScheduler only does arithmetic on outcomes and usage, with an
+injectable clock; sleeping and signals are left to the caller.
+"""
+
+import time
+from collections import deque
+
+WINDOW_SECONDS = 3600
+PRODUCTIVE_OUTCOMES = {"pushed"}
+WASTED_OUTCOMES = {"noop", "no_files", "no_context", "api_error", "push_failed", "error"}
+
+
+class AdaptiveScheduler:
+    def __init__(self, base_seconds, min_seconds=None, max_seconds=None, speedup=0.5, backoff=2.0,
+                 hourly_tokens=None, hourly_cost=None, prompt_price=0.0, completion_price=0.0,
+                 clock=time.monotonic):
+        """
+        Prices are per million tokens, in whatever currency hourly_cost is.
+        """
+        self.base = base_seconds
+        self.min = min_seconds if min_seconds is not None else base_seconds / 4
+        self.max = max_seconds if max_seconds is not None else base_seconds * 8
+        self.speedup = speedup
+        self.backoff = backoff
+        self.hourly_tokens = hourly_tokens
+        self.hourly_cost = hourly_cost
+        self.prompt_price = prompt_price
+        self.completion_price = completion_price
+        self.clock = clock
+        self.successes = 0
+        self.wasted = 0
+        self.last_outcome = None
+        self._spend = deque()  # (time, tokens, cost) per cycle within the window
+        self._cycles = 0
+        self._tokens_total = 0
+        self._cost_total = 0.0
+
+    def cost(self, prompt_tokens, completion_tokens):
+        return (prompt_tokens * self.prompt_price + completion_tokens * self.completion_price) / 1_000_000
+
+    def record(self, outcome, prompt_tokens=0, completion_tokens=0):
+        """
+        Record the outcome and API usage of a finished cycle.
+        """
+        self.last_outcome = outcome
+        if outcome in PRODUCTIVE_OUTCOMES:
+            self.successes += 1
+            self.wasted = 0
+        elif outcome in WASTED_OUTCOMES:
+            self.wasted += 1
+            self.successes = 0
+        else:
+            self.successes = 0
+            self.wasted = 0
+        tokens = prompt_tokens + completion_tokens
+        cost = self.cost(prompt_tokens, completion_tokens)
+        self._spend.append((self.clock(), tokens, cost))
+        self._cycles += 1
+        self._tokens_total += tokens
+        self._cost_total += cost
+
+    def next_delay(self):
+        """
+        Return (seconds, reason) to wait before the next cycle.
+        """
+        if self.successes:
+            delay = max(self.min, self.base * self.speedup ** self.successes)
+            reason = f"{self.successes} productive cycle(s) in a row"
+        elif self.wasted:
+            delay = min(self.max, self.base * self.backoff ** self.wasted)
+            reason = f"{self.wasted} wasted cycle(s) in a row (last: {self.last_outcome})"
+        else:
+            delay = self.base
+            reason = "base interval"
+
+        budget_delay, budget_reason = self._budget_delay()
+        if budget_delay > delay:
+            return budget_delay, budget_reason
+        return delay, reason
+
+    def window_spend(self):
+        """
+        (tokens, cost) spent by cycles recorded in the last hour.
+        """
+        self._expire(self.clock())
+        return sum(t for _, t, _ in self._spend), sum(c for _, _, c in self._spend)
+
+    def _expire(self, now):
+        while self._spend and self._spend[0][0] <= now - WINDOW_SECONDS:
+            self._spend.popleft()
+
+    def _budget_delay(self):
+        """
+        How long until the last hour's spend plus an average cycle fits
+        every budget that is set.
+        """
+        if not self._cycles or (self.hourly_tokens is None and self.hourly_cost is None):
+            return 0.0, ""
+        now = self.clock()
+        self._expire(now)
+        expected_tokens = self._tokens_total / self._cycles
+        expected_cost = self._cost_total / self._cycles
+        tokens, cost = self.window_spend()
+        for at, spent_tokens, spent_cost in [(now - WINDOW_SECONDS, 0, 0.0)] + list(self._spend):
+            # Once everything up to and including this entry has expired
+            tokens -= spent_tokens
+            cost -= spent_cost
+            fits_tokens = self.hourly_tokens is None or tokens + expected_tokens <= self.hourly_tokens
+            fits_cost = self.hourly_cost is None or cost + expected_cost <= self.hourly_cost
+            if fits_tokens and fits_cost:
+                wait = max(0.0, at + WINDOW_SECONDS - now)
+                if wait:
+                    return wait, "hourly API budget reached"
+                return 0.0, ""
+        # A single cycle costs more than the budget allows; run hourly
+        return float(WINDOW_SECONDS), "one cycle exceeds the hourly API budget"
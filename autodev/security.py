@@ -0,0 +1,142 @@
+"""
+security.py
+
+Runs bandit over just the files a candidate changed, with findings cached
+per file by content hash, so scan time follows the size of the diff rather
+than the size of the site. The cache keeps the CACHE_ENTRIES most recently
+used digests. scan() is plain blocking code; auto_dev.py runs
+it on a worker thread next to the tests.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_FILE = ".autodev/bandit-cache.json"
+CACHE_ENTRIES = 1000
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class ScanReport:
+    def __init__(self, findings, scanned, cached):
+        self.findings = findings
+        self.scanned = scanned
+        self.cached = cached
+
+    def summary(self):
+        lines = [
+            f"bandit: {len(self.findings)} issue(s) in {self.scanned + self.cached} file(s) "
+            f"({self.scanned} scanned, {self.cached} cached)"
+        ]
+        for finding in self.findings:
+            lines.append(
+                f"  {finding['filename']}:{finding['line_number']} [{finding['test_id']} "
+                f"{finding['issue_severity']}/{finding['issue_confidence']}] {finding['issue_text']}"
+            )
+        return "\n".join(lines)
+
+
+class SecurityScanner:
+    def __init__(self, command=("bandit",), cache_file=DEFAULT_CACHE_FILE):
+        self.command = list(command)
+        self.cache_file = cache_file
+        self._available = None
+        self._lock = threading.Lock()
+        self._cache = self._load_cache()
+
+    def available(self):
+        if self._available is None:
+            self._available = shutil.which(self.command[0]) is not None
+            if not self._available:
+                logger.info("bandit not found, skipping security scan.")
+        return self._available
+
+    def scan(self, paths):
+        """
+        Scan the .py files among paths (ignoring ones that no longer exist)
+        and return a ScanReport. Only files whose content hasn't been
+        scanned before are passed to bandit, in a single run.
+        """
+        digests = {}
+        for path in paths:
+            if path.endswith(".py") and os.path.exists(path):
+                digests[path] = file_digest(path)
+
+        findings = []
+        pending = []
+        with self._lock:
+            for path, digest in digests.items():
+                cached = self._cache.pop(digest, None)
+                if cached is None:
+                    pending.append(path)
+                else:
+                    # Re-inserted, so files that stay unchanged are evicted last
+                    self._cache[digest] = cached
+                    findings.extend(dict(finding, filename=path) for finding in cached)
+
+        if pending:
+            by_file = self._run_bandit(pending)
+            if by_file is not None:
+                with self._lock:
+                    for path in pending:
+                        self._cache[digests[path]] = by_file.get(path, [])
+                    self._save_cache()
+                for path in pending:
+                    findings.extend(by_file.get(path, []))
+        return ScanReport(findings, len(pending), len(digests) - len(pending))
+
+    def _run_bandit(self, paths):
+        """
+        Run bandit once over paths. Returns {path: [finding, ...]}, or None
+        if bandit failed to produce a report.
+        """
+        proc = subprocess.run(
+            self.command + ["-f", "json", "-q", *paths],
+            capture_output=True,
+            text=True,
+        )
+        # bandit exits 1 when it finds issues; anything else without JSON is an error
+        try:
+            report = json.loads(proc.stdout)
+        except ValueError:
+            logger.error(f"Error running bandit (exit code {proc.returncode}): {proc.stderr.strip()}")
+            return None
+        by_file = {}
+        for result in report.get("results", []):
+            finding = {
+                key: result.get(key)
+                for key in ("filename", "line_number", "test_id", "issue_severity", "issue_confidence", "issue_text")
+            }
+            by_file.setdefault(os.path.normpath(result["filename"]), []).append(finding)
+        return {
+            path: [dict(finding, filename=path) for finding in by_file.get(os.path.normpath(path), [])]
+            for path in paths
+        }
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        while len(self._cache) > CACHE_ENTRIES:
+            del self._cache[next(iter(self._cache))]
+        directory = os.path.dirname(self.cache_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.cache_file}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._cache, f)
+        os.replace(tmp, self.cache_file)
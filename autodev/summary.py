@@ -0,0 +1,158 @@
+"""
+summary.py
+
+Describes a change set locally, so commit messages don't need a model
+round trip with the full old and new source.
+
+describe_changes() compares the old and new text of each changed file:
+
+    - Python files are compared with ast: routes (functions decorated with
+      .route(...)) added or removed, and other functions and classes added,
+      removed or changed;
+    - templates and other files are reported as added or modified.
+
+The result is deterministic: the same change always gives the same summary.
+compact_diff() produces a size-capped unified diff for callers that still
+want a model to write a richer summary.
+"""
+
+import ast
+import difflib
+import os
+
+MAX_NAMES = 6
+MAX_DIFF_LINES = 200
+
+
+def _route_paths(node):
+    paths = []
+    for decorator in node.decorator_list:
+        if (
+            isinstance(decorator, ast.Call)
+            and isinstance(decorator.func, ast.Attribute)
+            and decorator.func.attr == "route"
+            and decorator.args
+            and isinstance(decorator.args[0], ast.Constant)
+        ):
+            paths.append(str(decorator.args[0].value))
+    return paths
+
+
+def python_outline(source):
+    """
+    Return ({route_path: function_name}, {name: ast_dump}) for the top-level
+    functions and classes of a module, or None if it doesn't parse.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+    routes = {}
+    definitions = {}
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            definitions[node.name] = ast.dump(node)
+            if not isinstance(node, ast.ClassDef):
+                for path in _route_paths(node):
+                    routes[path] = node.name
+    return routes, definitions
+
+
+class ChangeSet:
+    def __init__(self):
+        self.routes_added = []
+        self.routes_removed = []
+        self.functions_added = []
+        self.functions_removed = []
+        self.functions_changed = []
+        self.templates_added = []
+        self.templates_modified = []
+        self.files_added = []
+        self.files_modified = []
+
+    def count(self):
+        return sum(len(names) for names in vars(self).values())
+
+    def summary(self):
+        parts = []
+        for label, names in (
+            ("added routes", self.routes_added),
+            ("removed routes", self.routes_removed),
+            ("added", self.functions_added),
+            ("removed", self.functions_removed),
+            ("changed", self.functions_changed),
+            ("added templates", self.templates_added),
+            ("modified templates", self.templates_modified),
+            ("added files", self.files_added),
+            ("modified files", self.files_modified),
+        ):
+            if names:
+                shown = ", ".join(sorted(names)[:MAX_NAMES])
+                if len(names) > MAX_NAMES:
+                    shown += f" and {len(names) - MAX_NAMES} more"
+                parts.append(f"{label} {shown}")
+        if not parts:
+            return "No functional changes."
+        text = "; ".join(parts)
+        return text[0].upper() + text[1:] + "."
+
+
+def describe_changes(old_files, new_files):
+    """
+    old_files maps path -> previous text (None for new files), new_files
+    maps path -> new text. Returns a ChangeSet.
+    """
+    changes = ChangeSet()
+    for path in sorted(new_files):
+        old = old_files.get(path)
+        new = new_files[path]
+        if old == new:
+            continue
+        if path.endswith(".html"):
+            name = os.path.basename(path)
+            (changes.templates_added if old is None else changes.templates_modified).append(name)
+            continue
+        if old is None:
+            changes.files_added.append(path)
+        new_outline = python_outline(new) if path.endswith(".py") else None
+        old_outline = python_outline(old) if new_outline and old is not None else ({}, {})
+        if new_outline is None or old_outline is None:
+            if old is not None:
+                changes.files_modified.append(path)
+            continue
+
+        old_routes, old_defs = old_outline
+        new_routes, new_defs = new_outline
+        reported = changes.count()
+        changes.routes_added.extend(r for r in new_routes if r not in old_routes)
+        changes.routes_removed.extend(r for r in old_routes if r not in new_routes)
+        # Route handlers are reported as routes; a new file's contents aren't listed
+        handlers = set(old_routes.values()) | set(new_routes.values())
+        for name, dump in new_defs.items():
+            if name not in old_defs:
+                if old is not None and name not in handlers:
+                    changes.functions_added.append(name)
+            elif old_defs[name] != dump:
+                changes.functions_changed.append(name)
+        changes.functions_removed.extend(n for n in old_defs if n not in new_defs and n not in handlers)
+        if old is not None and changes.count() == reported:
+            # Only module-level code changed
+            changes.files_modified.append(path)
+    return changes
+
+
+def compact_diff(old_files, new_files, max_lines=MAX_DIFF_LINES):
+    """
+    A unified diff of the change set with 1 line of context, capped at
+    max_lines.
+    """
+    lines = []
+    for path in sorted(new_files):
+        old = old_files.get(path) or ""
+        lines.extend(difflib.unified_diff(
+            old.splitlines(), new_files[path].splitlines(),
+            fromfile=f"a/{path}", tofile=f"b/{path}", n=1, lineterm="",
+        ))
+    if len(lines) > max_lines:
+        lines = lines[:max_lines] + [f"... ({len(lines) - max_lines} more diff lines)"]
+    return "\n".join(lines)
@@ -0,0 +1,352 @@
+"""
+testing.py
+
+Runs the site's test suite for a candidate tree, doing as little work as
+possible:
+
+    - results are cached by a content hash of the site (tests included), so
+      a tree that has been tested before is never tested again;
+    - only the test files affected by the changed files are run, found by
+      following imports between the site's modules (and template names
+      referenced from them) back to the tests that import them;
+    - the selected test files are split across worker processes, one per
+      core, each writing a JUnit XML report.
+
+The reports are parsed into a TestReport whose failure_reason() is compact
+enough to hand straight back to the AI.
+"""
+
+import ast
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_FILE = ".autodev/test-results.json"
+CACHE_ENTRIES = 200
+SKIP_DIRS = {"__pycache__", ".pytest_cache"}
+SKIP_SUFFIXES = (".pyc", ".db", ".db-shm", ".db-wal")
+MAX_REASON_FAILURES = 5
+MAX_MESSAGE_CHARS = 400
+STOPPED_FAILURE = {"test": "(run)", "kind": "error", "message": "Stopped before tests finished.", "details": ""}
+
+
+def tree_hash(root, package="website"):
+    """
+    Hash every file under root/package by path and content.
+    """
+    digest = hashlib.sha256()
+    base = os.path.join(root, package)
+    for dirpath, dirnames, filenames in os.walk(base):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for fname in sorted(filenames):
+            if fname.endswith(SKIP_SUFFIXES):
+                continue
+            path = os.path.join(dirpath, fname)
+            digest.update(os.path.relpath(path, root).encode("utf-8") + b"\0")
+            with open(path, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+class TestReport:
+    __test__ = False  # not a pytest test class
+
+    def __init__(self, passed, selected, total=0, failures=None, duration=0.0, cached=False, tree=""):
+        self.passed = passed
+        self.selected = selected
+        self.total = total
+        self.failures = failures or []
+        self.duration = duration
+        self.cached = cached
+        self.tree = tree
+
+    def to_dict(self):
+        return {
+            "passed": self.passed,
+            "selected": self.selected,
+            "total": self.total,
+            "failures": self.failures,
+            "duration": self.duration,
+            "tree": self.tree,
+        }
+
+    @classmethod
+    def from_dict(cls, data, cached=False):
+        return cls(
+            data["passed"], data["selected"], data.get("total", 0), data.get("failures"),
+            data.get("duration", 0.0), cached, data.get("tree", ""),
+        )
+
+    def failure_reason(self):
+        if self.passed:
+            return ""
+        lines = [f"{len(self.failures)} test(s) failed:"]
+        for failure in self.failures[:MAX_REASON_FAILURES]:
+            lines.append(f"- {failure['test']}: {failure['message'][:MAX_MESSAGE_CHARS]}")
+        if len(self.failures) > MAX_REASON_FAILURES:
+            lines.append(f"- ... and {len(self.failures) - MAX_REASON_FAILURES} more")
+        return "\n".join(lines)
+
+
+class ImpactMap:
+    """
+    Which test files depend on which site files, from the imports in the
+    tree at root.
+    """
+
+    def __init__(self, root, package="website", tests_dir="tests"):
+        self.root = root
+        self.package = package
+        self.tests_prefix = f"{package}/{tests_dir}/"
+        self.modules = {}
+        self.tests = {}
+        package_dir = os.path.join(root, package)
+        for dirpath, dirnames, filenames in os.walk(package_dir):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+            for fname in filenames:
+                if not fname.endswith(".py"):
+                    continue
+                rel = os.path.relpath(os.path.join(dirpath, fname), root).replace(os.sep, "/")
+                with open(os.path.join(root, rel), "r", encoding="utf-8") as f:
+                    source = f.read()
+                entry = (self._imports(source), source)
+                if rel.startswith(self.tests_prefix):
+                    if fname.startswith("test_"):
+                        self.tests[rel] = entry
+                else:
+                    self.modules[rel] = entry
+
+    def _resolve(self, name):
+        """
+        Map a dotted module name (relative to the package or the package
+        directory) to a module path, or None if it's not ours.
+        """
+        parts = [p for p in name.split(".") if p]
+        if parts and parts[0] == self.package:
+            parts = parts[1:]
+        if not parts:
+            return f"{self.package}/__init__.py"
+        for candidate in ("/".join(parts) + ".py", "/".join(parts) + "/__init__.py"):
+            path = f"{self.package}/{candidate}"
+            if path in self.modules:
+                return path
+        return None
+
+    def _imports(self, source):
+        try:
+            tree = ast.parse(source)
+        except SyntaxError:
+            return None
+        names = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                module = node.module or ""
+                base = module if node.level == 0 else f"{self.package}.{module}"
+                names.add(base)
+                # "from website import extensions" imports a submodule
+                names.update(f"{base}.{alias.name}" for alias in node.names)
+        return names
+
+    def _dependencies(self, imports):
+        if imports is None:
+            return None
+        return {path for path in map(self._resolve, imports) if path}
+
+    def affected_tests(self, changed):
+        """
+        Return the sorted test files affected by the changed paths, or None
+        if the change can't be traced and everything should run.
+        """
+        affected_modules = set()
+        selected = set()
+        for path in changed:
+            path = path.replace(os.sep, "/")
+            if path in self.tests:
+                selected.add(path)
+            elif path in self.modules:
+                affected_modules.add(path)
+            elif path.endswith(".html"):
+                name = os.path.basename(path)
+                users = {p for p, (_, source) in self.modules.items() if name in source}
+                if not users:
+                    return None
+                affected_modules.update(users)
+            elif not path.startswith(f"{self.package}/static/"):
+                # conftest.py, requirements.txt and anything else we can't trace
+                return None
+
+        dependencies = {}
+        for path, (imports, _) in list(self.modules.items()) + list(self.tests.items()):
+            deps = self._dependencies(imports)
+            if deps is None:
+                return None
+            dependencies[path] = deps
+
+        # Everything that imports a changed module, directly or not
+        frontier = set(affected_modules)
+        while frontier:
+            frontier = {
+                path for path, deps in dependencies.items()
+                if path in self.modules and path not in affected_modules and deps & frontier
+            }
+            affected_modules |= frontier
+        for test, deps in dependencies.items():
+            if test in self.tests and deps & affected_modules:
+                selected.add(test)
+        return sorted(selected)
+
+    def all_tests(self):
+        return sorted(self.tests)
+
+
+def parse_junit(path):
+    """
+    Return (total, failures) from a JUnit XML report.
+    """
+    total = 0
+    failures = []
+    root = ET.parse(path).getroot()
+    for case in root.iter("testcase"):
+        total += 1
+        for tag in ("failure", "error"):
+            problem = case.find(tag)
+            if problem is not None:
+                test = "::".join(filter(None, (case.get("classname"), case.get("name"))))
+                failures.append({
+                    "test": test,
+                    "kind": tag,
+                    "message": (problem.get("message") or "").strip(),
+                    "details": (problem.text or "")[-2000:],
+                })
+                break
+    return total, failures
+
+
+class TestRunner:
+    __test__ = False  # not a pytest test class
+
+    def __init__(self, python=sys.executable, cache_file=DEFAULT_CACHE_FILE, workers=None, maxfail=None):
+        self.python = python
+        self.cache_file = cache_file
+        self.workers = workers or os.cpu_count() or 1
+        self.maxfail = maxfail
+        self._cache = self._load_cache()
+        self._lock = threading.Lock()
+
+    def run(self, root=".", changed=None, stop=None, timeout=None):
+        """
+        Test the tree at root. changed is the list of paths that differ from
+        the last tested tree; None runs everything. The run is abandoned
+        (and not cached) if stop is set or timeout seconds pass.
+        """
+        impact = ImpactMap(root)
+        selected = impact.affected_tests(changed) if changed is not None else None
+        if selected is None:
+            selected = impact.all_tests()
+        tree = tree_hash(root)
+        key = f"{tree}:{hashlib.sha256(json.dumps(selected).encode('utf-8')).hexdigest()[:16]}"
+        full_key = f"{tree}:{hashlib.sha256(json.dumps(impact.all_tests()).encode('utf-8')).hexdigest()[:16]}"
+        with self._lock:
+            cached = self._cache.get(key) or self._cache.get(full_key)
+        if cached:
+            logger.info(f"Tree {tree[:12]} already tested; reusing the cached result.")
+            return TestReport.from_dict(cached, cached=True)
+
+        if not selected:
+            logger.info("No tests are affected by the changed files.")
+            report = TestReport(True, selected, tree=tree)
+        else:
+            logger.info(f"Running {len(selected)} of {len(impact.all_tests())} test files.")
+            report = self._run_groups(root, selected, tree, stop, timeout)
+            if report is None:
+                return TestReport(False, selected, failures=[STOPPED_FAILURE], tree=tree)
+        self._store(key, report)
+        return report
+
+    def _run_groups(self, root, selected, tree, stop=None, timeout=None):
+        count = max(1, min(self.workers, len(selected)))
+        groups = [selected[i::count] for i in range(count)]
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix="autodev-junit-") as tmpdir:
+            procs = []
+            for i, group in enumerate(groups):
+                xml = os.path.join(tmpdir, f"group{i}.xml")
+                command = [self.python, "-m", "pytest", "-q", "-p", "no:cacheprovider", f"--junitxml={xml}"]
+                if self.maxfail:
+                    command.append(f"--maxfail={self.maxfail}")
+                out = tempfile.TemporaryFile(mode="w+", encoding="utf-8", dir=tmpdir)
+                proc = subprocess.Popen(command + group, cwd=root, stdout=out, stderr=subprocess.STDOUT, text=True)
+                procs.append((proc, xml, out, group))
+
+            if not self._wait(procs, stop, timeout):
+                return None
+
+            total = 0
+            failures = []
+            passed = True
+            for proc, xml, out, group in procs:
+                returncode = proc.returncode
+                out.seek(0)
+                output = out.read()
+                out.close()
+                if os.path.exists(xml):
+                    group_total, group_failures = parse_junit(xml)
+                    total += group_total
+                    failures.extend(group_failures)
+                # Exit code 5 means no tests were collected, which is fine
+                if returncode not in (0, 5):
+                    passed = False
+                    if not os.path.exists(xml) or not failures:
+                        tail = "\n".join(output.strip().splitlines()[-20:])
+                        failures.append({"test": " ".join(group), "kind": "error", "message": tail, "details": output[-2000:]})
+        return TestReport(passed, selected, total, failures, time.perf_counter() - start, tree=tree)
+
+    @staticmethod
+    def _wait(procs, stop, timeout):
+        """
+        Wait for every group, or terminate them all if stop is set or the
+        timeout passes. Returns False if they were terminated.
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        while any(proc.poll() is None for proc, *_ in procs):
+            if (stop is not None and stop.is_set()) or (deadline and time.monotonic() > deadline):
+                for proc, *_ in procs:
+                    if proc.poll() is None:
+                        proc.kill()
+                    proc.wait()
+                for _, _, out, _ in procs:
+                    out.close()
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _store(self, key, report):
+        with self._lock:
+            self._cache[key] = report.to_dict()
+            while len(self._cache) > CACHE_ENTRIES:
+                del self._cache[next(iter(self._cache))]
+            directory = os.path.dirname(self.cache_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._cache, f)
+            os.replace(tmp, self.cache_file)
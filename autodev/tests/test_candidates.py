@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from autodev.candidates import run_candidates, validate_in_worktree
+
+# Passes only if website/value.txt says "good"; "slow" hangs until stopped
+CHECK = (
+    "import sys, time\n"
+    "value = open('website/value.txt').read().strip()\n"
+    "if value == 'slow':\n"
+    "    time.sleep(60)\n"
+    "print('value is', value)\n"
+    "sys.exit(0 if value == 'good' else 1)\n"
+)
+
+
+class TestCandidates(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.repo = self.tmpdir.name
+        self.git("init", "-q")
+        os.makedirs(os.path.join(self.repo, "website"))
+        self.write("website/value.txt", "original\n")
+        self.write("check.py", CHECK)
+        self.git("add", ".")
+        self.git("-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-q", "-m", "init")
+        self.command = [sys.executable, "check.py"]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def git(self, *args):
+        return subprocess.run(["git", *args], cwd=self.repo, check=True, capture_output=True, text=True).stdout
+
+    def write(self, name, text):
+        with open(os.path.join(self.repo, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def read(self, name):
+        with open(os.path.join(self.repo, name), encoding="utf-8") as f:
+            return f.read()
+
+    def worktrees(self):
+        return self.git("worktree", "list").strip().splitlines()
+
+    def test_validate_does_not_touch_live_tree(self):
+        passed, reason = validate_in_worktree({"website/value.txt": "bad"}, self.command, self.repo)
+        self.assertFalse(passed)
+        self.assertIn("value is bad", reason)
+        passed, _ = validate_in_worktree({"website/value.txt": "good"}, self.command, self.repo)
+        self.assertTrue(passed)
+        self.assertEqual(self.read("website/value.txt"), "original\n")
+        self.assertEqual(len(self.worktrees()), 1)
+
+    def test_first_passing_candidate_wins_and_stops_the_rest(self):
+        values = ["bad", "slow", "good"]
+
+        def validate(files, stop):
+            return validate_in_worktree(files, self.command, self.repo, stop=stop)
+
+        start = time.monotonic()
+        winner, results = run_candidates(lambda i, stop: {"website/value.txt": values[i]}, validate, len(values))
+        self.assertLess(time.monotonic() - start, 30)
+        self.assertEqual(winner.index, 2)
+        # The slow candidate is terminated and its worktree removed
+        deadline = time.monotonic() + 10
+        while len(self.worktrees()) > 1 and time.monotonic() < deadline:
+            time.sleep(0.1)
+        self.assertEqual(len(self.worktrees()), 1)
+
+    def test_losing_generation_is_stopped_before_returning(self):
+        abandoned = []
+        streaming = threading.Event()
+
+        def generate(index, stop):
+            if index == 0:
+                streaming.wait(5)
+                return {"website/value.txt": "good"}
+            streaming.set()
+            # A slow stream that notices stop between chunks
+            while not stop.wait(0.05):
+                pass
+            abandoned.append(index)
+            return {}
+
+        winner, _ = run_candidates(generate, lambda files, stop: (True, ""), 2)
+        self.assertEqual(winner.index, 0)
+        self.assertEqual(abandoned, [1])
+
+    def test_no_winner(self):
+        winner, results = run_candidates(lambda i, stop: {}, lambda files, stop: (True, ""), 2)
+        self.assertIsNone(winner)
+        self.assertEqual(len(results), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from autodev.context import ContextBuilder, estimate_tokens, python_skeleton
+
+ROUTES = '''from flask import Blueprint, render_template
+from .timeline import Timeline
+
+main = Blueprint('main', __name__)
+
+@main.route('/')
+def home():
+    """Render the home page."""
+    return render_template('index.html')
+'''
+
+
+class TestContextBuilder(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        self.write("routes.py", ROUTES)
+        self.write("timeline.py", "def build():\n    return [" + "1, " * 200 + "]\n")
+        self.write("unrelated.py", "X = 1\n" * 200)
+        self.write("templates/index.html", "{% block body %}<p>home</p>{% endblock %}\n")
+        self.write("tests/test_routes.py", "assert True\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def test_only_changed_files_are_reread(self):
+        builder = ContextBuilder(self.root)
+        builder.build()
+        self.assertEqual(builder.last_stats["read"], 4)
+        builder.build()
+        self.assertEqual(builder.last_stats["read"], 0)
+        self.write("timeline.py", "def build():\n    return []\n")
+        os.remove(self.path("unrelated.py"))
+        context = builder.build()
+        self.assertEqual(builder.last_stats["read"], 1)
+        self.assertEqual(builder.last_stats["files"], 3)
+        self.assertIn("return []", context)
+        self.assertNotIn("test_routes", context)
+
+    def test_rank_prefers_failures_then_routes_then_references(self):
+        builder = ContextBuilder(self.root)
+        builder.refresh()
+        ranked = [os.path.relpath(p, self.root) for p in builder.rank()]
+        self.assertEqual(ranked[0], "routes.py")
+        self.assertEqual(set(ranked[1:3]), {"timeline.py", os.path.join("templates", "index.html")})
+        self.assertEqual(ranked[3], "unrelated.py")
+        ranked = builder.rank("FAILED tests/test_unrelated.py::test_x - AssertionError")
+        self.assertEqual(ranked[0], self.path("unrelated.py"))
+
+    def test_budget_skeletonizes_and_omits(self):
+        builder = ContextBuilder(self.root, token_budget=200)
+        context = builder.build()
+        self.assertLessEqual(estimate_tokens(context), 220)
+        self.assertIn(ROUTES, context)
+        self.assertIn(f"### File: {self.path('timeline.py')} (skeleton", context)
+        self.assertIn("Other files (not shown): " + self.path("unrelated.py"), context)
+        self.assertEqual(builder.last_stats["omitted"], 1)
+
+
+class TestPythonSkeleton(unittest.TestCase):
+    def test_keeps_signatures_and_docstrings(self):
+        skeleton = python_skeleton(ROUTES)
+        self.assertIn("from .timeline import Timeline", skeleton)
+        self.assertIn("@main.route('/')\ndef home():\n    \"\"\"Render the home page.\"\"\"\n    ...", skeleton)
+        self.assertNotIn("render_template('index.html')", skeleton)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from autodev.deepseek_client import DeepSeekClient
+from autodev.mock_deepseek import MockDeepSeekServer
+
+TEXT = "File: website/a.py\nx = 'é'\nFile: website/b.py\ny = 2\n"
+PAYLOAD = {"model": "deepseek-chat", "messages": []}
+
+
+class TestDeepSeekClient(unittest.TestCase):
+    def setUp(self):
+        self.server = MockDeepSeekServer(response_text=TEXT, chunk_size=5).start()
+        self.client = DeepSeekClient("test-key", self.server.url)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_complete_reuses_one_connection(self):
+        for _ in range(3):
+            result = self.client.complete(PAYLOAD)
+            self.assertEqual(result["choices"][0]["message"]["content"], TEXT)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_stream_yields_deltas(self):
+        chunks = list(self.client.stream(PAYLOAD))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), TEXT)
+        self.assertTrue(self.server.requests[-1]["stream"])
+        self.assertNotIn("stream", PAYLOAD)
+        # Streaming and plain calls share the pooled connection
+        self.client.complete(PAYLOAD)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_stats_count_requests_and_reported_usage(self):
+        self.client.complete(PAYLOAD)
+        "".join(self.client.stream(PAYLOAD))
+        stats = self.client.stats()
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["failures"], 0)
+        self.assertEqual(stats["completion_tokens"], 2 * (len(TEXT) // 4))
+        self.assertGreater(stats["seconds"], 0)
+        self.assertTrue(self.server.requests[-1]["stream_options"]["include_usage"])
+
+    def test_stats_count_a_stream_closed_early(self):
+        payload = dict(PAYLOAD, messages=[{"role": "user", "content": "x" * 400}])
+        stream = self.client.stream(payload)
+        first = next(stream)
+        stream.close()
+        stats = self.client.stats()
+        self.assertEqual((stats["requests"], stats["failures"]), (1, 0))
+        self.assertEqual(stats["prompt_tokens"], 100)
+        self.assertEqual(stats["completion_tokens"], -(-len(first) // 4))
+
+    @mock.patch("autodev.deepseek_client.time")
+    def test_retries_before_first_chunk(self, fake_time):
+        self.server.fail_first = 2
+        self.assertEqual("".join(self.client.stream(PAYLOAD)), TEXT)
+        self.assertEqual([c.args[0] for c in fake_time.sleep.call_args_list], [1, 2])
+
+    @mock.patch("autodev.deepseek_client.time")
+    def test_gives_up_after_retries(self, fake_time):
+        self.server.fail_first = 3
+        self.assertIsNone(self.client.complete(PAYLOAD))
+        self.assertEqual(len(self.server.requests), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
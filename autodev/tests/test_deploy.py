@@ -0,0 +1,209 @@
+import unittest
+import sys
+import os
+import json
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.request
+
+# Add the repository root to sys.path:
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, REPO_ROOT)
+
+from autodev.deploy import Deployer, GracefulReloader, ReloadError, pid_alive, read_pid, tree_fingerprint
+
+APP = """\
+import json
+import os
+
+RELEASE = {release!r}
+
+def app(environ, start_response):
+    status = {status!r}
+    body = json.dumps({{"release": RELEASE, "master": os.getppid()}}).encode()
+    start_response(status, [("Content-Type", "application/json")])
+    return [body]
+"""
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeReloader:
+    pidfile = "site.pid"
+
+    def __init__(self, master=100, fail=False):
+        self.master = master
+        self.fail = fail
+        self.reloads = 0
+
+    def running(self):
+        return self.master
+
+    def reload(self):
+        self.reloads += 1
+        if self.fail:
+            raise ReloadError("unhealthy")
+        self.master += 1
+        return self.master
+
+
+class TestDeployer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.site = os.path.join(self.tmp.name, "website")
+        self.state = os.path.join(self.tmp.name, "state", "deploy.json")
+        write(os.path.join(self.site, "app.py"), "app = 1\n")
+        write(os.path.join(self.site, "templates", "index.html"), "<p>hi</p>\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fingerprint_ignores_tests_and_caches(self):
+        before = tree_fingerprint([self.site])
+        write(os.path.join(self.site, "tests", "test_app.py"), "pass\n")
+        write(os.path.join(self.site, "__pycache__", "app.cpython-311.pyc"), "x")
+        write(os.path.join(self.site, "site.db-wal"), "x")
+        self.assertEqual(tree_fingerprint([self.site]), before)
+        write(os.path.join(self.site, "templates", "index.html"), "<p>hello</p>\n")
+        changed = tree_fingerprint([self.site])
+        self.assertNotEqual(changed, before)
+        os.unlink(os.path.join(self.site, "templates", "index.html"))
+        self.assertNotEqual(tree_fingerprint([self.site]), changed)
+
+    def test_reloads_only_when_the_tree_changed(self):
+        reloader = FakeReloader()
+        deployer = Deployer([self.site], reloader, state_file=self.state)
+        self.assertEqual(deployer.deploy(), "reloaded")
+        self.assertEqual(deployer.deploy(), "unchanged")
+        # The state survives a restart of auto_dev
+        self.assertEqual(Deployer([self.site], reloader, state_file=self.state).deploy(), "unchanged")
+        write(os.path.join(self.site, "app.py"), "app = 2\n")
+        self.assertEqual(deployer.deploy(), "reloaded")
+        self.assertEqual(reloader.reloads, 2)
+
+    def test_failed_reload_is_retried(self):
+        reloader = FakeReloader(fail=True)
+        deployer = Deployer([self.site], reloader, state_file=self.state)
+        self.assertEqual(deployer.deploy(), "failed")
+        self.assertEqual(deployer.deploy(), "failed")
+        self.assertEqual(reloader.reloads, 2)
+        reloader.fail = False
+        self.assertEqual(deployer.deploy(), "reloaded")
+
+    def test_falls_back_to_restart_without_a_master(self):
+        restarts = []
+        reloader = FakeReloader(master=None)
+        deployer = Deployer([self.site], reloader, state_file=self.state, fallback=lambda: restarts.append(1) or True)
+        self.assertEqual(deployer.deploy(), "restarted")
+        self.assertEqual(deployer.deploy(), "unchanged")
+        self.assertEqual((restarts, reloader.reloads), ([1], 0))
+
+
+class TestGracefulReload(unittest.TestCase):
+    """
+    Rolling reloads against autodev/mock_gunicorn.py serving a small WSGI app.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.app_dir = os.path.join(self.tmp.name, "site")
+        self.pidfile = os.path.join(self.tmp.name, "site.pid")
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}/healthz"
+        self.write_app("v1")
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "autodev.mock_gunicorn", "--bind", f"127.0.0.1:{self.port}",
+             "--pid", self.pidfile, "--workers", "2", "--preload", "--chdir", self.app_dir, "app:app"],
+            cwd=REPO_ROOT,
+            env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+        )
+        # Reap the first master when it exits, as systemd would
+        threading.Thread(target=self.proc.wait, daemon=True).start()
+        deadline = time.monotonic() + 10
+        while self.get() is None:
+            self.assertLess(time.monotonic(), deadline, "stand-in did not come up")
+            time.sleep(0.05)
+        self.reloader = GracefulReloader(self.pidfile, self.url, timeout=10, poll_interval=0.05)
+
+    def tearDown(self):
+        for pidfile in (self.pidfile, self.pidfile + ".2"):
+            pid = read_pid(pidfile)
+            if pid is not None and pid_alive(pid):
+                os.kill(pid, signal.SIGTERM)
+        if self.proc.poll() is None:
+            self.proc.terminate()
+        deadline = time.monotonic() + 5
+        while read_pid(self.pidfile) is not None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.tmp.cleanup()
+
+    def write_app(self, release, status="200 OK"):
+        write(os.path.join(self.app_dir, "app.py"), APP.format(release=release, status=status))
+
+    def get(self):
+        try:
+            with urllib.request.urlopen(self.url, timeout=5) as response:
+                return json.loads(response.read())
+        except OSError:
+            return None
+
+    def test_reload_switches_release_without_dropping_requests(self):
+        old = read_pid(self.pidfile)
+        self.write_app("v2")
+        seen, failures, stop = [], [], threading.Event()
+
+        def hammer():
+            while not stop.is_set():
+                data = self.get()
+                if data is None:
+                    failures.append(1)
+                else:
+                    seen.append(data["release"])
+
+        client = threading.Thread(target=hammer)
+        client.start()
+        try:
+            new = self.reloader.reload()
+            time.sleep(0.3)
+        finally:
+            stop.set()
+            client.join()
+
+        self.assertEqual(failures, [])
+        self.assertIn("v1", seen)
+        self.assertEqual(seen[-1], "v2")
+        self.assertNotEqual(new, old)
+        self.assertEqual(read_pid(self.pidfile), new)
+        self.assertFalse(pid_alive(old))
+        self.assertEqual(self.get(), {"release": "v2", "master": new})
+
+    def test_unhealthy_release_is_rolled_back(self):
+        old = read_pid(self.pidfile)
+        self.write_app("v2", status="500 Internal Server Error")
+        self.reloader.timeout = 2
+        with self.assertRaises(ReloadError):
+            self.reloader.reload()
+        self.assertEqual(read_pid(self.pidfile), old)
+        deadline = time.monotonic() + 5
+        while os.path.exists(self.pidfile + ".2") and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertFalse(os.path.exists(self.pidfile + ".2"))
+        self.assertEqual(self.get(), {"release": "v1", "master": old})
+
+
+if __name__ == "__main__":
+    unittest.main()
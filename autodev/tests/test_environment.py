@@ -0,0 +1,97 @@
+import unittest
+import sys
+import os
+import subprocess
+import tempfile
+from unittest import mock
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from autodev.environment import EnvironmentManager, InstallError, requirement_lines
+
+
+class RecordingManager(EnvironmentManager):
+    """Records pip invocations instead of running pip."""
+
+    fail_delta = False
+
+    def _pip(self, args):
+        self.calls.append(list(args))
+        if self.fail_delta and args[0] != "-r":
+            raise InstallError("no matching distribution")
+        return "ok"
+
+
+class TestEnvironmentManager(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.req = os.path.join(self.tmpdir.name, "requirements.txt")
+        self.state = os.path.join(self.tmpdir.name, "state", "install.json")
+        self.write("Flask\nflask-login  # sessions\n\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, text):
+        with open(self.req, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def manager(self):
+        manager = RecordingManager(self.req, state_file=self.state)
+        manager.calls = []
+        return manager
+
+    def test_requirement_lines_are_normalized(self):
+        self.write("Flask\n# comment\nflask\n  Requests==2.0 \n")
+        self.assertEqual(requirement_lines(self.req), ["flask", "requests==2.0"])
+
+    def test_unchanged_requirements_skip_pip_across_runs(self):
+        first = self.manager()
+        first.ensure()
+        self.assertEqual(first.calls, [["-r", self.req]])
+        # A new process picks the fingerprint up from the state file
+        second = self.manager()
+        self.assertEqual(second.ensure(), "")
+        self.assertEqual(second.calls, [])
+        self.assertGreaterEqual(second.last_saved_seconds, 0.0)
+
+    def test_only_the_delta_is_installed(self):
+        self.manager().ensure()
+        self.write("Flask\nflask-login\nbcrypt\n")
+        manager = self.manager()
+        manager.ensure()
+        self.assertEqual(manager.calls, [["bcrypt"]])
+        # Reordering or removing lines doesn't trigger an install
+        self.write("bcrypt\nflask\n")
+        manager.ensure()
+        self.assertEqual(manager.calls, [["bcrypt"]])
+
+    def test_failed_delta_falls_back_to_full_install(self):
+        self.manager().ensure()
+        self.write("Flask\nflask-login\nbcrypt\n")
+        manager = self.manager()
+        manager.fail_delta = True
+        manager.ensure()
+        self.assertEqual(manager.calls, [["bcrypt"], ["-r", self.req]])
+
+    def test_install_batches_missing_packages(self):
+        manager = self.manager()
+        manager.ensure()
+        manager.install(["Bcrypt", "flask", "requests"])
+        self.assertEqual(manager.calls[-1], ["bcrypt", "requests"])
+        self.assertEqual(manager.install(["bcrypt"]), "")
+
+    def test_failed_venv_creation_raises_install_error(self):
+        manager = RecordingManager(self.req, state_file=self.state, venv_dir=os.path.join(self.tmpdir.name, "venv"))
+        manager.calls = []
+        error = subprocess.CalledProcessError(1, ["python", "-m", "venv"], stderr=b"ensurepip is not available")
+        with mock.patch("autodev.environment.subprocess.run", side_effect=error):
+            with self.assertRaises(InstallError) as raised:
+                manager.ensure()
+        self.assertIn("ensurepip is not available", str(raised.exception))
+        self.assertEqual(manager.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import sys
+import os
+import gzip
+import io
+import tempfile
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from autodev.log_analyzer import CONTINUATION_LINES, analyze, input_paths, iter_cycles, iter_entries
+
+# Oldest segment: one cycle that retries the API, gets a response and pushes
+# a no-op (nothing to commit), cut by rotation in the middle of the next
+# cycle's RAW AI RESPONSE
+OLDER = """\
+2025-02-12 10:00:00,000 [INFO] Running git command: git pull origin main
+2025-02-12 10:00:03,000 [INFO] Git command success: Already up to date.
+2025-02-12 10:00:33,000 [ERROR] DeepSeek API call failed (attempt 1): Read timed out.
+2025-02-12 10:00:33,000 [INFO] Retrying in 1 seconds...
+2025-02-12 10:01:00,000 [DEBUG] RAW AI RESPONSE:
+File: website/app.py
+from flask import Flask
+2025-02-12 10:01:00,001 [INFO] Updated file: website/app.py
+2025-02-12 10:01:10,000 [INFO] Requirement already satisfied: flask in ./venv/lib
+Requirement already satisfied: jinja2 in ./venv/lib
+2025-02-12 10:01:10,200 [INFO] bandit not found, skipping security scan.
+2025-02-12 10:01:11,000 [INFO] Running git command: git add .
+2025-02-12 10:01:11,005 [INFO] Git command success: \n2025-02-12 10:01:11,005 [INFO] Running git command: git commit -m Auto-update from AI on 2025-02-12T10:01:11
+
+Changes: The new code is identical to the old code; no changes were made.
+2025-02-12 10:01:11,010 [ERROR] Git command error: \n2025-02-12 10:01:11,010 [INFO] Running git command: git push origin main
+2025-02-12 10:01:14,000 [INFO] Git command success: \n2025-02-12 10:01:14,000 [INFO] Successfully pushed changes.
+2025-02-12 10:01:14,000 [INFO] Restarting gunicorn-theseus service...
+2025-02-12 10:01:14,200 [INFO] Done with single-attempt auto-dev run.
+2025-02-12 10:01:14,200 [INFO] Sleeping for 1 minutes before next run...
+2025-02-12 10:02:14,200 [INFO] Running git command: git pull origin main
+2025-02-12 10:02:17,000 [INFO] Git command success: Already up to date.
+2025-02-12 10:03:00,000 [DEBUG] RAW AI RESPONSE:
+"""
+
+NEWER = "".join(f"line {i}\n" for i in range(100)) + """\
+2025-02-12 10:03:00,001 [INFO] Updated file: website/app.py
+2025-02-12 10:03:05,000 [INFO] bandit not found, skipping security scan.
+2025-02-12 10:03:06,000 [INFO] Running git command: git add .
+2025-02-12 10:03:06,005 [INFO] Git command success: \n2025-02-12 10:03:06,005 [INFO] Running git command: git commit -m Auto-update from AI
+
+Changes: Added a search page.
+2025-02-12 10:03:06,010 [INFO] Git command success: [main 1a2b3c] Auto-update from AI
+ 1 file changed
+2025-02-12 10:03:06,010 [INFO] Running git command: git push origin main
+2025-02-12 10:03:09,000 [INFO] Git command success: \n2025-02-12 10:03:09,000 [INFO] Successfully pushed changes.
+2025-02-12 10:03:09,000 [INFO] Sleeping for 1 minutes before next run...
+2025-02-12 10:04:09,000 [INFO] Running git command: git pull origin main
+2025-02-12 10:04:12,000 [INFO] Git command success: Already up to date.
+2025-02-12 10:04:42,000 [ERROR] DeepSeek API call failed (attempt 3): Read timed out.
+2025-02-12 10:04:42,000 [ERROR] All attempts to call DeepSeek API have failed.
+2025-02-12 10:04:42,001 [ERROR] No valid (or fully valid) file changes returned by AI. Aborting.
+"""
+
+
+class TestLogAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = os.path.join(self.tmp.name, "auto_dev.log")
+        with gzip.open(f"{self.base}.2.gz", "wt", encoding="utf-8") as f:
+            f.write(OLDER)
+        with open(f"{self.base}.1", "w", encoding="utf-8") as f:
+            f.write(NEWER)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_entries_span_segments_with_bounded_continuation(self):
+        paths = input_paths([self.base])
+        self.assertEqual([os.path.basename(p) for p in paths], ["auto_dev.log.2.gz", "auto_dev.log.1"])
+        raw = [e for e in iter_entries(paths) if e.message.startswith("RAW AI RESPONSE")][-1]
+        self.assertEqual(raw.lines, 101)
+        self.assertEqual(len(raw.continuation), CONTINUATION_LINES)
+
+    def test_cycles_phases_and_outcomes(self):
+        cycles = list(iter_cycles(iter_entries(input_paths([self.base]))))
+        self.assertEqual([c.outcome for c in cycles], ["noop", "pushed", "api_failed"])
+        first, second, third = cycles
+        self.assertEqual((first.api_failures, first.backoffs, first.backoff_seconds), (1, 1, 1.0))
+        self.assertEqual(first.durations["pull"], 3.0)
+        self.assertEqual(first.durations["generate"], 57.0)
+        self.assertAlmostEqual(first.durations["summary"], 9.999)
+        self.assertAlmostEqual(first.durations["install"], 0.2)
+        self.assertAlmostEqual(first.durations["test"], 0.8)
+        self.assertAlmostEqual(first.durations["restart"], 0.2)
+        self.assertEqual(first.duration, 74.2)
+        self.assertTrue(second.commit_created)
+        self.assertEqual(second.durations["generate"], 43.0)
+        self.assertAlmostEqual(second.durations["summary"], 4.999)
+        self.assertEqual(second.durations["install"], 0.0)
+        self.assertEqual(third.api_gave_up, 1)
+
+    def test_install_starts_at_the_first_pip_line(self):
+        log = os.path.join(self.tmp.name, "install.log")
+        with open(log, "w", encoding="utf-8") as f:
+            f.write(
+                "2025-02-12 11:00:00,000 [INFO] Running git command: git pull origin main\n"
+                "2025-02-12 11:00:01,000 [INFO] Git command success: Already up to date.\n"
+                "2025-02-12 11:00:31,000 [DEBUG] RAW AI RESPONSE:\n"
+                "File: website/app.py\n"
+                "2025-02-12 11:00:31,000 [INFO] Updated file: website/app.py\n"
+                "2025-02-12 11:00:51,000 [INFO] Installing new requirements only: requests\n"
+                "2025-02-12 11:01:03,000 [INFO] Successfully installed requests-2.32.3\n"
+                "2025-02-12 11:01:04,000 [INFO] Running 2 of 9 test files.\n"
+                "2025-02-12 11:01:09,000 [INFO] Running git command: git add .\n"
+            )
+        (cycle,) = iter_cycles(iter_entries([log]))
+        self.assertEqual(cycle.durations["summary"], 20.0)
+        self.assertEqual(cycle.durations["install"], 13.0)
+        self.assertEqual(cycle.durations["test"], 5.0)
+
+    def test_report_and_csv(self):
+        out = io.StringIO()
+        report = analyze(input_paths([self.base]), out)
+        rows = out.getvalue().splitlines()
+        self.assertEqual(len(rows), 4)
+        self.assertTrue(rows[1].startswith("2025-02-12 10:00:00,2025-02-12 10:01:14,74.2,noop,1,1,1,1.0"))
+        text = report.format()
+        self.assertIn("3 cycles", text)
+        self.assertIn("API: 2 of 4 attempts failed (50%)", text)
+        self.assertIn("No-op changes: 1 of 2 cycles with AI output (50%)", text)
+        self.assertIn("Pushes: 2 of 2 succeeded; 1 carried a new commit", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import sys
+import os
+import gzip
+import logging
+import tempfile
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from autodev.logsetup import BlobStore, LogContext, _stop_listener, iter_records, start_logging
+
+
+class TestLogPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.tmp.name, "logs", "auto_dev.jsonl")
+        self.blob_dir = os.path.join(self.tmp.name, "logs", "blobs")
+        self.context = LogContext()
+        self.logger = logging.getLogger(f"test_logsetup.{self.id()}")
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def start(self, **kwargs):
+        listener = start_logging([self.logger], self.log_file, self.blob_dir, self.context, **kwargs)
+        self.addCleanup(lambda: self.logger.handlers.clear())
+        return listener
+
+    def test_records_carry_run_and_phase_and_large_messages_become_blobs(self):
+        listener = self.start()
+        run_id = self.context.new_run()
+        self.context.set_phase("generate")
+        response = "File: website/app.py\n" + "x = 1\n" * 1000
+        self.logger.debug(f"RAW AI RESPONSE:\n{response}")
+        self.logger.debug(f"RAW AI RESPONSE:\n{response}")
+        self.context.set_phase("git")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            self.logger.exception("Git command error")
+        _stop_listener(listener)
+
+        records = list(iter_records(self.log_file))
+        self.assertEqual([r["phase"] for r in records], ["generate", "generate", "git"])
+        self.assertTrue(all(r["run"] == run_id for r in records))
+        self.assertIsInstance(records[0]["t_run"], float)
+
+        first, second, error = records
+        self.assertEqual(first["blob"], second["blob"])
+        self.assertLess(len(first["msg"]), 300)
+        self.assertEqual(BlobStore(self.blob_dir).get(first["blob"]), f"RAW AI RESPONSE:\n{response}")
+        self.assertIn("ValueError: boom", error["msg"])
+
+    def test_rotated_segments_are_compressed_and_read_back_in_order(self):
+        listener = self.start(max_bytes=2000, backup_count=3)
+        for i in range(60):
+            self.logger.info(f"message {i}")
+        _stop_listener(listener)
+
+        segments = sorted(os.listdir(os.path.dirname(self.log_file)))
+        self.assertIn("auto_dev.jsonl.1.gz", segments)
+        self.assertNotIn("auto_dev.jsonl.4.gz", segments)
+        with gzip.open(f"{self.log_file}.1.gz", "rt", encoding="utf-8") as f:
+            self.assertIn('"message', f.read())
+        numbers = [int(r["msg"].split()[1]) for r in iter_records(self.log_file)]
+        self.assertEqual(numbers, sorted(numbers))
+        self.assertEqual(numbers[-1], 59)
+
+
+class TestBlobStore(unittest.TestCase):
+    def test_prunes_least_recently_used_blobs_over_budget(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = BlobStore(root, max_bytes=2000)
+            digests = []
+            for i in range(20):
+                digests.append(store.put(os.urandom(200).hex()))
+                path = store.path(digests[-1])
+                os.utime(path, (i, i))
+            sizes = sum(os.path.getsize(store.path(d)) for d in digests if os.path.exists(store.path(d)))
+            self.assertLessEqual(sizes, 2000)
+            self.assertTrue(os.path.exists(store.path(digests[-1])))
+            self.assertFalse(os.path.exists(store.path(digests[0])))
+
+
+if __name__ == "__main__":
+    unittest.main()
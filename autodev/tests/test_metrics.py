@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+import io
+import json
+import tempfile
+import threading
+from contextlib import redirect_stdout
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from autodev.logsetup import LogContext
+from autodev.metrics import RunStore, RunTracer, main, percentile, summarize
+
+
+class TestRunTracer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = RunStore(os.path.join(self.tmp.name, "runs.jsonl"))
+        self.api = {"requests": 3, "failures": 0, "seconds": 1.0, "prompt_tokens": 100, "completion_tokens": 10}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_records_phases_spans_and_api_usage(self):
+        context = LogContext()
+        tracer = RunTracer(self.store, context, api_stats=lambda: dict(self.api))
+        run_id = tracer.start_run("loop")
+        tracer.phase("pull")
+        self.assertEqual((context.run_id, context.phase), (run_id, "pull"))
+        tracer.phase("test")
+
+        def scan():
+            with tracer.span("test.bandit"):
+                pass
+
+        worker = threading.Thread(target=scan)
+        with tracer.span("test.pytest"):
+            worker.start()
+            worker.join()
+        self.api.update(requests=5, prompt_tokens=900, completion_tokens=60)
+        tracer.count("files_changed", 2)
+        record = tracer.finish("pushed")
+
+        self.assertEqual(list(self.store), [record])
+        self.assertEqual(record["run"], run_id)
+        self.assertEqual(set(record["phases"]), {"pull", "test", "test.pytest", "test.bandit"})
+        self.assertEqual(record["api"]["requests"], 2)
+        self.assertEqual(record["api"]["prompt_tokens"], 800)
+        self.assertEqual(record["counts"], {"files_changed": 2})
+        # Nothing is recorded between runs
+        tracer.phase("sleep")
+        self.assertIsNone(tracer.finish("noop"))
+
+    def test_report(self):
+        for i, outcome in enumerate(["pushed", "noop", "pushed", "tests_failed"]):
+            self.store.append({
+                "run": str(i), "kind": "loop", "duration": 10.0 + i, "outcome": outcome,
+                "phases": {"generate": float(i + 1), "test": 2.0}, "api": dict(self.api),
+                "counts": {"install_seconds_saved": 1.5},
+            })
+        summary = summarize(self.store)
+        self.assertEqual(summary["success_rate"], 0.5)
+        self.assertEqual(summary["phases"]["generate"]["p50"], 2.0)
+        self.assertEqual(summary["phases"]["generate"]["p95"], 4.0)
+        self.assertEqual(summary["api"]["prompt_tokens"], 400)
+        self.assertEqual(summary["counts"], {"install_seconds_saved": 6.0})
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            main(["--store", self.store.path, "--last", "2", "--json"])
+        self.assertEqual(json.loads(out.getvalue())["runs"], 2)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            main(["--store", self.store.path])
+        self.assertIn("4 runs, 50% pushed", out.getvalue())
+        self.assertIn("generate", out.getvalue())
+        self.assertIn("Totals: install_seconds_saved 6", out.getvalue())
+
+
+class TestPercentile(unittest.TestCase):
+    def test_nearest_rank(self):
+        values = list(range(1, 21))
+        self.assertEqual(percentile(values, 0.5), 10)
+        self.assertEqual(percentile(values, 0.95), 19)
+        self.assertEqual(percentile([7.0], 0.95), 7.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
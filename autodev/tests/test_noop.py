@@ -0,0 +1,48 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from autodev.noop import content_hash, filter_changed_files
+
+SOURCE = "def home():\n    return 'hi'\n"
+
+
+class TestNoopDetection(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.tmp.name, "website"))
+        with open(os.path.join(self.tmp.name, "website", "app.py"), "w", encoding="utf-8") as f:
+            f.write(SOURCE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_identical_content_is_dropped(self):
+        self.assertEqual(filter_changed_files({"website/app.py": SOURCE}, root=self.tmp.name), {})
+
+    def test_whitespace_only_changes(self):
+        # Trailing whitespace and surrounding blank lines are lost when a
+        # code block is stripped; indentation is not
+        stripped = "\n" + SOURCE.replace("():", "():   ").rstrip()
+        self.assertEqual(content_hash(stripped), content_hash(SOURCE))
+        self.assertEqual(filter_changed_files({"website/app.py": stripped}, root=self.tmp.name), {})
+        reindented = SOURCE.replace("    return", "  return")
+        self.assertEqual(
+            filter_changed_files({"website/app.py": reindented}, root=self.tmp.name),
+            {"website/app.py": reindented},
+        )
+
+    def test_new_file_is_kept(self):
+        files = {"website/app.py": SOURCE, "website/templates/new.html": "<p>new</p>"}
+        self.assertEqual(
+            filter_changed_files(files, root=self.tmp.name),
+            {"website/templates/new.html": "<p>new</p>"},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from autodev.parsing import StreamingResponseParser, parse_ai_response
+
+RESPONSE = (
+    "File: website/app.py\n"
+    "```python\n"
+    "from website import create_app\n"
+    "app = create_app()\n"
+    "```\n"
+    "File: templates/about.html -->\n"
+    "```html\n"
+    "<h1>About</h1>\n"
+    "```\n"
+    "File: website/tests/test_app.py\n"
+    "```python\n"
+    "assert True\n"
+    "```\n"
+)
+
+
+class TestParseAiResponse(unittest.TestCase):
+    def test_parses_blocks_and_normalizes_paths(self):
+        files = parse_ai_response(RESPONSE)
+        self.assertEqual(
+            files,
+            {
+                "website/app.py": "from website import create_app\napp = create_app()",
+                "website/templates/about.html": "<h1>About</h1>",
+            },
+        )
+
+
+class TestStreamingResponseParser(unittest.TestCase):
+    def test_any_chunking_matches_whole_parse(self):
+        expected = parse_ai_response(RESPONSE)
+        for size in (1, 2, 3, 7, 64):
+            parser = StreamingResponseParser()
+            for i in range(0, len(RESPONSE), size):
+                parser.feed(RESPONSE[i:i + size])
+            parser.close()
+            self.assertEqual(parser.files, expected, f"chunk size {size}")
+
+    def test_file_is_emitted_when_next_header_arrives(self):
+        parser = StreamingResponseParser()
+        self.assertEqual(parser.feed("File: website/a.py\nx = 1\n"), [])
+        completed = parser.feed("File: website/b.py\n")
+        self.assertEqual(completed, [("website/a.py", "x = 1")])
+        parser.feed("y = 2")
+        self.assertEqual(parser.close(), [("website/b.py", "y = 2")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from autodev.parsing import parse_ai_blocks
+from autodev.patching import EditApplier, PatchError, apply_hunks, parse_edits
+
+APP = (
+    "from flask import Flask\n"
+    "app = Flask(__name__)\n"
+    "\n"
+    "@app.route('/')\n"
+    "def index():\n"
+    "    return 'home'\n"
+    "\n"
+    "@app.route('/about')\n"
+    "def about():\n"
+    "    return 'about'\n"
+)
+
+
+class TestApplyHunks(unittest.TestCase):
+    def test_search_replace(self):
+        block = (
+            "<<<<<<< SEARCH\n"
+            "def about():\n"
+            "    return 'about'\n"
+            "=======\n"
+            "def about():\n"
+            "    return 'About us'\n"
+            ">>>>>>> REPLACE\n"
+        )
+        result = apply_hunks("website/app.py", APP, parse_edits("website/app.py", block))
+        self.assertEqual(result, APP.replace("return 'about'", "return 'About us'"))
+
+    def test_unified_diff_with_bare_blank_context(self):
+        block = (
+            "--- a/website/app.py\n"
+            "+++ b/website/app.py\n"
+            "@@ -6,3 +6,4 @@\n"
+            "     return 'home'\n"
+            "\n"
+            "+# About page\n"
+            " @app.route('/about')\n"
+        )
+        result = apply_hunks("website/app.py", APP, parse_edits("website/app.py", block))
+        self.assertIn("\n\n# About page\n@app.route('/about')\n", result)
+
+    def test_unified_diff_lines_that_look_like_file_headers(self):
+        schema = "-- users\nCREATE TABLE users (id INTEGER);\n"
+        block = (
+            "--- a/website/schema.sql\n"
+            "+++ b/website/schema.sql\n"
+            "@@ -1,2 +1,2 @@\n"
+            "--- users\n"
+            "+++ accounts\n"
+            " CREATE TABLE users (id INTEGER);\n"
+        )
+        result = apply_hunks("website/schema.sql", schema, parse_edits("website/schema.sql", block))
+        self.assertEqual(result, "++ accounts\nCREATE TABLE users (id INTEGER);\n")
+
+    def test_missing_search_text_reports_closest_lines(self):
+        block = "<<<<<<< SEARCH\ndef about():\n    return 'abuot'\n=======\npass\n>>>>>>> REPLACE\n"
+        with self.assertRaises(PatchError) as ctx:
+            apply_hunks("website/app.py", APP, parse_edits("website/app.py", block))
+        message = str(ctx.exception)
+        self.assertIn("website/app.py: edit 1 failed", message)
+        self.assertIn("at line 9", message)
+        self.assertIn("    9| def about():", message)
+
+    def test_ambiguous_search_text_is_rejected(self):
+        block = "<<<<<<< SEARCH\n\n=======\n# gap\n>>>>>>> REPLACE\n"
+        with self.assertRaises(PatchError):
+            apply_hunks("website/app.py", APP, parse_edits("website/app.py", block))
+        block = "<<<<<<< SEARCH\n@app.route('/')\n=======\n>>>>>>> REPLACE\n<<<<<<< SEARCH\n@app.route(\n=======\n"
+        with self.assertRaises(PatchError) as ctx:
+            parse_edits("website/app.py", block)
+        self.assertEqual(ctx.exception.hunk, 2)
+
+
+class TestEditApplier(unittest.TestCase):
+    def test_mixed_response_against_tree(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "website"))
+            with open(os.path.join(root, "website", "app.py"), "w") as f:
+                f.write(APP)
+            response = (
+                "File: website/app.py\n"
+                "```python\n"
+                "<<<<<<< SEARCH\n"
+                "    return 'home'\n"
+                "=======\n"
+                "    return render_template('index.html')\n"
+                ">>>>>>> REPLACE\n"
+                "```\n"
+                "File: website/templates/index.html\n"
+                "<h1>Home</h1>\n"
+                "File: website/app.py\n"
+                "<<<<<<< SEARCH\n"
+                "from flask import Flask\n"
+                "=======\n"
+                "from flask import Flask, render_template\n"
+                ">>>>>>> REPLACE\n"
+            )
+            applier = EditApplier(root)
+            applier.resolve_all(parse_ai_blocks(response))
+            self.assertEqual(
+                applier.files["website/app.py"],
+                APP.replace("Flask\n", "Flask, render_template\n", 1).replace(
+                    "'home'", "render_template('index.html')"
+                ),
+            )
+            self.assertEqual(applier.files["website/templates/index.html"], "<h1>Home</h1>")
+
+
+if __name__ == "__main__":
+    unittest.main()
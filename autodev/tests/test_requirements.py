@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from autodev.requirements import ImportScanner
+
+GENERATED = '''
+import os, json
+from collections import OrderedDict
+from . import routes
+from .extensions import login_manager
+from website.storage import open_storage
+from app import app
+import flask_login
+from yaml import safe_load
+
+try:
+    import ujson as json
+except ImportError:
+    pass
+
+def send():
+    import requests
+    from PIL import Image
+'''
+
+
+class TestImportScanner(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.package = os.path.join(self.tmpdir.name, "website")
+        os.makedirs(os.path.join(self.package, "templates"))
+        for name in ("app.py", "storage.py", "extensions.py"):
+            open(os.path.join(self.package, name), "w").close()
+        self.req = os.path.join(self.package, "requirements.txt")
+        with open(self.req, "w") as f:
+            f.write("Flask_Login==0.6\nrequests>=2  # http\n")
+        self.scanner = ImportScanner({"ujson": "ujson-fast"})
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def missing(self, files):
+        return self.scanner.missing_distributions(files, self.req, self.package)
+
+    def test_only_unlisted_third_party_imports_are_missing(self):
+        files = {os.path.join(self.package, "feature.py"): GENERATED}
+        self.assertEqual(self.missing(files), ["Pillow", "PyYAML", "ujson-fast"])
+
+    def test_new_local_modules_are_not_requirements(self):
+        files = {
+            os.path.join(self.package, "helpers", "__init__.py"): "",
+            os.path.join(self.package, "views.py"): "import helpers\nimport newmod\n",
+            os.path.join(self.package, "newmod.py"): "",
+            os.path.join(self.package, "templates", "x.html"): "import notpython",
+        }
+        self.assertEqual(self.missing(files), [])
+
+    def test_scan_results_are_cached_by_content(self):
+        first = self.scanner.scan("import flask\n")
+        self.assertIs(self.scanner.scan("import flask\n"), first)
+        self.assertEqual(self.scanner.scan("def broken(:\n"), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import sys
+import os
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from autodev.scheduler import AdaptiveScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAdaptiveScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def make(self, **kwargs):
+        return AdaptiveScheduler(600, clock=self.clock, **kwargs)
+
+    def test_speeds_up_after_pushes_down_to_minimum(self):
+        scheduler = self.make()
+        scheduler.record("pushed")
+        self.assertEqual(scheduler.next_delay()[0], 300)
+        for _ in range(5):
+            scheduler.record("pushed")
+        self.assertEqual(scheduler.next_delay()[0], 150)
+
+    def test_backs_off_after_wasted_cycles_up_to_maximum(self):
+        scheduler = self.make(max_seconds=3000)
+        scheduler.record("noop")
+        scheduler.record("api_error")
+        delay, reason = scheduler.next_delay()
+        self.assertEqual(delay, 2400)
+        self.assertIn("api_error", reason)
+        scheduler.record("no_files")
+        self.assertEqual(scheduler.next_delay()[0], 3000)
+
+    def test_other_outcomes_reset_to_base(self):
+        scheduler = self.make()
+        scheduler.record("noop")
+        scheduler.record("tests_failed")
+        self.assertEqual(scheduler.next_delay(), (600, "base interval"))
+        scheduler.record("pushed")
+        scheduler.record("noop")
+        self.assertEqual(scheduler.next_delay()[0], 1200)
+
+    def test_token_budget_waits_for_the_window_to_free_up(self):
+        scheduler = self.make(hourly_tokens=25_000)
+        for _ in range(2):
+            scheduler.record("pushed", prompt_tokens=9_000, completion_tokens=1_000)
+            self.clock.now += 600
+        # 20k spent in the last hour, an average cycle is 10k: wait until
+        # the first cycle (recorded 1200 s ago) leaves the window
+        delay, reason = scheduler.next_delay()
+        self.assertEqual(delay, 2400)
+        self.assertEqual(reason, "hourly API budget reached")
+        self.clock.now += 2400
+        self.assertEqual(scheduler.window_spend()[0], 10_000)
+        self.assertEqual(scheduler.next_delay()[0], 150)
+
+    def test_cost_budget(self):
+        scheduler = self.make(hourly_cost=0.015, prompt_price=1.0, completion_price=2.0)
+        self.assertAlmostEqual(scheduler.cost(1_000_000, 500_000), 2.0)
+        scheduler.record("tests_failed", prompt_tokens=4_000, completion_tokens=1_000)
+        self.assertEqual(scheduler.next_delay()[0], 600)
+        scheduler.record("tests_failed", prompt_tokens=30_000, completion_tokens=0)
+        # Average cycle 0.018 is over the whole budget on its own
+        self.assertEqual(scheduler.next_delay(), (3600.0, "one cycle exceeds the hourly API budget"))
+
+
+if __name__ == "__main__":
+    unittest.main()
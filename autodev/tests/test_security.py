@@ -0,0 +1,92 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from autodev.security import SecurityScanner
+
+# Stands in for bandit: flags eval() and logs which files it was asked to scan
+FAKE_BANDIT = '''
+import json, sys
+paths = sys.argv[sys.argv.index("-q") + 1:]
+with open(sys.argv[1], "a") as log:
+    log.write(" ".join(paths) + "\\n")
+results = []
+for path in paths:
+    for number, line in enumerate(open(path), 1):
+        if "eval(" in line:
+            results.append({"filename": path, "line_number": number, "test_id": "B307",
+                            "issue_severity": "MEDIUM", "issue_confidence": "HIGH",
+                            "issue_text": "Use of possibly insecure function - consider using safer ast.literal_eval."})
+print(json.dumps({"results": results, "errors": []}))
+sys.exit(1 if results else 0)
+'''
+
+
+class TestSecurityScanner(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dir = self.tmpdir.name
+        fake = self.write("fake_bandit.py", FAKE_BANDIT)
+        self.log = os.path.join(self.dir, "calls.log")
+        cache = os.path.join(self.dir, "cache", "bandit.json")
+        self.scanner = SecurityScanner(command=[sys.executable, fake, self.log], cache_file=cache)
+        self.safe = self.write("safe.py", "x = 1\n")
+        self.risky = self.write("risky.py", "y = eval(input())\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def calls(self):
+        with open(self.log) as f:
+            return [line.split() for line in f.read().splitlines()]
+
+    def test_scans_only_python_files_once_per_content(self):
+        report = self.scanner.scan([self.safe, self.risky, os.path.join(self.dir, "page.html")])
+        self.assertEqual((report.scanned, report.cached), (2, 0))
+        self.assertEqual([(f["filename"], f["test_id"]) for f in report.findings], [(self.risky, "B307")])
+        self.assertIn("risky.py:1 [B307 MEDIUM/HIGH]", report.summary())
+
+        report = self.scanner.scan([self.safe, self.risky])
+        self.assertEqual((report.scanned, report.cached), (0, 2))
+        self.assertEqual(len(report.findings), 1)
+
+        self.write("safe.py", "x = 2\n")
+        report = self.scanner.scan([self.safe, self.risky])
+        self.assertEqual((report.scanned, report.cached), (1, 1))
+        self.assertEqual(self.calls(), [[self.safe, self.risky], [self.safe]])
+
+    def test_cache_is_shared_by_identical_files_and_persisted(self):
+        self.scanner.scan([self.risky])
+        copy = self.write("copy.py", "y = eval(input())\n")
+        scanner = SecurityScanner(command=self.scanner.command, cache_file=self.scanner.cache_file)
+        report = scanner.scan([copy])
+        self.assertEqual(report.cached, 1)
+        self.assertEqual(report.findings[0]["filename"], copy)
+
+    @mock.patch("autodev.security.CACHE_ENTRIES", 2)
+    def test_cache_evicts_least_recently_used(self):
+        self.scanner.scan([self.safe, self.risky])
+        # A hit on safe.py makes risky.py the oldest entry
+        self.scanner.scan([self.safe])
+        other = self.write("other.py", "z = 3\n")
+        self.scanner.scan([other])
+        scanner = SecurityScanner(command=self.scanner.command, cache_file=self.scanner.cache_file)
+        self.assertEqual(len(scanner._cache), 2)
+        report = scanner.scan([self.safe, other, self.risky])
+        self.assertEqual((report.scanned, report.cached), (1, 2))
+        self.assertEqual(self.calls()[-1], [self.risky])
+
+
+if __name__ == "__main__":
+    unittest.main()
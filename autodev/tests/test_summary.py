@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from autodev.summary import compact_diff, describe_changes
+
+OLD = '''from flask import Blueprint
+
+main = Blueprint('main', __name__)
+
+def helper():
+    return 1
+
+def unused():
+    pass
+
+@main.route('/')
+def home():
+    return 'home'
+
+@main.route('/old')
+def old():
+    return 'old'
+'''
+
+NEW = '''from flask import Blueprint
+
+main = Blueprint('main', __name__)
+
+def helper():
+    return 2
+
+def fresh():
+    pass
+
+@main.route('/')
+def home():
+    return 'home'
+
+@main.route('/search')
+def search():
+    return 'search'
+'''
+
+
+class TestDescribeChanges(unittest.TestCase):
+    def test_python_routes_and_functions(self):
+        changes = describe_changes({"website/routes.py": OLD}, {"website/routes.py": NEW})
+        self.assertEqual(changes.routes_added, ["/search"])
+        self.assertEqual(changes.routes_removed, ["/old"])
+        self.assertEqual(changes.functions_added, ["fresh"])
+        self.assertEqual(changes.functions_removed, ["unused"])
+        self.assertEqual(changes.functions_changed, ["helper"])
+        self.assertEqual(
+            changes.summary(),
+            "Added routes /search; removed routes /old; added fresh; removed unused; changed helper.",
+        )
+
+    def test_templates_new_files_and_module_level_edits(self):
+        old = {"website/templates/index.html": "<p>a</p>", "website/config.py": "DEBUG = True\n"}
+        new = {
+            "website/templates/index.html": "<p>b</p>",
+            "website/templates/search.html": "<p>search</p>",
+            "website/search.py": NEW,
+            "website/config.py": "DEBUG = False\n",
+        }
+        self.assertEqual(
+            describe_changes(old, new).summary(),
+            "Added routes /, /search; added templates search.html; modified templates index.html; "
+            "added files website/search.py; modified files website/config.py.",
+        )
+
+    def test_formatting_only_changes(self):
+        changes = describe_changes({"website/routes.py": OLD}, {"website/routes.py": OLD.replace("\n\n", "\n\n\n")})
+        self.assertEqual(changes.summary(), "Modified files website/routes.py.")
+        self.assertEqual(describe_changes({"a.py": OLD}, {"a.py": OLD}).summary(), "No functional changes.")
+
+    def test_compact_diff_is_capped(self):
+        diff = compact_diff({"website/routes.py": OLD}, {"website/routes.py": NEW}, max_lines=5)
+        self.assertEqual(len(diff.splitlines()), 6)
+        self.assertTrue(diff.startswith("--- a/website/routes.py"))
+
+
+if __name__ == "__main__":
+    unittest.main()
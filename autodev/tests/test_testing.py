@@ -0,0 +1,83 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from autodev.testing import ImpactMap, TestRunner, tree_hash
+
+TEST_HEADER = (
+    "import os, sys\n"
+    "sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))\n"
+)
+
+
+class TestTesting(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        self.write("website/__init__.py", "")
+        self.write("website/models.py", "VALUE = 1\n")
+        self.write("website/routes.py", "from .models import VALUE\nPAGE = 'page.html'\n")
+        self.write("website/other.py", "OTHER = 2\n")
+        self.write("website/templates/page.html", "<p>page</p>\n")
+        self.write("website/tests/test_routes.py", TEST_HEADER + (
+            "from website import routes\n"
+            "def test_value():\n"
+            "    assert routes.VALUE == 1, 'VALUE changed'\n"
+        ))
+        self.write("website/tests/test_other.py", TEST_HEADER + (
+            "from website.other import OTHER\n"
+            "def test_other():\n"
+            "    assert OTHER == 2\n"
+        ))
+        self.runner = TestRunner(cache_file=os.path.join(self.root, "cache", "results.json"), workers=2)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_affected_tests_follow_imports_and_templates(self):
+        impact = ImpactMap(self.root)
+        self.assertEqual(impact.affected_tests(["website/models.py"]), ["website/tests/test_routes.py"])
+        self.assertEqual(impact.affected_tests(["website/templates/page.html"]), ["website/tests/test_routes.py"])
+        self.assertEqual(impact.affected_tests(["website/other.py"]), ["website/tests/test_other.py"])
+        self.assertEqual(impact.affected_tests(["website/static/site.css"]), [])
+        self.assertIsNone(impact.affected_tests(["website/requirements.txt"]))
+
+    def test_tree_hash_tracks_content(self):
+        before = tree_hash(self.root)
+        self.write("website/other.py", "OTHER = 2\n")
+        self.assertEqual(tree_hash(self.root), before)
+        self.write("website/other.py", "OTHER = 3\n")
+        self.assertNotEqual(tree_hash(self.root), before)
+
+    def test_run_reports_failures_and_caches_by_tree(self):
+        report = self.runner.run(self.root)
+        self.assertTrue(report.passed)
+        self.assertEqual(report.total, 2)
+
+        self.write("website/models.py", "VALUE = 2\n")
+        report = self.runner.run(self.root, ["website/models.py"])
+        self.assertFalse(report.passed)
+        self.assertEqual(report.selected, ["website/tests/test_routes.py"])
+        self.assertEqual(report.total, 1)
+        self.assertIn("test_value", report.failure_reason())
+        self.assertIn("VALUE changed", report.failure_reason())
+
+        # A fresh runner reads the cached result back without running pytest
+        runner = TestRunner(cache_file=self.runner.cache_file, python="/nonexistent/python")
+        cached = runner.run(self.root, ["website/models.py"])
+        self.assertTrue(cached.cached)
+        self.assertEqual(cached.failure_reason(), report.failure_reason())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,17 +1,29 @@
 from flask import Flask
-from flask_login import LoginManager
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 def create_app():
+    """
+    Application factory and WSGI entry point:
+
+        gunicorn --preload 'website:create_app()'
+
+    Stores and the login manager live in website.extensions and are created
+    once per process, so with --preload every worker shares them
+    copy-on-write with the master.
+    """
     app = Flask(__name__)
     app.secret_key = 'your_secret_key_here'
 
     # Flask-Login setup
-    login_manager = LoginManager()
+    from .extensions import TRUSTED_PROXIES, login_manager
     login_manager.init_app(app)
-    login_manager.login_view = 'login'
+
+    # Per-IP login limits need the client's address, not nginx's
+    if TRUSTED_PROXIES:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES)
 
     # Register blueprints or routes here
     from .routes import main
     app.register_blueprint(main)
 
-    return app
\ No newline at end of file
+    return app
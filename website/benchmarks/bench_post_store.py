@@ -0,0 +1,85 @@
+"""
+bench_post_store.py
+
+Microbenchmark comparing the PostStore against the original list-based route
+logic (linear `next(...)` scan for likes, list comprehension for profiles and
+`len(posts) + 1` ids for new posts).
+
+Usage:
+    python website/benchmarks/bench_post_store.py [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from website.post_store import PostStore
+
+AUTHORS = 1000
+
+
+def build_posts(n):
+    return [
+        {'id': i, 'username': f'user{i % AUTHORS}', 'content': f'post {i}', 'likes': 0}
+        for i in range(1, n + 1)
+    ]
+
+
+def list_like(posts, post_id):
+    post = next((post for post in posts if post['id'] == post_id), None)
+    if post:
+        post['likes'] += 1
+
+
+def list_profile(posts, username):
+    return [post for post in posts if post['username'] == username]
+
+
+def list_create(posts, username):
+    posts.append({'id': len(posts) + 1, 'username': username, 'content': 'new', 'likes': 0})
+
+
+def time_op(func, number):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6
+
+
+def run(sizes, number):
+    rng = random.Random(0)
+    print(f"{'posts':>9} {'operation':<10} {'list (us)':>12} {'store (us)':>12} {'speedup':>9}")
+    for n in sizes:
+        post_list = build_posts(n)
+        store = PostStore(build_posts(n))
+        ids = [rng.randint(1, n) for _ in range(number)]
+        names = [f'user{rng.randrange(AUTHORS)}' for _ in range(number)]
+        it_ids = iter(ids * 3)
+        it_ids_store = iter(ids * 3)
+        it_names = iter(names * 3)
+        it_names_store = iter(names * 3)
+
+        cases = [
+            ('like',
+             lambda: list_like(post_list, next(it_ids)),
+             lambda: store.like(next(it_ids_store))),
+            ('profile',
+             lambda: list_profile(post_list, next(it_names)),
+             lambda: store.by_author(next(it_names_store))),
+            ('create',
+             lambda: list_create(post_list, 'bench'),
+             lambda: store.create('bench', 'new')),
+        ]
+        for name, list_func, store_func in cases:
+            list_us = time_op(list_func, number)
+            store_us = time_op(store_func, number)
+            print(f"{n:>9} {name:<10} {list_us:>12.2f} {store_us:>12.2f} {list_us / store_us:>8.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--number', type=int, default=200, help='operations per timing run')
+    args = parser.parse_args()
+    run(args.sizes, args.number)
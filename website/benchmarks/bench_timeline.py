@@ -0,0 +1,96 @@
+"""
+bench_timeline.py
+
+Benchmark harness for the timeline strategies. Generates synthetic users,
+a skewed follow graph (a few very popular accounts) and posts, then reports
+write cost and p50/p99 timeline read latency for:
+
+    write   - fan-out on write for every author
+    read    - fan-out on read for every author
+    hybrid  - fan-out on write, falling back to read above --fanout-limit
+
+Usage:
+    python website/benchmarks/bench_timeline.py [--users 5000] [--posts 50000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from website.follow_graph import FollowGraph
+from website.post_store import PostStore
+from website.timeline import FANOUT_ON_READ, Timeline
+
+STRATEGIES = {
+    'write': float('inf'),
+    'read': FANOUT_ON_READ,
+}
+
+
+def build_graph(users, avg_following, seed):
+    rng = random.Random(seed)
+    names = [f'user{i}' for i in range(users)]
+    # Pareto-distributed popularity gives a handful of high-follower authors
+    weights = [rng.paretovariate(1.2) for _ in names]
+    graph = FollowGraph()
+    for name in names:
+        graph.add_user(name)
+        for followee in rng.choices(names, weights=weights, k=avg_following):
+            if followee != name:
+                graph.follow(name, followee)
+    return names, weights, graph
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_strategy(name, fanout_limit, names, weights, graph, args):
+    rng = random.Random(args.seed)
+    posts = PostStore()
+    timeline = Timeline(posts, graph, fanout_limit=fanout_limit)
+
+    start = time.perf_counter()
+    for author in rng.choices(names, weights=weights, k=args.posts):
+        timeline.on_post(posts.create(author, 'synthetic post'))
+    write_s = time.perf_counter() - start
+
+    samples = []
+    for reader in rng.choices(names, k=args.reads):
+        start = time.perf_counter()
+        timeline.page(reader, limit=args.limit)
+        samples.append((time.perf_counter() - start) * 1e3)
+
+    print(
+        f"{name:<8} {write_s / args.posts * 1e6:>15.1f} "
+        f"{percentile(samples, 50):>10.3f} {percentile(samples, 99):>10.3f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=5_000)
+    parser.add_argument('--avg-following', type=int, default=50)
+    parser.add_argument('--posts', type=int, default=50_000)
+    parser.add_argument('--reads', type=int, default=2_000)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--fanout-limit', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    names, weights, graph = build_graph(args.users, args.avg_following, args.seed)
+    top = max(graph.follower_count(name) for name in names)
+    print(f"{args.users} users, {args.posts} posts, most-followed account has {top} followers")
+    print(f"{'strategy':<8} {'write (us/post)':>15} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    strategies = dict(STRATEGIES, hybrid=args.fanout_limit)
+    for name, fanout_limit in strategies.items():
+        run_strategy(name, fanout_limit, names, weights, graph, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+load_storage.py
+
+Load test for the SQLite storage backend. Starts N worker processes (the way
+gunicorn would), each importing the app against the same WAL database and
+driving a mixed read/write workload through the WSGI test client for a fixed
+duration. Reports total requests per second for each worker count.
+
+Each worker generates its own load and is CPU bound, so throughput can only
+scale up to the number of cores: worker counts above os.cpu_count() are
+skipped, unless --oversubscribe is given to measure contention anyway.
+
+Usage:
+    python website/benchmarks/load_storage.py [--workers 1 2 4] [--seconds 5] [--oversubscribe]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def worker(db_path, seconds, write_ratio, seed, results):
+    os.environ['THESEUS_DATABASE'] = db_path
+    sys.path.insert(0, REPO_ROOT)
+    from website import create_app
+
+    app = create_app()
+    rng = random.Random(seed)
+    client = app.test_client()
+    client.post('/login', data={'username': 'user1', 'password': 'password1'})
+    reads = ['/', '/api/posts', '/profile/user2', '/timeline']
+
+    requests_done = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        if rng.random() < write_ratio:
+            client.post(f'/like/{rng.randint(1, 2)}')
+        else:
+            client.get(rng.choice(reads))
+        requests_done += 1
+    results.put(requests_done)
+
+
+def populate(db_path, posts):
+    os.environ['THESEUS_DATABASE'] = db_path
+    sys.path.insert(0, REPO_ROOT)
+    from website.extensions import posts as post_store
+
+    for i in range(posts):
+        post_store.create(f'user{i % 2 + 1}', f'load test post {i}')
+
+
+def run(worker_counts, seconds, write_ratio, posts, oversubscribe=False):
+    cores = os.cpu_count() or 1
+    print(f"{cores} CPU cores")
+    too_many = [count for count in worker_counts if count > cores]
+    if too_many and not oversubscribe:
+        print(f"Skipping {too_many} workers: more workers than cores can't scale (see --oversubscribe).")
+        worker_counts = [count for count in worker_counts if count <= cores]
+    elif too_many:
+        print(f"Warning: {too_many} workers exceed {cores} cores; those rows measure contention, not scaling.")
+    if not worker_counts:
+        sys.exit("No worker counts left to run.")
+
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, 'load.db')
+        proc = ctx.Process(target=populate, args=(db_path, posts))
+        proc.start()
+        proc.join()
+
+        print(f"{'workers':>7} {'requests':>10} {'req/s':>10} {'scaling':>8}")
+        baseline = None
+        for count in worker_counts:
+            results = ctx.Queue()
+            procs = [ctx.Process(target=worker, args=(db_path, seconds, write_ratio, i, results)) for i in range(count)]
+            for proc in procs:
+                proc.start()
+            total = sum(results.get() for _ in procs)
+            for proc in procs:
+                proc.join()
+            rate = total / seconds
+            baseline = baseline or rate
+            note = '  (oversubscribed)' if count > cores else ''
+            print(f"{count:>7} {total:>10} {rate:>10.0f} {rate / baseline:>7.2f}x{note}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--write-ratio', type=float, default=0.1)
+    parser.add_argument('--posts', type=int, default=10_000)
+    parser.add_argument('--oversubscribe', action='store_true', help='also run worker counts above the core count')
+    args = parser.parse_args()
+    run(args.workers, args.seconds, args.write_ratio, args.posts, args.oversubscribe)
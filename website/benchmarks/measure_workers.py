@@ -0,0 +1,101 @@
+"""
+measure_workers.py
+
+Measures gunicorn boot time and per-worker memory for the two ways of
+starting the site:
+
+    before  - gunicorn app:app (from website/), every worker imports the app
+    after   - gunicorn --preload 'website:create_app()', the master builds the
+              app and its stores once and workers share them copy-on-write
+
+Boot time is measured from spawning gunicorn until every worker is up and
+/ answers 200. Memory is read from /proc/<pid>/smaps_rollup (Linux only):
+RSS counts shared pages in full, PSS splits them between the processes
+sharing them, so PSS is the number that shows the copy-on-write savings.
+
+Usage:
+    python website/benchmarks/measure_workers.py [--workers 4]
+"""
+
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+MODES = {
+    'before': (os.path.join(REPO_ROOT, 'website'), ['app:app']),
+    'after': (REPO_ROOT, ['--preload', 'website:create_app()']),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def children(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(child) for child in f.read().split()]
+
+
+def memory_kb(pid):
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:'):
+                fields[parts[0][:-1]] = int(parts[1])
+    return fields
+
+
+def measure(mode, workers, timeout):
+    cwd, target = MODES[mode]
+    port = free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--bind', f'127.0.0.1:{port}', *target],
+        cwd=cwd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError(f'{mode}: gunicorn did not come up within {timeout}s')
+            try:
+                if len(children(proc.pid)) == workers:
+                    with urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=1) as response:
+                        if response.status == 200:
+                            break
+            except OSError:
+                pass
+            time.sleep(0.02)
+        boot = time.perf_counter() - start
+        # Let every worker finish importing before sampling memory
+        time.sleep(1.0)
+        samples = [memory_kb(pid) for pid in children(proc.pid)]
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait()
+
+    rss = sum(s['Rss'] for s in samples) / len(samples) / 1024
+    pss = sum(s['Pss'] for s in samples) / len(samples) / 1024
+    print(f"{mode:<7} {boot * 1e3:>10.0f} {rss:>12.1f} {pss:>12.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--timeout', type=float, default=60.0)
+    args = parser.parse_args()
+
+    print(f"{'mode':<7} {'boot (ms)':>10} {'RSS/worker':>12} {'PSS/worker':>12}  (MiB, {args.workers} workers)")
+    for mode in MODES:
+        measure(mode, args.workers, args.timeout)
@@ -0,0 +1,82 @@
+"""
+conditional.py
+
+HTTP conditional request helpers (ETag / Last-Modified / 304).
+
+A page's validator is derived from the `stamp()` of every store it reads
+(a cheap change counter plus last-modified time) and from whatever else makes
+the page vary, such as the logged-in user and the query string. If the client
+already holds that version, the route answers 304 without rendering anything.
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+
+from flask import make_response, request, session
+
+
+def fingerprint_files(*paths):
+    """
+    Hash the contents of the given files and directories (recursively). Used
+    as a release id so a redeploy with new templates or code invalidates every
+    previously issued ETag.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in names)
+        else:
+            files.append(path)
+    digest = hashlib.sha1()
+    for file_path in sorted(files):
+        with open(file_path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def make_etag(*parts):
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def is_not_modified(etag, last_modified):
+    """
+    True if the request's validators show the client already has this
+    version. If-None-Match takes precedence over If-Modified-Since and uses
+    weak comparison (RFC 7232), so W/ validators from a compressing proxy
+    such as nginx still match.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def conditional_response(render, stores, *vary):
+    """
+    Return a 304 if the client has the current version of the page, otherwise
+    call `render()` and attach ETag / Last-Modified headers to its response.
+    `stores` are the data sources the page reads; `vary` is anything else the
+    output depends on.
+    """
+    stamps = [store.stamp() for store in stores]
+    etag = make_etag([version for version, _ in stamps], *vary)
+    last_modified = datetime.fromtimestamp(max(updated for _, updated in stamps), tz=timezone.utc)
+
+    # Pending flash messages are rendered into the page (and consumed), so such
+    # a response is neither answered from nor stored as the client's copy.
+    if '_flashes' in session:
+        return make_response(render())
+
+    if is_not_modified(etag, last_modified):
+        response = make_response('', 304)
+    else:
+        response = make_response(render())
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # Pages are per user; let caches keep them but always revalidate.
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
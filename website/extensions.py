@@ -0,0 +1,98 @@
+"""
+extensions.py
+
+Process-wide state shared by every app instance: the data stores, caches,
+rate limiters and the Flask-Login manager.
+
+Everything here is created once, at import. Under `gunicorn --preload` that
+happens in the master, so workers inherit the (read-mostly) state
+copy-on-write instead of each building their own. Stores that need
+per-process resources (SQLite connections, the like flusher thread) set them
+up lazily after the fork.
+"""
+
+import glob
+import os
+
+from flask_login import LoginManager, UserMixin
+
+from .conditional import fingerprint_files
+from .fragment_cache import FragmentCache
+from .like_counter import LikeCounter
+from .rate_limit import RateLimiter
+from .storage import open_storage
+from .timeline import FANOUT_LIMIT, FANOUT_ON_READ, Timeline
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Set THESEUS_DATABASE to an SQLite file path to persist data and share it
+# between gunicorn workers; without it everything lives in process memory.
+DATABASE_PATH = os.environ.get('THESEUS_DATABASE')
+
+# Number of reverse proxies (nginx) in front of gunicorn whose X-Forwarded-For
+# is trusted, so request.remote_addr is the client rather than the proxy.
+# Off by default, since a client talking to gunicorn directly could otherwise
+# pick its own address; the nginx deployment sets THESEUS_TRUSTED_PROXIES=1
+# (see README.md).
+TRUSTED_PROXIES = int(os.environ.get('THESEUS_TRUSTED_PROXIES', '0'))
+
+# Static user data for initial development. The hashes are precomputed with
+# generate_password_hash('password1') / ('password2') so that worker boot
+# doesn't spend CPU hashing passwords at import time.
+SEED_USERS = {
+    'user1': {
+        'username': 'user1',
+        'password': 'scrypt:32768:8:1$WYdlheEbR0SIGwDF$ceb622188c1d1bee694d17f9dd54b1258f18ab696c5641facbcfb71cfe2ba14b5583f22aa538cc73a5b123ef913085224de4971ba20807ba160d176f1505fead',
+    },
+    'user2': {
+        'username': 'user2',
+        'password': 'scrypt:32768:8:1$UVioyxmbgvcMAi09$f82fc5c77f8f41795cdb765e224f49d0cd1980bc5e2b760dc09f74e7fc9d5a7387539b50374299864389a7ce87e834f0d2f0af8105d1923b13d0a80346bfefb7',
+    },
+}
+
+# Static post data for initial development
+SEED_POSTS = [
+    {'id': 1, 'username': 'user1', 'content': 'Hello, this is my first post!', 'likes': 0},
+    {'id': 2, 'username': 'user2', 'content': 'Just joined this platform!', 'likes': 0}
+]
+
+# Static follow data for initial development
+SEED_FOLLOWS = {
+    'user1': ['user2'],
+    'user2': []
+}
+
+users, posts, follows = open_storage(DATABASE_PATH, SEED_USERS, SEED_POSTS, SEED_FOLLOWS)
+
+# Personalized timelines, fed by create_post and follow_user. Inboxes are per
+# process, so with a shared database timelines are merged at read time.
+timeline = Timeline(posts, follows, fanout_limit=FANOUT_ON_READ if DATABASE_PATH else FANOUT_LIMIT)
+
+# Sharded like counters, flushed into the post store in the background
+likes = LikeCounter(posts)
+
+# Part of every ETag, so a deploy with changed code or templates never gets
+# answered with 304 for a page rendered by the previous release
+RELEASE_ID = fingerprint_files(*glob.glob(os.path.join(PACKAGE_DIR, '*.py')), os.path.join(PACKAGE_DIR, 'templates'))
+
+# Rendered post cards, reused across requests until the post changes
+fragments = FragmentCache()
+
+# Login attempts allowed per client IP and per username: a burst of 10/5,
+# refilling at 10/5 per minute. Checked before any password hashing happens.
+login_ip_limiter = RateLimiter(capacity=10, rate=10 / 60)
+login_user_limiter = RateLimiter(capacity=5, rate=5 / 60)
+
+# Flask-Login setup; create_app() attaches it to the app
+login_manager = LoginManager()
+login_manager.login_view = 'main.login'
+
+class User(UserMixin):
+    def __init__(self, username):
+        self.id = username
+
+@login_manager.user_loader
+def load_user(username):
+    if username in users:
+        return User(username)
+    return None
@@ -0,0 +1,85 @@
+"""
+follow_graph.py
+
+Bidirectional follow graph used by the Flask routes.
+
+Keeps forward (user -> users they follow) and reverse (user -> their
+followers) adjacency sets in sync, so follower/following lookups and counts
+never have to scan the whole user table.
+"""
+
+import os
+import threading
+import time
+
+
+class FollowGraph:
+    def __init__(self, follows=None):
+        self._following = {}
+        self._followers = {}
+        self._version = 0
+        self._updated = time.time()
+        self._instance = os.urandom(8).hex()
+        self._lock = threading.Lock()
+        for follower, followees in (follows or {}).items():
+            self.add_user(follower)
+            for followee in followees:
+                self.follow(follower, followee)
+
+    def add_user(self, username):
+        with self._lock:
+            self._following.setdefault(username, set())
+            self._followers.setdefault(username, set())
+
+    def follow(self, follower, followee):
+        """
+        Add the edge follower -> followee. Returns False if it already existed.
+        """
+        with self._lock:
+            following = self._following.setdefault(follower, set())
+            if followee in following:
+                return False
+            following.add(followee)
+            self._followers.setdefault(followee, set()).add(follower)
+            self._touch()
+            return True
+
+    def unfollow(self, follower, followee):
+        """
+        Remove the edge follower -> followee. Returns False if it did not exist.
+        """
+        with self._lock:
+            following = self._following.get(follower)
+            if not following or followee not in following:
+                return False
+            following.discard(followee)
+            self._followers[followee].discard(follower)
+            self._touch()
+            return True
+
+    def _touch(self):
+        self._version += 1
+        self._updated = time.time()
+
+    def stamp(self):
+        """
+        (version, last modified timestamp) of the graph, for HTTP validators.
+        """
+        # Process-local data: the version is only meaningful within this
+        # process and this instance.
+        return (os.getpid(), self._instance, self._version), self._updated
+
+    def is_following(self, follower, followee):
+        return followee in self._following.get(follower, ())
+
+    def following(self, username):
+        return frozenset(self._following.get(username, ()))
+
+    def followers(self, username):
+        return frozenset(self._followers.get(username, ()))
+
+    def following_count(self, username):
+        return len(self._following.get(username, ()))
+
+    def follower_count(self, username):
+        return len(self._followers.get(username, ()))
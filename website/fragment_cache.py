@@ -0,0 +1,95 @@
+"""
+fragment_cache.py
+
+LRU cache for rendered HTML fragments (post cards).
+
+Entries are keyed on (post id, version, variant...), where the version is the
+post's like count, so a card is rendered once and reused until the post
+changes. Because the version is part of the key, a count changed by another
+worker can never be served stale; `invalidate()` exists to drop a post's old
+versions eagerly instead of waiting for them to age out of the LRU.
+
+The cache tracks hits, misses and time spent rendering misses, from which
+`stats()` estimates the render time saved.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+FRAGMENT_CACHE_SIZE = 10_000
+
+
+class FragmentCache:
+    def __init__(self, max_entries=FRAGMENT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._keys_by_post = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.render_seconds = 0.0
+
+    def _forget(self, key):
+        keys = self._keys_by_post.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_post[key[0]]
+
+    def get_or_render(self, key, render):
+        """
+        Return the fragment cached under `key` (whose first element is the post
+        id), calling `render()` to produce it on a miss.
+        """
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return fragment
+
+        start = time.perf_counter()
+        fragment = render()
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.misses += 1
+            self.render_seconds += elapsed
+            self._entries[key] = fragment
+            self._keys_by_post.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._forget(evicted)
+        return fragment
+
+    def invalidate(self, post_id):
+        """
+        Drop every cached fragment of one post.
+        """
+        with self._lock:
+            for key in self._keys_by_post.pop(post_id, ()):
+                self._entries.pop(key, None)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_post.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            avg_render_ms = self.render_seconds / self.misses * 1e3 if self.misses else 0.0
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'avg_render_ms': avg_render_ms,
+                'render_ms_total': self.render_seconds * 1e3,
+                'render_ms_saved': self.hits * avg_render_ms,
+            }
@@ -0,0 +1,152 @@
+"""
+like_counter.py
+
+Like counting service used by the /like route.
+
+A like is checked against the post store's like ledger (an in-memory set,
+or the `likes` table with the SQLite backend) and against the likes pending
+in this process, then counted in one of several sharded in-process counters.
+Shards are picked by post id, so concurrent likes on different posts rarely
+contend for the same lock, and no request ever does an unlocked
+read-modify-write on the post itself.
+
+A background thread flushes the shards into the post store every
+`flush_interval` seconds as one batch, which writes the ledger rows and the
+counts together: a crash loses at most the pending likes, never a count whose
+ledger row was already written. With the SQLite backend this is also where
+likes from every gunicorn worker are merged; the ledger's primary key drops a
+like that two workers both accepted. Until then `overlay()` adds the pending
+deltas to posts being rendered, so a user sees their like immediately.
+"""
+
+import atexit
+import hashlib
+import os
+import threading
+import time
+from collections import Counter
+
+SHARD_COUNT = 16
+FLUSH_INTERVAL = 0.5
+
+
+class _Shard:
+    __slots__ = ('lock', 'pending', 'likes')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        # (post_id, username) of every pending like, for dedup and flushing
+        self.likes = set()
+
+
+class LikeCounter:
+    def __init__(self, posts, shards=SHARD_COUNT, flush_interval=FLUSH_INTERVAL):
+        self.posts = posts
+        self.flush_interval = flush_interval
+        self._shards = [_Shard() for _ in range(shards)]
+        self._flush_lock = threading.Lock()
+        self._flusher = None
+        self._flusher_pid = None
+        self._stop = threading.Event()
+        self._updated = time.time()
+        atexit.register(self.flush)
+
+    def _shard(self, post_id):
+        return self._shards[hash(post_id) % len(self._shards)]
+
+    def _ensure_flusher(self):
+        # Started lazily so that each forked gunicorn worker gets its own.
+        if self._flusher_pid == os.getpid() and self._flusher.is_alive():
+            return
+        with self._flush_lock:
+            if self._flusher_pid == os.getpid() and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(target=self._flush_forever, name='like-flusher', daemon=True)
+            self._flusher_pid = os.getpid()
+            self._flusher.start()
+
+    def _flush_forever(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def like(self, post_id, username):
+        """
+        Count a like from `username`. Returns None if the post does not exist,
+        False if the user already liked it and True if the like was counted.
+        """
+        if post_id not in self.posts:
+            return None
+        if self.posts.has_liked(post_id, username):
+            return False
+        shard = self._shard(post_id)
+        with shard.lock:
+            if (post_id, username) in shard.likes:
+                return False
+            shard.likes.add((post_id, username))
+            shard.pending[post_id] += 1
+        with self._flush_lock:
+            self._updated = time.time()
+        self._ensure_flusher()
+        return True
+
+    def stamp(self):
+        """
+        (version, last modified timestamp) of the pending counts shown by
+        overlay(); flushed likes show up in the post store's stamp instead.
+
+        The version depends only on the pending deltas themselves: None when
+        there are none, otherwise a digest of them. So two workers with
+        nothing pending agree on it, and an idle feed validates on any worker.
+        """
+        pending = []
+        for shard in self._shards:
+            with shard.lock:
+                pending.extend(item for item in shard.pending.items() if item[1])
+        if not pending:
+            return None, 0.0
+        digest = hashlib.sha1(repr(sorted(pending)).encode('utf-8')).hexdigest()
+        return digest, self._updated
+
+    def pending(self, post_id):
+        shard = self._shard(post_id)
+        with shard.lock:
+            return shard.pending.get(post_id, 0)
+
+    def count(self, post_id):
+        """
+        Durable like count plus likes not flushed yet, or None if the post
+        does not exist.
+        """
+        post = self.posts.get(post_id)
+        if post is None:
+            return None
+        return post['likes'] + self.pending(post_id)
+
+    def overlay(self, posts):
+        """
+        Return copies of `posts` whose like counts include pending likes.
+        """
+        result = []
+        for post in posts:
+            pending = self.pending(post['id'])
+            result.append(dict(post, likes=post['likes'] + pending) if pending else post)
+        return result
+
+    def flush(self):
+        """
+        Move every pending like into the post store in one batch.
+        """
+        with self._flush_lock:
+            batch = []
+            for shard in self._shards:
+                with shard.lock:
+                    likes, shard.likes = shard.likes, set()
+                    shard.pending = Counter()
+                batch.extend(likes)
+            if batch:
+                self.posts.record_likes(batch)
+
+    def close(self):
+        self._stop.set()
+        self.flush()
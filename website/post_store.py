@@ -0,0 +1,176 @@
+"""
+post_store.py
+
+In-memory post repository used by the Flask routes.
+
+Posts are kept in an id -> post dict with a per-author index of post ids, so
+lookups by id are O(1) and profile pages are O(k) in the author's post count.
+Ids come from a monotonic allocator and are never reused, which keeps them
+stable once posts are deleted.
+
+Pages of the feed are served newest first with keyset pagination ("posts older
+than id X, limit N"): an append-only, id-sorted list is bisected to the cursor
+and walked backwards, so a page costs O(log N + limit) no matter how much
+history there is.
+
+Posts are plain dicts ({'id', 'username', 'content', 'likes'}) so templates can
+keep using `post.username`, `post.likes`, etc.
+"""
+
+import bisect
+import os
+import threading
+import time
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class PostStore:
+    def __init__(self, posts=None):
+        self._posts = {}
+        self._by_author = {}
+        # Ids in ascending order; deleted ids stay behind as tombstones until
+        # they make up half the list, then the list is compacted.
+        self._order = []
+        # post id -> usernames that liked it, for per-user like dedup
+        self._likers = {}
+        self._next_id = 1
+        # Bumped on every change that alters what a page shows (see stamp())
+        self._version = 0
+        self._updated = time.time()
+        self._instance = os.urandom(8).hex()
+        self._lock = threading.Lock()
+        for post in posts or []:
+            self._insert(dict(post))
+        self._order.sort()
+
+    def _insert(self, post):
+        self._posts[post['id']] = post
+        self._order.append(post['id'])
+        self._by_author.setdefault(post['username'], []).append(post['id'])
+        self._next_id = max(self._next_id, post['id'] + 1)
+        self._touch()
+
+    def _touch(self):
+        self._version += 1
+        self._updated = time.time()
+
+    def stamp(self):
+        """
+        (version, last modified timestamp) of the store, for HTTP validators.
+        """
+        # Process-local data: the version is only meaningful within this
+        # process and this instance.
+        return (os.getpid(), self._instance, self._version), self._updated
+
+    def create(self, username, content):
+        """
+        Allocate a new id and store the post. Returns the new post dict.
+        """
+        with self._lock:
+            post = {'id': self._next_id, 'username': username, 'content': content, 'likes': 0}
+            self._insert(post)
+            return post
+
+    def get(self, post_id):
+        return self._posts.get(post_id)
+
+    def delete(self, post_id):
+        """
+        Remove a post. Returns the removed post, or None if it did not exist.
+        The id is not handed out again.
+        """
+        with self._lock:
+            post = self._posts.pop(post_id, None)
+            if post is not None:
+                self._by_author[post['username']].remove(post_id)
+                self._likers.pop(post_id, None)
+                self._touch()
+                if len(self._order) > 2 * len(self._posts):
+                    self._order = [i for i in self._order if i in self._posts]
+            return post
+
+    def like(self, post_id):
+        """
+        Increment the like count of a post. Returns the post, or None if it
+        does not exist.
+        """
+        with self._lock:
+            post = self._posts.get(post_id)
+            if post is not None:
+                post['likes'] += 1
+                self._touch()
+            return post
+
+    def has_liked(self, post_id, username):
+        return username in self._likers.get(post_id, ())
+
+    def record_likes(self, likes):
+        """
+        Record a batch of (post_id, username) likes: the dedup ledger and the
+        counts change together. Likes already recorded, or on posts that no
+        longer exist, are skipped. Returns {post_id: likes added}.
+        """
+        added = {}
+        with self._lock:
+            for post_id, username in likes:
+                post = self._posts.get(post_id)
+                if post is None:
+                    continue
+                likers = self._likers.setdefault(post_id, set())
+                if username in likers:
+                    continue
+                likers.add(username)
+                post['likes'] += 1
+                added[post_id] = added.get(post_id, 0) + 1
+            if added:
+                self._touch()
+        return added
+
+    def page(self, before=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        Return up to `limit` posts with id < `before` (or the newest posts if
+        `before` is None), newest first, plus the cursor for the next page.
+        The cursor is None when there are no older posts.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        order = self._order
+        index = len(order) if before is None else bisect.bisect_left(order, before)
+        page = []
+        while index > 0 and len(page) < limit:
+            index -= 1
+            post = self._posts.get(order[index])
+            if post is not None:
+                page.append(post)
+        has_older = any(order[i] in self._posts for i in range(index - 1, -1, -1))
+        next_cursor = page[-1]['id'] if page and has_older else None
+        return page, next_cursor
+
+    def by_author(self, username):
+        """
+        Posts written by `username`, oldest first.
+        """
+        return [self._posts[post_id] for post_id in self._by_author.get(username, ())]
+
+    def recent_by_author(self, username, before=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        Up to `limit` posts by `username` with id < `before`, newest first.
+        """
+        ids = self._by_author.get(username, ())
+        end = len(ids) if before is None else bisect.bisect_left(ids, before)
+        window = ids[max(0, end - limit):end]
+        return [self._posts[post_id] for post_id in reversed(window) if post_id in self._posts]
+
+    def count_by_author(self, username):
+        return len(self._by_author.get(username, ()))
+
+    def __contains__(self, post_id):
+        return post_id in self._posts
+
+    def __len__(self):
+        return len(self._posts)
+
+    def __iter__(self):
+        # Ids are allocated monotonically, so insertion order is id order.
+        return iter(list(self._posts.values()))
@@ -0,0 +1,63 @@
+"""
+rate_limit.py
+
+In-memory token bucket rate limiting.
+
+Each key (an IP address, a username, ...) gets a bucket holding up to
+`capacity` tokens that refills at `rate` tokens per second. A request spends
+one token; when the bucket is empty the request is rejected. The login route
+checks its limiters before calling check_password_hash, so abusive traffic is
+turned away without burning CPU on password hashing.
+
+Buckets are kept in an LRU-ordered dict capped at `max_keys` entries, so a
+flood of distinct keys can't grow memory without bound.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+MAX_KEYS = 100_000
+
+
+class RateLimiter:
+    def __init__(self, capacity, rate, max_keys=MAX_KEYS, clock=time.monotonic):
+        self.capacity = capacity
+        self.rate = rate
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        """
+        Spend a token from `key`'s bucket. Returns False if it is empty.
+        """
+        now = self.clock()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return allowed
+
+    def retry_after(self, key):
+        """
+        Seconds until `key` has a token again (0 if it has one now).
+        """
+        now = self.clock()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        return 0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def reset(self, key=None):
+        with self._lock:
+            if key is None:
+                self._buckets.clear()
+            else:
+                self._buckets.pop(key, None)
@@ -0,0 +1,197 @@
+"""
+routes.py
+
+The site's routes, registered on the app by create_app().
+"""
+
+import os
+
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
+from markupsafe import Markup
+from flask_login import login_user, logout_user, login_required, current_user
+from werkzeug.security import check_password_hash
+
+from .conditional import conditional_response
+from .extensions import (
+    RELEASE_ID,
+    User,
+    follows,
+    fragments,
+    likes,
+    login_ip_limiter,
+    login_user_limiter,
+    posts,
+    timeline,
+    users,
+)
+from .post_store import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+main = Blueprint('main', __name__)
+
+def get_page_args():
+    """
+    Read the keyset pagination arguments (?before=<post id>&limit=<n>).
+    """
+    before = request.args.get('before', type=int)
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    return before, limit
+
+def render_post_cards(page, show_author=True):
+    """
+    Render one post card per post, reusing cached fragments. Cards are keyed
+    on the post id and like count (its version) plus the template variant.
+    """
+    can_like = current_user.is_authenticated
+    cards = []
+    for post in likes.overlay(page):
+        key = (post['id'], post['likes'], show_author, can_like)
+        cards.append(fragments.get_or_render(key, lambda post=post: Markup(render_template(
+            '_post_card.html', post=post, show_author=show_author, can_like=can_like
+        ))))
+    return cards
+
+def conditional_page(render, stores):
+    """
+    Answer with 304 if the client already has this version of the page. The
+    version covers the stores the page reads, the user, the URL (including
+    the pagination cursor) and the release.
+    """
+    return conditional_response(render, stores, RELEASE_ID, current_user.get_id(), request.full_path)
+
+@main.route('/')
+def home():
+    def render():
+        before, limit = get_page_args()
+        page, next_cursor = posts.page(before=before, limit=limit)
+        return render_template('index.html', post_cards=render_post_cards(page), next_cursor=next_cursor)
+    return conditional_page(render, (posts, likes))
+
+@main.route('/timeline')
+@login_required
+def user_timeline():
+    def render():
+        before, limit = get_page_args()
+        page, next_cursor = timeline.page(current_user.id, before=before, limit=limit)
+        return render_template('timeline.html', post_cards=render_post_cards(page), next_cursor=next_cursor)
+    return conditional_page(render, (posts, follows, likes))
+
+@main.route('/api/posts')
+def feed_json():
+    def render():
+        before, limit = get_page_args()
+        page, next_cursor = posts.page(before=before, limit=limit)
+        return jsonify(posts=likes.overlay(page), next_cursor=next_cursor)
+    return conditional_page(render, (posts, likes))
+
+@main.route('/stats/fragments')
+@login_required
+def fragment_stats():
+    return jsonify(fragments.stats())
+
+@main.route('/healthz')
+def healthz():
+    """
+    Checked by the deploy step before old workers are retired: answers from
+    this worker with the release it serves and the master that forked it.
+    """
+    return jsonify(status='ok', release=RELEASE_ID, pid=os.getpid(), master=os.getppid())
+
+@main.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        username = request.form['username']
+        password = request.form['password']
+        if not (login_ip_limiter.allow(request.remote_addr) and login_user_limiter.allow(username)):
+            flash('Too many login attempts. Please try again later.')
+            return render_template('login.html'), 429
+        user_record = users.get(username)
+        if user_record and check_password_hash(user_record['password'], password):
+            login_user_limiter.reset(username)
+            user = User(username)
+            login_user(user)
+            flash('Logged in successfully!')
+            return redirect(url_for('main.home'))
+        flash('Invalid username or password')
+    return render_template('login.html')
+
+@main.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    flash('Logged out successfully!')
+    return redirect(url_for('main.home'))
+
+@main.route('/profile/<username>')
+@login_required
+def profile(username):
+    if username in users:
+        before, limit = get_page_args()
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        def render():
+            # One extra post tells whether there is an older page
+            recent = posts.recent_by_author(username, before=before, limit=limit + 1)
+            next_cursor = recent[limit - 1]['id'] if len(recent) > limit else None
+            return render_template(
+                'profile.html',
+                username=username,
+                post_cards=render_post_cards(recent[:limit], show_author=False),
+                next_cursor=next_cursor,
+                follower_count=follows.follower_count(username),
+                following_count=follows.following_count(username),
+                is_following=follows.is_following(current_user.id, username),
+            )
+        return conditional_page(render, (posts, follows, likes))
+    flash('User not found')
+    return redirect(url_for('main.home'))
+
+@main.route('/post', methods=['POST'])
+@login_required
+def create_post():
+    content = request.form['content']
+    if content:
+        new_post = posts.create(current_user.id, content)
+        timeline.on_post(new_post)
+        flash('Post created successfully!')
+    else:
+        flash('Post content cannot be empty')
+    return redirect(url_for('main.home'))
+
+@main.route('/like/<int:post_id>', methods=['POST'])
+@login_required
+def like_post(post_id):
+    liked = likes.like(post_id, current_user.id)
+    if liked is None:
+        flash('Post not found')
+    elif liked:
+        # The card's like count changed; drop its cached versions.
+        fragments.invalidate(post_id)
+        flash('Post liked!')
+    else:
+        flash('You already liked this post')
+    return redirect(url_for('main.home'))
+
+@main.route('/follow/<username>', methods=['POST'])
+@login_required
+def follow_user(username):
+    if username in users and username != current_user.id:
+        if follows.follow(current_user.id, username):
+            timeline.on_follow(current_user.id, username)
+            flash(f'You are now following {username}!')
+        else:
+            flash(f'You are already following {username}')
+    else:
+        flash('User not found or cannot follow yourself')
+    return redirect(url_for('main.profile', username=username))
+
+@main.route('/unfollow/<username>', methods=['POST'])
+@login_required
+def unfollow_user(username):
+    if username in users and username != current_user.id:
+        if follows.unfollow(current_user.id, username):
+            flash(f'You have unfollowed {username}!')
+        else:
+            flash(f'You are not following {username}')
+    else:
+        flash('User not found or cannot unfollow yourself')
+    return redirect(url_for('main.profile', username=username))
@@ -0,0 +1,358 @@
+"""
+storage.py
+
+Storage backends for users, posts and follows.
+
+`open_storage()` returns a (users, posts, follows) triple. With no database
+path it returns the in-memory stores (a dict, PostStore and FollowGraph). With
+a path it returns SQLite-backed stores exposing the same API, so the Flask
+routes work unchanged against either backend.
+
+The SQLite backend runs in WAL mode so readers never block the writer, which
+lets every gunicorn worker share one database file instead of keeping its own
+divergent copy. Each worker process keeps its own small connection pool;
+connections inherited across a fork are discarded, never reused.
+"""
+
+import os
+import queue
+import sqlite3
+from contextlib import contextmanager
+
+from .follow_graph import FollowGraph
+from .post_store import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PostStore
+
+POOL_SIZE = 8
+BUSY_TIMEOUT_MS = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL,
+    content TEXT NOT NULL,
+    likes INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS posts_by_author ON posts (username, id);
+
+CREATE TABLE IF NOT EXISTS likes (
+    post_id INTEGER NOT NULL,
+    username TEXT NOT NULL,
+    PRIMARY KEY (post_id, username)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS follows (
+    follower TEXT NOT NULL,
+    followee TEXT NOT NULL,
+    PRIMARY KEY (follower, followee)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS follows_by_followee ON follows (followee, follower);
+
+-- Change counters behind stamp(), kept up to date by triggers so that every
+-- worker sees the same version no matter which one made the change.
+CREATE TABLE IF NOT EXISTS versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    updated REAL NOT NULL DEFAULT (julianday('now'))
+) WITHOUT ROWID;
+INSERT OR IGNORE INTO versions (name) VALUES ('posts'), ('follows');
+"""
+
+VERSION_TRIGGERS = [
+    (table, event)
+    for table in ('posts', 'follows')
+    for event in ('INSERT', 'UPDATE', 'DELETE')
+]
+
+
+def _version_trigger_sql(table, event):
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_version AFTER {event} ON {table} "
+        f"BEGIN UPDATE versions SET version = version + 1, updated = julianday('now') "
+        f"WHERE name = '{table}'; END;"
+    )
+
+
+def _stamp(pool, name):
+    with pool.connection() as conn:
+        version, updated = conn.execute(
+            'SELECT version, updated FROM versions WHERE name = ?', (name,)
+        ).fetchone()
+    # julianday -> unix timestamp
+    return version, (updated - 2440587.5) * 86400.0
+
+
+
+class ConnectionPool:
+    """
+    A per-process pool of SQLite connections. Connections are handed to one
+    thread at a time and returned to the pool afterwards.
+    """
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue(maxsize=self.size)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+        return conn
+
+    @contextmanager
+    def connection(self):
+        if self._pid != os.getpid():
+            # Forked worker: never share the parent's SQLite handles.
+            self._reset()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @contextmanager
+    def transaction(self):
+        with self.connection() as conn:
+            with conn:
+                yield conn
+
+
+class SQLiteUserStore:
+    """
+    Dict-like view of the users table ({username: {'username', 'password'}}).
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def get(self, username, default=None):
+        with self.pool.connection() as conn:
+            row = conn.execute('SELECT username, password FROM users WHERE username = ?', (username,)).fetchone()
+        return dict(row) if row else default
+
+    def __getitem__(self, username):
+        user = self.get(username)
+        if user is None:
+            raise KeyError(username)
+        return user
+
+    def __setitem__(self, username, user):
+        with self.pool.transaction() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO users (username, password) VALUES (?, ?)',
+                (username, user['password']),
+            )
+
+    def __contains__(self, username):
+        return self.get(username) is not None
+
+    def __len__(self):
+        with self.pool.connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
+
+
+class SQLitePostStore:
+    """
+    PostStore API on top of the posts table.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def _query(self, sql, params=()):
+        with self.pool.connection() as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def create(self, username, content):
+        with self.pool.transaction() as conn:
+            cursor = conn.execute('INSERT INTO posts (username, content) VALUES (?, ?)', (username, content))
+        return {'id': cursor.lastrowid, 'username': username, 'content': content, 'likes': 0}
+
+    def get(self, post_id):
+        rows = self._query('SELECT * FROM posts WHERE id = ?', (post_id,))
+        return rows[0] if rows else None
+
+    def delete(self, post_id):
+        with self.pool.transaction() as conn:
+            conn.execute('DELETE FROM likes WHERE post_id = ?', (post_id,))
+            rows = conn.execute('DELETE FROM posts WHERE id = ? RETURNING *', (post_id,)).fetchall()
+        return dict(rows[0]) if rows else None
+
+    def like(self, post_id):
+        with self.pool.transaction() as conn:
+            rows = conn.execute('UPDATE posts SET likes = likes + 1 WHERE id = ? RETURNING *', (post_id,)).fetchall()
+        return dict(rows[0]) if rows else None
+
+    def stamp(self):
+        return _stamp(self.pool, 'posts')
+
+    def has_liked(self, post_id, username):
+        with self.pool.connection() as conn:
+            return conn.execute(
+                'SELECT 1 FROM likes WHERE post_id = ? AND username = ?', (post_id, username)
+            ).fetchone() is not None
+
+    def record_likes(self, likes):
+        """
+        Insert a batch of (post_id, username) ledger rows and add the likes
+        that were new to the counts, in one transaction, so a crash never
+        leaves a ledger row without its like. Returns {post_id: likes added}.
+        """
+        added = {}
+        with self.pool.transaction() as conn:
+            for post_id, username in likes:
+                # The likes primary key makes the dedup atomic across workers.
+                cursor = conn.execute(
+                    'INSERT OR IGNORE INTO likes (post_id, username) '
+                    'SELECT id, ? FROM posts WHERE id = ?',
+                    (username, post_id),
+                )
+                if cursor.rowcount == 1:
+                    added[post_id] = added.get(post_id, 0) + 1
+            conn.executemany(
+                'UPDATE posts SET likes = likes + ? WHERE id = ?',
+                [(count, post_id) for post_id, count in added.items()],
+            )
+        return added
+
+    def page(self, before=None, limit=DEFAULT_PAGE_SIZE):
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        # Fetch one extra row to learn whether an older page exists.
+        rows = self._query(
+            'SELECT * FROM posts WHERE id < ? ORDER BY id DESC LIMIT ?',
+            (before if before is not None else 2 ** 63 - 1, limit + 1),
+        )
+        next_cursor = rows[limit - 1]['id'] if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    def recent_by_author(self, username, before=None, limit=DEFAULT_PAGE_SIZE):
+        return self._query(
+            'SELECT * FROM posts WHERE username = ? AND id < ? ORDER BY id DESC LIMIT ?',
+            (username, before if before is not None else 2 ** 63 - 1, limit),
+        )
+
+    def by_author(self, username):
+        return self._query('SELECT * FROM posts WHERE username = ? ORDER BY id', (username,))
+
+    def count_by_author(self, username):
+        with self.pool.connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM posts WHERE username = ?', (username,)).fetchone()[0]
+
+    def __contains__(self, post_id):
+        return self.get(post_id) is not None
+
+    def __len__(self):
+        with self.pool.connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM posts').fetchone()[0]
+
+    def __iter__(self):
+        return iter(self._query('SELECT * FROM posts ORDER BY id'))
+
+
+class SQLiteFollowGraph:
+    """
+    FollowGraph API on top of the follows table. The primary key serves
+    "who do I follow" and the follows_by_followee index serves follower
+    lookups and counts.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def _scalar(self, sql, params):
+        with self.pool.connection() as conn:
+            return conn.execute(sql, params).fetchone()[0]
+
+    def stamp(self):
+        return _stamp(self.pool, 'follows')
+
+    def add_user(self, username):
+        # Users have no rows until they follow or are followed.
+        pass
+
+    def follow(self, follower, followee):
+        with self.pool.transaction() as conn:
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO follows (follower, followee) VALUES (?, ?)', (follower, followee)
+            )
+        return cursor.rowcount == 1
+
+    def unfollow(self, follower, followee):
+        with self.pool.transaction() as conn:
+            cursor = conn.execute('DELETE FROM follows WHERE follower = ? AND followee = ?', (follower, followee))
+        return cursor.rowcount == 1
+
+    def is_following(self, follower, followee):
+        return bool(self._scalar(
+            'SELECT EXISTS (SELECT 1 FROM follows WHERE follower = ? AND followee = ?)', (follower, followee)
+        ))
+
+    def following(self, username):
+        with self.pool.connection() as conn:
+            rows = conn.execute('SELECT followee FROM follows WHERE follower = ?', (username,))
+            return frozenset(row[0] for row in rows)
+
+    def followers(self, username):
+        with self.pool.connection() as conn:
+            rows = conn.execute('SELECT follower FROM follows WHERE followee = ?', (username,))
+            return frozenset(row[0] for row in rows)
+
+    def following_count(self, username):
+        return self._scalar('SELECT COUNT(*) FROM follows WHERE follower = ?', (username,))
+
+    def follower_count(self, username):
+        return self._scalar('SELECT COUNT(*) FROM follows WHERE followee = ?', (username,))
+
+
+def open_sqlite(path, seed_users=None, seed_posts=None, seed_follows=None):
+    """
+    Open (and if needed create) the SQLite database at `path`. Seed data is
+    only inserted into an empty database; concurrent workers racing on the
+    first boot are harmless because every insert is idempotent.
+    """
+    pool = ConnectionPool(path)
+    with pool.transaction() as conn:
+        conn.executescript(SCHEMA)
+        for table, event in VERSION_TRIGGERS:
+            conn.execute(_version_trigger_sql(table, event))
+        if conn.execute('SELECT COUNT(*) FROM users').fetchone()[0] == 0:
+            conn.executemany(
+                'INSERT OR IGNORE INTO users (username, password) VALUES (?, ?)',
+                [(name, user['password']) for name, user in (seed_users or {}).items()],
+            )
+            conn.executemany(
+                'INSERT OR IGNORE INTO posts (id, username, content, likes) VALUES (?, ?, ?, ?)',
+                [(p['id'], p['username'], p['content'], p['likes']) for p in seed_posts or []],
+            )
+            conn.executemany(
+                'INSERT OR IGNORE INTO follows (follower, followee) VALUES (?, ?)',
+                [(f, g) for f, followees in (seed_follows or {}).items() for g in followees],
+            )
+    return SQLiteUserStore(pool), SQLitePostStore(pool), SQLiteFollowGraph(pool)
+
+
+def open_storage(path=None, seed_users=None, seed_posts=None, seed_follows=None):
+    """
+    Return (users, posts, follows) for the configured backend: SQLite when a
+    database path is given, in-memory stores otherwise.
+    """
+    if path:
+        return open_sqlite(path, seed_users, seed_posts, seed_follows)
+    return dict(seed_users or {}), PostStore(seed_posts), FollowGraph(seed_follows)
@@ -40,6 +40,36 @@ class TestApp(unittest.TestCase):
         # Ensure no "Traceback" in the HTML (a common sign of a Python exception)
         self.assertNotIn(b"Traceback", response.data, "Flask error/exception occurred")
 
+    def test_feed_json_pagination(self):
+        response = self.client.get("/api/posts?limit=1")
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(len(data["posts"]), 1)
+        newest_id = data["posts"][0]["id"]
+
+        response = self.client.get(f"/api/posts?before={data['next_cursor']}")
+        older = response.get_json()["posts"]
+        self.assertTrue(older)
+        self.assertTrue(all(post["id"] < newest_id for post in older))
+
+    def test_profile_is_paginated_newest_first(self):
+        with self.client.session_transaction() as session:
+            session["_user_id"] = "user1"
+        self.client.post("/post", data={"content": "profile pagination test"})
+        response = self.client.get("/profile/user1?limit=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data.count(b'class="post"'), 1)
+        self.assertIn(b"profile pagination test", response.data)
+        self.assertIn(b"Older posts", response.data)
+
+    def test_healthz(self):
+        response = self.client.get("/healthz")
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data["status"], "ok")
+        self.assertEqual(data["pid"], os.getpid())
+        self.assertEqual(data["master"], os.getppid())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from website import create_app, extensions
+
+app = create_app()
+
+
+class TestConditionalRequests(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_home_answers_304_until_the_feed_changes(self):
+        response = self.client.get("/")
+        etag = response.headers["ETag"]
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get("/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+
+        extensions.posts.create("user1", "something new")
+        response = self.client.get("/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_weak_validator_matches(self):
+        etag = self.client.get("/").headers["ETag"]
+        response = self.client.get("/", headers={"If-None-Match": f"W/{etag}"})
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_varies_by_user_and_cursor(self):
+        anonymous = self.client.get("/").headers["ETag"]
+        self.assertNotEqual(self.client.get("/?limit=1").headers["ETag"], anonymous)
+        with self.client.session_transaction() as session:
+            session["_user_id"] = "user1"
+        self.assertEqual(self.client.get("/", headers={"If-None-Match": anonymous}).status_code, 200)
+
+    def test_profile_changes_with_follow_graph(self):
+        with self.client.session_transaction() as session:
+            session["_user_id"] = "user2"
+        etag = self.client.get("/profile/user1").headers["ETag"]
+        self.assertEqual(self.client.get("/profile/user1", headers={"If-None-Match": etag}).status_code, 304)
+        extensions.follows.follow("user2", "user1")
+        try:
+            response = self.client.get("/profile/user1", headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 200)
+        finally:
+            extensions.follows.unfollow("user2", "user1")
+
+    def test_pending_flash_is_never_answered_with_304(self):
+        etag = self.client.get("/").headers["ETag"]
+        with self.client.session_transaction() as session:
+            session["_flashes"] = [("message", "Hello!")]
+        response = self.client.get("/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Hello!", response.data)
+        self.assertNotIn("ETag", response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
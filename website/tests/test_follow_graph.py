@@ -0,0 +1,40 @@
+import unittest
+import sys
+import os
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from website.follow_graph import FollowGraph
+
+
+class TestFollowGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = FollowGraph({"user1": ["user2"], "user2": [], "user3": ["user2"]})
+
+    def test_reverse_index_is_built(self):
+        self.assertEqual(self.graph.followers("user2"), {"user1", "user3"})
+        self.assertEqual(self.graph.follower_count("user2"), 2)
+        self.assertEqual(self.graph.following_count("user1"), 1)
+        self.assertEqual(self.graph.follower_count("user1"), 0)
+
+    def test_follow_and_unfollow_keep_both_sides_in_sync(self):
+        self.assertTrue(self.graph.follow("user2", "user1"))
+        self.assertFalse(self.graph.follow("user2", "user1"))
+        self.assertTrue(self.graph.is_following("user2", "user1"))
+        self.assertEqual(self.graph.followers("user1"), {"user2"})
+
+        self.assertTrue(self.graph.unfollow("user2", "user1"))
+        self.assertFalse(self.graph.unfollow("user2", "user1"))
+        self.assertFalse(self.graph.is_following("user2", "user1"))
+        self.assertEqual(self.graph.follower_count("user1"), 0)
+        self.assertEqual(self.graph.following_count("user2"), 0)
+
+    def test_unknown_users(self):
+        self.assertFalse(self.graph.is_following("ghost", "user1"))
+        self.assertEqual(self.graph.followers("ghost"), frozenset())
+        self.assertFalse(self.graph.unfollow("ghost", "user1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from website import create_app, extensions
+from website.fragment_cache import FragmentCache
+
+app = create_app()
+
+
+class TestFragmentCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = FragmentCache(max_entries=2)
+        self.renders = 0
+
+    def render(self, text):
+        def _render():
+            self.renders += 1
+            return text
+        return _render
+
+    def test_hits_misses_and_lru_bound(self):
+        self.assertEqual(self.cache.get_or_render((1, 0), self.render("a")), "a")
+        self.assertEqual(self.cache.get_or_render((1, 0), self.render("x")), "a")
+        self.cache.get_or_render((2, 0), self.render("b"))
+        self.cache.get_or_render((3, 0), self.render("c"))
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 3, 2))
+        self.assertAlmostEqual(stats["hit_ratio"], 0.25)
+        # (1, 0) was least recently used and got evicted
+        self.cache.get_or_render((1, 0), self.render("a"))
+        self.assertEqual(self.renders, 4)
+
+    def test_invalidate_only_drops_that_post(self):
+        self.cache.get_or_render((1, 0), self.render("a"))
+        self.cache.get_or_render((2, 0), self.render("b"))
+        self.cache.invalidate(1)
+        self.cache.get_or_render((2, 0), self.render("b"))
+        self.cache.get_or_render((1, 0), self.render("a"))
+        self.assertEqual(self.renders, 3)
+        self.assertEqual(self.cache.stats()["invalidations"], 1)
+
+
+class TestPostCardCaching(unittest.TestCase):
+    def test_cards_are_reused_and_likes_invalidate(self):
+        client = app.test_client()
+        post_id = extensions.posts.create("user1", "cache me")["id"]
+        with client.session_transaction() as session:
+            session["_user_id"] = "user2"
+            session["_fresh"] = True
+
+        client.get("/")
+        before = client.get("/stats/fragments").get_json()
+        response = client.get("/")
+        after = client.get("/stats/fragments").get_json()
+        self.assertIn(b"cache me", response.data)
+        self.assertEqual(after["misses"], before["misses"])
+        self.assertGreater(after["hits"], before["hits"])
+
+        client.post(f"/like/{post_id}")
+        self.assertGreater(client.get("/stats/fragments").get_json()["invalidations"], before["invalidations"])
+        self.assertIn(b"Likes: 1", client.get("/").data)
+
+    def test_stats_need_a_login(self):
+        response = app.test_client().get("/stats/fragments")
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("/login", response.headers["Location"])
+
+
+if __name__ == "__main__":
+    unittest.main()
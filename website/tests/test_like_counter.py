@@ -0,0 +1,159 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from website import create_app, extensions
+from website.like_counter import LikeCounter
+from website.post_store import PostStore
+from website.storage import open_storage
+
+app = create_app()
+
+THREADS = 16
+USERS_PER_THREAD = 25
+
+
+def hammer(like, post_id):
+    """
+    Like `post_id` from THREADS * USERS_PER_THREAD distinct users, each twice,
+    from THREADS concurrent threads.
+    """
+    barrier = threading.Barrier(THREADS)
+
+    def run(thread_no):
+        barrier.wait()
+        for i in range(USERS_PER_THREAD):
+            username = f"stress{thread_no}-{i}"
+            like(post_id, username)
+            like(post_id, username)
+
+    threads = [threading.Thread(target=run, args=(n,)) for n in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class TestLikeCounter(unittest.TestCase):
+    def setUp(self):
+        self.posts = PostStore([{"id": 1, "username": "user1", "content": "hi", "likes": 0}])
+        self.likes = LikeCounter(self.posts, flush_interval=60)
+
+    def tearDown(self):
+        self.likes.close()
+
+    def test_dedup_and_pending_counts(self):
+        self.assertTrue(self.likes.like(1, "user2"))
+        self.assertFalse(self.likes.like(1, "user2"))
+        self.assertIsNone(self.likes.like(99, "user2"))
+        self.assertEqual(self.posts.get(1)["likes"], 0)
+        self.assertEqual(self.likes.count(1), 1)
+        self.assertEqual(self.likes.overlay([self.posts.get(1)])[0]["likes"], 1)
+
+        self.likes.flush()
+        self.assertEqual(self.posts.get(1)["likes"], 1)
+        self.assertEqual(self.likes.pending(1), 0)
+
+    def test_stamp_depends_only_on_pending_deltas(self):
+        # Another worker's counter over the same store
+        other = LikeCounter(self.posts, flush_interval=60)
+        try:
+            self.assertEqual(self.likes.stamp(), other.stamp())
+            self.assertIsNone(self.likes.stamp()[0])
+            self.likes.like(1, "user2")
+            self.assertNotEqual(self.likes.stamp()[0], other.stamp()[0])
+            other._shard(1).pending[1] += 1
+            self.assertEqual(self.likes.stamp()[0], other.stamp()[0])
+            self.likes.flush()
+            other._shard(1).pending.clear()
+            self.assertEqual(self.likes.stamp(), other.stamp())
+        finally:
+            other.close()
+        self.assertEqual(self.likes.count(1), 1)
+
+    def test_no_lost_increments_in_memory(self):
+        hammer(self.likes.like, 1)
+        self.likes.flush()
+        self.assertEqual(self.posts.get(1)["likes"], THREADS * USERS_PER_THREAD)
+
+    def test_no_lost_increments_sqlite(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _, posts, _ = open_storage(
+                os.path.join(tmpdir, "likes.db"),
+                seed_posts=[{"id": 1, "username": "user1", "content": "hi", "likes": 0}],
+            )
+            # Two counters sharing one database, as two gunicorn workers would
+            first, second = LikeCounter(posts, flush_interval=0.01), LikeCounter(posts, flush_interval=0.01)
+            hammer(lambda post_id, user: (first if hash(user) % 2 else second).like(post_id, user), 1)
+            first.close()
+            second.close()
+            self.assertEqual(posts.get(1)["likes"], THREADS * USERS_PER_THREAD)
+
+    def test_crash_before_flush_loses_like_and_ledger_row_together(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "likes.db")
+            seed = [{"id": 1, "username": "user1", "content": "hi", "likes": 3}]
+            _, posts, _ = open_storage(path, seed_posts=seed)
+            crashed = LikeCounter(posts, flush_interval=60)
+            self.assertTrue(crashed.like(1, "user2"))
+            self.assertFalse(crashed.like(1, "user2"))
+            # The worker dies here: nothing was flushed, so nothing was written
+            crashed._shard(1).likes.clear()
+            crashed._shard(1).pending.clear()
+            crashed.close()
+
+            _, posts, _ = open_storage(path)
+            self.assertFalse(posts.has_liked(1, "user2"))
+            restarted = LikeCounter(posts, flush_interval=60)
+            try:
+                self.assertTrue(restarted.like(1, "user2"))
+                restarted.flush()
+                self.assertTrue(posts.has_liked(1, "user2"))
+                self.assertFalse(restarted.like(1, "user2"))
+            finally:
+                restarted.close()
+            self.assertEqual(posts.get(1)["likes"], 4)
+
+    def test_like_accepted_by_two_workers_is_counted_once(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _, posts, _ = open_storage(
+                os.path.join(tmpdir, "likes.db"),
+                seed_posts=[{"id": 1, "username": "user1", "content": "hi", "likes": 0}],
+            )
+            first, second = LikeCounter(posts, flush_interval=60), LikeCounter(posts, flush_interval=60)
+            self.assertTrue(first.like(1, "user2"))
+            self.assertTrue(second.like(1, "user2"))
+            first.close()
+            second.close()
+            self.assertEqual(posts.get(1)["likes"], 1)
+
+
+class TestLikeRouteStress(unittest.TestCase):
+    def test_concurrent_like_requests(self):
+        post_id = extensions.posts.create("user1", "stress target")["id"]
+        for thread_no in range(THREADS):
+            for i in range(USERS_PER_THREAD):
+                username = f"stress{thread_no}-{i}"
+                extensions.users[username] = {"username": username, "password": "unused"}
+
+        def like(post_id, username):
+            client = app.test_client()
+            with client.session_transaction() as session:
+                session["_user_id"] = username
+                session["_fresh"] = True
+            response = client.post(f"/like/{post_id}")
+            self.assertEqual(response.status_code, 302)
+
+        hammer(like, post_id)
+        self.assertEqual(extensions.likes.count(post_id), THREADS * USERS_PER_THREAD)
+        extensions.likes.flush()
+        self.assertEqual(extensions.posts.get(post_id)["likes"], THREADS * USERS_PER_THREAD)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from website.post_store import PostStore
+
+
+class TestPostStore(unittest.TestCase):
+    def setUp(self):
+        self.store = PostStore([
+            {"id": 1, "username": "user1", "content": "first", "likes": 0},
+            {"id": 2, "username": "user2", "content": "second", "likes": 0},
+        ])
+
+    def test_create_allocates_monotonic_ids(self):
+        post = self.store.create("user1", "third")
+        self.assertEqual(post["id"], 3)
+        self.store.delete(3)
+        self.store.delete(2)
+        # Ids are never reused after deletions
+        self.assertEqual(self.store.create("user1", "fourth")["id"], 4)
+        self.assertEqual(len(self.store), 2)
+
+    def test_get_and_like(self):
+        self.assertEqual(self.store.like(2)["likes"], 1)
+        self.assertEqual(self.store.get(2)["likes"], 1)
+        self.assertIsNone(self.store.like(99))
+        self.assertIsNone(self.store.get(99))
+
+    def test_by_author_index(self):
+        self.store.create("user1", "again")
+        self.assertEqual([p["id"] for p in self.store.by_author("user1")], [1, 3])
+        self.store.delete(1)
+        self.assertEqual([p["id"] for p in self.store.by_author("user1")], [3])
+        self.assertEqual(self.store.by_author("nobody"), [])
+
+    def test_iteration_is_id_order(self):
+        self.store.create("user2", "third")
+        self.assertEqual([p["id"] for p in self.store], [1, 2, 3])
+
+    def test_page_is_newest_first_with_cursor(self):
+        for i in range(3, 11):
+            self.store.create("user1", f"post {i}")
+        page, cursor = self.store.page(limit=4)
+        self.assertEqual([p["id"] for p in page], [10, 9, 8, 7])
+        self.assertEqual(cursor, 7)
+        page, cursor = self.store.page(before=cursor, limit=4)
+        self.assertEqual([p["id"] for p in page], [6, 5, 4, 3])
+        page, cursor = self.store.page(before=cursor, limit=4)
+        self.assertEqual([p["id"] for p in page], [2, 1])
+        self.assertIsNone(cursor)
+
+    def test_page_skips_deleted_posts(self):
+        for i in range(3, 7):
+            self.store.create("user1", f"post {i}")
+        self.store.delete(5)
+        self.store.delete(2)
+        page, cursor = self.store.page(before=6, limit=2)
+        self.assertEqual([p["id"] for p in page], [4, 3])
+        self.assertEqual(cursor, 3)
+        page, cursor = self.store.page(before=cursor, limit=2)
+        self.assertEqual([p["id"] for p in page], [1])
+        self.assertIsNone(cursor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from website import create_app, extensions
+from website.rate_limit import RateLimiter
+
+app = create_app()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(capacity=3, rate=1.0, max_keys=2, clock=self.clock)
+
+    def test_bucket_empties_and_refills(self):
+        self.assertTrue(all(self.limiter.allow("a") for _ in range(3)))
+        self.assertFalse(self.limiter.allow("a"))
+        self.assertAlmostEqual(self.limiter.retry_after("a"), 1.0)
+        self.clock.now += 1.5
+        self.assertTrue(self.limiter.allow("a"))
+        self.assertFalse(self.limiter.allow("a"))
+        # Other keys have their own bucket
+        self.assertTrue(self.limiter.allow("b"))
+
+    def test_key_count_is_bounded(self):
+        for _ in range(3):
+            self.limiter.allow("a")
+        self.limiter.allow("b")
+        self.limiter.allow("c")
+        # "a" was evicted as least recently used and starts with a full bucket
+        self.assertTrue(self.limiter.allow("a"))
+
+
+class TestLoginRateLimit(unittest.TestCase):
+    def tearDown(self):
+        extensions.login_ip_limiter.reset()
+        extensions.login_user_limiter.reset()
+
+    def test_rejects_before_hashing(self):
+        client = app.test_client()
+        statuses = [
+            client.post("/login", data={"username": "user1", "password": "wrong"}).status_code
+            for _ in range(extensions.login_user_limiter.capacity + 1)
+        ]
+        self.assertEqual(statuses[-1], 429)
+        self.assertNotIn(429, statuses[:-1])
+
+        # A correct password is rejected too while the bucket is empty
+        response = client.post("/login", data={"username": "user1", "password": "password1"})
+        self.assertEqual(response.status_code, 429)
+
+    def attempt(self, client, address, n):
+        return client.post(
+            "/login",
+            data={"username": f"nobody{n}", "password": "wrong"},
+            headers={"X-Forwarded-For": address},
+        ).status_code
+
+    def test_forwarded_clients_get_separate_buckets(self):
+        with mock.patch.object(extensions, "TRUSTED_PROXIES", 1):
+            client = create_app().test_client()
+        capacity = extensions.login_ip_limiter.capacity
+        statuses = [self.attempt(client, "203.0.113.1", n) for n in range(capacity + 1)]
+        self.assertEqual(statuses[-1], 429)
+        self.assertNotIn(429, statuses[:-1])
+        self.assertNotEqual(self.attempt(client, "203.0.113.2", capacity + 1), 429)
+
+    def test_forwarded_for_is_ignored_without_a_trusted_proxy(self):
+        client = app.test_client()
+        capacity = extensions.login_ip_limiter.capacity
+        statuses = [self.attempt(client, f"203.0.113.{n}", n) for n in range(capacity + 1)]
+        self.assertEqual(statuses[-1], 429)
+
+    def test_valid_login(self):
+        client = app.test_client()
+        response = client.post("/login", data={"username": "user1", "password": "password1"})
+        self.assertEqual(response.status_code, 302)
+
+
+if __name__ == "__main__":
+    unittest.main()
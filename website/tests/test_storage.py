@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from website.storage import open_storage
+
+SEED_USERS = {"user1": {"username": "user1", "password": "hash1"}}
+SEED_POSTS = [
+    {"id": 1, "username": "user1", "content": "first", "likes": 0},
+    {"id": 2, "username": "user2", "content": "second", "likes": 0},
+]
+SEED_FOLLOWS = {"user1": ["user2"], "user2": []}
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "theseus.db")
+        self.users, self.posts, self.follows = open_storage(self.path, SEED_USERS, SEED_POSTS, SEED_FOLLOWS)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_seed_and_users(self):
+        self.assertIn("user1", self.users)
+        self.assertNotIn("ghost", self.users)
+        self.assertEqual(self.users["user1"]["password"], "hash1")
+        self.assertEqual(len(self.posts), 2)
+
+    def test_posts_match_post_store_api(self):
+        post = self.posts.create("user1", "third")
+        self.assertEqual(post["id"], 3)
+        self.assertEqual(self.posts.like(3)["likes"], 1)
+        self.assertIsNone(self.posts.like(99))
+        self.assertEqual([p["id"] for p in self.posts.by_author("user1")], [1, 3])
+        self.assertEqual(self.posts.delete(3)["content"], "third")
+        # AUTOINCREMENT never reuses ids
+        self.assertEqual(self.posts.create("user1", "fourth")["id"], 4)
+
+        page, cursor = self.posts.page(limit=2)
+        self.assertEqual([p["id"] for p in page], [4, 2])
+        self.assertEqual(cursor, 2)
+        page, cursor = self.posts.page(before=cursor, limit=2)
+        self.assertEqual([p["id"] for p in page], [1])
+        self.assertIsNone(cursor)
+
+    def test_follow_graph(self):
+        self.assertTrue(self.follows.is_following("user1", "user2"))
+        self.assertTrue(self.follows.follow("user2", "user1"))
+        self.assertFalse(self.follows.follow("user2", "user1"))
+        self.assertEqual(self.follows.followers("user1"), {"user2"})
+        self.assertEqual(self.follows.follower_count("user2"), 1)
+        self.assertTrue(self.follows.unfollow("user2", "user1"))
+        self.assertEqual(self.follows.following_count("user2"), 0)
+
+    def test_data_is_shared_and_seeded_once(self):
+        # A second open_storage() is what another gunicorn worker would do
+        users, posts, follows = open_storage(self.path, SEED_USERS, SEED_POSTS, SEED_FOLLOWS)
+        self.posts.like(1)
+        self.assertEqual(posts.get(1)["likes"], 1)
+        self.assertEqual(len(posts), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
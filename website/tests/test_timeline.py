@@ -0,0 +1,58 @@
+import unittest
+import sys
+import os
+
+# Add the repository root to sys.path:
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from website.follow_graph import FollowGraph
+from website.post_store import PostStore
+from website.timeline import Timeline
+
+
+class TestTimeline(unittest.TestCase):
+    def setUp(self):
+        self.posts = PostStore()
+        self.follows = FollowGraph({"reader": ["alice", "star"], "fan": ["star"]})
+        # "star" has two followers, so it is served by fan-out on read
+        self.timeline = Timeline(self.posts, self.follows, capacity=3, fanout_limit=1)
+
+    def post(self, author, content="hi"):
+        post = self.posts.create(author, content)
+        self.timeline.on_post(post)
+        return post["id"]
+
+    def ids(self, username, **kwargs):
+        page, cursor = self.timeline.page(username, **kwargs)
+        return [post["id"] for post in page], cursor
+
+    def test_merges_pushed_and_pulled_posts_newest_first(self):
+        a1 = self.post("alice")
+        s1 = self.post("star")
+        self.post("bob")
+        a2 = self.post("alice")
+        self.assertFalse(self.timeline.is_pulled("alice"))
+        self.assertTrue(self.timeline.is_pulled("star"))
+        self.assertEqual(self.ids("reader"), ([a2, s1, a1], None))
+        self.assertEqual(self.ids("fan"), ([s1], None))
+
+    def test_cursor_pagination(self):
+        ids = [self.post("alice") for _ in range(3)]
+        self.assertEqual(self.ids("reader", limit=2), ([ids[2], ids[1]], ids[1]))
+        self.assertEqual(self.ids("reader", before=ids[1], limit=2), ([ids[0]], None))
+
+    def test_ring_buffer_is_bounded(self):
+        ids = [self.post("alice") for _ in range(5)]
+        self.assertEqual(self.ids("reader")[0], ids[:1:-1])
+
+    def test_follow_backfills_and_unfollow_hides(self):
+        b1 = self.post("bob")
+        self.follows.follow("reader", "bob")
+        self.timeline.on_follow("reader", "bob")
+        self.assertEqual(self.ids("reader")[0], [b1])
+        self.follows.unfollow("reader", "bob")
+        self.assertEqual(self.ids("reader")[0], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+timeline.py
+
+Personalized "posts from people I follow" timelines.
+
+Fan-out on write: when a post is created its id is pushed into a bounded ring
+buffer (deque with maxlen) for each of the author's followers, so reading a
+timeline only touches that user's inbox.
+
+Fan-out on read: authors with more than `fanout_limit` followers are not pushed
+(that would be one append per follower per post). Their posts are pulled from
+the post store's per-author index at read time and merged into the inbox.
+
+With `fanout_limit=FANOUT_ON_READ` no inboxes are kept at all and every
+timeline is merged at read time. That is the mode to use when posts live in a
+database shared by several worker processes, since inboxes are per process.
+
+Inbox entries are re-checked against the follow graph on read, so unfollowing
+takes effect immediately without rewriting inboxes.
+"""
+
+import heapq
+import threading
+from collections import deque
+
+from .post_store import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+TIMELINE_CAPACITY = 500
+FANOUT_LIMIT = 10_000
+FANOUT_ON_READ = -1
+
+
+class Timeline:
+    def __init__(self, posts, follows, capacity=TIMELINE_CAPACITY, fanout_limit=FANOUT_LIMIT):
+        self.posts = posts
+        self.follows = follows
+        self.capacity = capacity
+        self.fanout_limit = fanout_limit
+        self._inboxes = {}
+        self._lock = threading.Lock()
+        if fanout_limit != FANOUT_ON_READ:
+            for post in posts:
+                self.on_post(post)
+
+    def _inbox(self, username):
+        inbox = self._inboxes.get(username)
+        if inbox is None:
+            inbox = self._inboxes.setdefault(username, deque(maxlen=self.capacity))
+        return inbox
+
+    def is_pulled(self, author):
+        """
+        True if the author's posts are merged in at read time instead of being
+        pushed to follower inboxes.
+        """
+        if self.fanout_limit == FANOUT_ON_READ:
+            return True
+        return self.follows.follower_count(author) > self.fanout_limit
+
+    def on_post(self, post):
+        """
+        Push a newly created post into its author's followers' inboxes.
+        """
+        author = post['username']
+        if self.is_pulled(author):
+            return
+        with self._lock:
+            for follower in self.follows.followers(author):
+                self._inbox(follower).append(post['id'])
+
+    def on_follow(self, follower, followee):
+        """
+        Backfill the follower's inbox with the followee's recent posts.
+        """
+        if self.is_pulled(followee):
+            return
+        recent = [post['id'] for post in self.posts.recent_by_author(followee, limit=self.capacity)]
+        with self._lock:
+            inbox = self._inbox(follower)
+            merged = heapq.merge(inbox, reversed(recent))
+            self._inboxes[follower] = deque(merged, maxlen=self.capacity)
+
+    def _pushed(self, username, before):
+        """
+        Posts from the user's inbox with id < before, newest first.
+        """
+        last_id = None
+        # Snapshot the ring buffer; a deque can't be iterated while appended to.
+        for post_id in reversed(tuple(self._inboxes.get(username, ()))):
+            if (before is not None and post_id >= before) or post_id == last_id:
+                continue
+            last_id = post_id
+            post = self.posts.get(post_id)
+            if post is not None and self.follows.is_following(username, post['username']):
+                yield post
+
+    def page(self, username, before=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        Return up to `limit` timeline posts with id < `before`, newest first,
+        plus the cursor for the next page (None when the page is short).
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        sources = [self._pushed(username, before)]
+        for author in self.follows.following(username):
+            if self.is_pulled(author):
+                sources.append(self.posts.recent_by_author(author, before=before, limit=limit))
+
+        page = []
+        for post in heapq.merge(*sources, key=lambda post: post['id'], reverse=True):
+            if page and page[-1]['id'] == post['id']:
+                continue
+            page.append(post)
+            if len(page) == limit:
+                break
+        next_cursor = page[-1]['id'] if len(page) == limit else None
+        return page, next_cursor